@@ -0,0 +1,210 @@
+"""
+Lookahead AI move chooser for Trapper-Mastering battles.
+
+LookaheadPolicy is a Battle move policy (see battle.RandomMovePolicy) for
+rival and boss creatures. It searches the battle with expectiminimax: it
+picks the move whose worst-case answer from the opponent is best, averaging
+over coarsened damage distributions (solver.damage_distribution). Both
+creatures' current status conditions are modelled (lost turns, damage
+multiplier, residual damage) as lasting for the whole search. Searched
+states go into a transposition table keyed on a compact hash of both HP
+values, kept between turns of the same matchup; the matchup includes both
+statuses, so a status change starts a new table. The search deepens one
+turn at a time until it has expanded its budget of states, so a decision
+takes a few milliseconds and is the same on every machine.
+"""
+
+import time
+
+from solver import damage_distribution, stat_key
+from status import STATUS, NO_STATUS
+
+WIN = 1.0
+LOSE = -1.0
+
+
+def coarsen(distribution, buckets=3):
+    """
+    Merge a damage distribution into damage 0 plus at most buckets hit
+    outcomes, each at its probability-weighted mean damage.
+    """
+    coarse = [(0, p) for d, p in distribution if d == 0]
+    hits = [(d, p) for d, p in distribution if d > 0]
+    if hits:
+        size = -(-len(hits) // buckets)
+        for start in range(0, len(hits), size):
+            group = hits[start:start + size]
+            weight = sum(p for _, p in group)
+            mean = sum(d * p for d, p in group) / weight
+            coarse.append((max(1, round(mean)), weight))
+    return tuple(coarse)
+
+
+def with_status(distribution, status):
+    """Damage distribution of a creature's turn under a status condition (lost turns, damage multiplier)"""
+    skip = min(STATUS.skip_chance[status], 1.0)
+    multiplier = STATUS.damage_multiplier[status]
+    outcomes = {0: skip} if skip else {}
+    for damage, p in distribution:
+        damage = int(damage * multiplier)
+        outcomes[damage] = outcomes.get(damage, 0.0) + p * (1.0 - skip)
+    return tuple(sorted((d, p) for d, p in outcomes.items() if p > 0))
+
+
+def residual(creature, status):
+    """HP a creature loses at the end of each of its turns under a status condition"""
+    fraction = STATUS.residual_damage[status]
+    return max(1, int(creature.max_hp * fraction)) if fraction else 0
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class LookaheadPolicy:
+    """
+    Expectiminimax move policy with a transposition table and a budget of
+    node_budget expanded states per decision (about 4 ms). The budget is
+    counted, not timed, so the same battle always gets the same moves and
+    recorded battles replay exactly. time_budget optionally adds a
+    wall-clock limit in seconds, at the cost of that reproducibility.
+    Values are from the chooser's side: WIN, LOSE, or the HP-fraction lead
+    at the search horizon.
+    """
+
+    # The transposition table is cleared when it grows past this many states
+    MAX_TABLE_SIZE = 200_000
+    NODE_BUDGET = 500
+
+    def __init__(self, node_budget=NODE_BUDGET, max_depth=8, buckets=3, time_budget=None):
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.buckets = buckets
+        self.table = {}  # (own HP << 16 | foe HP) -> (depth, value, move index)
+        self.depth_reached = 0
+        self._matchup = None
+        self._nodes_left = None
+        self._deadline = None
+
+    def choose_move(self, creature, target, battle):
+        moves = creature.moves
+        if len(moves) == 1:
+            return moves[0]
+
+        # Battle.player_attack lets the player move first on equal speed
+        if creature is battle.wild_creature:
+            moves_first = creature.speed > target.speed
+        else:
+            moves_first = creature.speed >= target.speed
+        self._prepare(creature, target, moves_first)
+
+        # Depth 1 always completes; deeper searches stop when the budget runs out
+        self._nodes_left = self._deadline = None
+        best = self._search(creature.current_hp, target.current_hp, 1)
+        self.depth_reached = 1
+        self._nodes_left = self.node_budget
+        if self.time_budget is not None:
+            self._deadline = time.perf_counter() + self.time_budget
+        for depth in range(2, self.max_depth + 1):
+            try:
+                best = self._search(creature.current_hp, target.current_hp, depth)
+            except _OutOfBudget:
+                break
+            self.depth_reached = depth
+        return moves[best]
+
+    def _prepare(self, creature, target, moves_first):
+        """Set up distributions for a matchup, keeping the table if it's unchanged"""
+        own_status = STATUS.ids.get(creature.status, NO_STATUS)
+        foe_status = STATUS.ids.get(target.status, NO_STATUS)
+        matchup = (stat_key(creature), stat_key(target), moves_first, own_status, foe_status)
+        if matchup != self._matchup or len(self.table) > self.MAX_TABLE_SIZE:
+            self._matchup = matchup
+            self.table = {}
+        self.moves_first = moves_first
+        self.own_max = creature.max_hp
+        self.foe_max = target.max_hp
+        self.own_residual = residual(creature, own_status)
+        self.foe_residual = residual(target, foe_status)
+        self.own_dists = [coarsen(with_status(damage_distribution(creature, m, target), own_status),
+                                  self.buckets)
+                          for m in creature.moves]
+        self.foe_dists = [coarsen(with_status(damage_distribution(target, m, creature), foe_status),
+                                  self.buckets)
+                          for m in target.moves] or [((0, 1.0),)]
+
+    def _search(self, own_hp, foe_hp, depth):
+        """Search to depth turns and return the best move index"""
+        self._value(own_hp, foe_hp, depth)
+        return self.table[own_hp << 16 | foe_hp][2]
+
+    def _value(self, own_hp, foe_hp, depth):
+        """Value of the state at the start of a turn, searching depth turns ahead"""
+        if depth == 0:
+            return own_hp / self.own_max - foe_hp / self.foe_max
+
+        key = own_hp << 16 | foe_hp
+        entry = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+        if self._nodes_left is not None:
+            if self._nodes_left <= 0 or (self._deadline is not None and time.perf_counter() > self._deadline):
+                raise _OutOfBudget
+            self._nodes_left -= 1
+
+        best_value, best_move = -2.0, 0
+        for i, mine in enumerate(self.own_dists):
+            worst = 2.0
+            for theirs in self.foe_dists:
+                value = self._expect(own_hp, foe_hp, mine, theirs, depth - 1)
+                if value < worst:
+                    worst = value
+                    if worst <= best_value:
+                        break  # this move can't beat the best one so far
+            if worst > best_value:
+                best_value, best_move = worst, i
+
+        self.table[key] = (depth, best_value, best_move)
+        return best_value
+
+    def _expect(self, own_hp, foe_hp, mine, theirs, depth):
+        """Expected value of one turn where both sides use the given damage distributions"""
+        # Residual status damage hits each side after its own move
+        own_residual, foe_residual = self.own_residual, self.foe_residual
+        total = 0.0
+        if self.moves_first:
+            own_hp -= own_residual
+            for d, pd in mine:
+                foe_left = foe_hp - d
+                if foe_left <= 0:
+                    total += pd * WIN
+                    continue
+                if own_hp <= 0:
+                    total += pd * LOSE
+                    continue
+                foe_left -= foe_residual
+                for e, pe in theirs:
+                    own_left = own_hp - e
+                    if own_left <= 0:
+                        total += pd * pe * LOSE
+                    else:
+                        total += pd * pe * (WIN if foe_left <= 0 else self._value(own_left, foe_left, depth))
+        else:
+            foe_hp -= foe_residual
+            for e, pe in theirs:
+                own_left = own_hp - e
+                if own_left <= 0:
+                    total += pe * LOSE
+                    continue
+                if foe_hp <= 0:
+                    total += pe * WIN
+                    continue
+                own_left -= own_residual
+                for d, pd in mine:
+                    foe_left = foe_hp - d
+                    if foe_left <= 0:
+                        total += pe * pd * WIN
+                    else:
+                        total += pe * pd * (LOSE if own_left <= 0 else self._value(own_left, foe_left, depth))
+        return total
@@ -0,0 +1,85 @@
+"""
+Background autosave for Trapper-Mastering.
+
+Saving on the render thread stalls frames while the save is diffed,
+encoded and written. AutoSaver splits a save in two: the main thread only
+takes Game._snapshot_state(), a save dict that later play can't change,
+and a worker thread writes it through the game's save handler
+(SaveJournal, BinarySave or a save slot, which all replace files
+atomically). The snapshot serializes only the in-memory PC box creatures
+that changed since the last one; a SQLite box is only flushed, and the
+snapshot holds its path, never its creatures. Requests that arrive while
+a save is running are coalesced: only the newest waiting snapshot is
+written.
+"""
+
+import threading
+
+# Seconds of play between autosaves
+AUTOSAVE_INTERVAL = 30.0
+
+
+class AutoSaver:
+    """
+    Writes a Game's saves on a daemon worker thread.
+    While an AutoSaver is running, the worker owns game.saves; don't call
+    game.save_game() from the main thread until close().
+    """
+
+    def __init__(self, game, interval=AUTOSAVE_INTERVAL):
+        self.game = game
+        self.interval = interval
+        self.elapsed = 0.0  # Seconds since the last autosave request
+        self.saves_written = 0
+        self.error = None  # Last exception raised while saving, if any
+        self._pending = None  # Newest snapshot not yet picked up by the worker
+        self._busy = False  # Worker is writing a snapshot
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Snapshot the game and queue it for saving; returns without waiting"""
+        snapshot = self.game._snapshot_state()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("AutoSaver is closed")
+            self._pending = snapshot  # Replaces (coalesces) an older waiting snapshot
+            self._condition.notify()
+        self.elapsed = 0.0
+
+    def tick(self, dt):
+        """Advance the autosave timer by dt seconds; requests a save every interval"""
+        self.elapsed += dt
+        if self.elapsed >= self.interval:
+            self.request()
+
+    def wait(self):
+        """Block until every requested save has been written"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is None and not self._busy)
+
+    def close(self):
+        """Write any waiting save and stop the worker"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return  # Closed with nothing left to write
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self.game.saves.save(self.game._serialize_snapshot(snapshot))
+                self.saves_written += 1
+            except Exception as e:  # Keep autosaving; the caller can show self.error
+                self.error = e
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
@@ -4,8 +4,10 @@ Implements turn-based combat similar to Pokemon.
 """
 
 import random
+from collections import deque
 from creature import Creature
 from player import Player, TRAP_TYPES, HEAL_ITEMS
+from status import STATUS, NO_STATUS
 
 
 class BattleResult:
@@ -17,85 +19,436 @@ class BattleResult:
     RAN_AWAY = "ran_away"
 
 
+class BattleEvent:
+    """
+    Outcome codes for structured battle events.
+    Events are (actor, detail, value, outcome) tuples: actor is the acting
+    creature or player, detail a Move or item name, value a damage/heal/reward amount.
+    """
+    MESSAGE = 0
+    HIT = 1
+    MISS = 2
+    FAINT = 3
+    THROW = 4
+    CAUGHT = 5
+    BROKE_FREE = 6
+    NO_TRAPS = 7
+    NO_ITEM = 8
+    HEALED = 9
+    RAN_AWAY = 10
+    NO_ESCAPE = 11
+    CANT_SWITCH = 12
+    RECALL = 13
+    SEND_OUT = 14
+    WIN = 15
+    AUTO_SWITCH = 16
+    LOSE = 17
+    INVALID_MOVE = 18
+    STATUS_INFLICTED = 19
+    STATUS_SKIP = 20
+    STATUS_DAMAGE = 21
+    STATUS_RECOVERED = 22
+
+
+# Number of HP-fraction buckets in the catch probability table
+CATCH_TABLE_RESOLUTION = 256
+
+# Shake checks are rolled as randint(0, 65535) < shake_check
+SHAKE_RANGE = 65536
+
+
+def _shake_check(trap_catch_rate, hp_factor):
+    """Threshold a shake roll has to beat (Pokemon catch rate formula, simplified)"""
+    catch_rate = hp_factor * trap_catch_rate * 255
+    return (SHAKE_RANGE / (255 / catch_rate)) ** 0.25
+
+
+def catch_probability(trap, current_hp, max_hp, status=None):
+    """
+    Exact chance that one throw of trap catches a creature at current_hp.
+    A catch needs four shakes in a row, each passing with shake_check / 65536.
+    The creature's status condition multiplies the trap's catch rate.
+    """
+    if trap.catch_rate <= 0:
+        return 0.0
+    catch_rate = trap.catch_rate * STATUS.catch_multiplier[STATUS.status_id(status)]
+    hp_factor = (3 * max_hp - 2 * current_hp) / (3 * max_hp)
+    shake_check = min(int(_shake_check(catch_rate, hp_factor)), SHAKE_RANGE)
+    return (shake_check / SHAKE_RANGE) ** 4
+
+
+def _build_catch_row(trap, status=NO_STATUS):
+    """
+    Catch probabilities for each HP-fraction bucket of one trap.
+    Bucket k covers k/R <= hp fraction < (k+1)/R, plus a last bucket for full HP.
+    Buckets where the shake check changes value hold None and fall back to
+    catch_probability, so lookups are always exact.
+    """
+    catch_rate = trap.catch_rate * STATUS.catch_multiplier[status]
+    row = []
+    for bucket in range(CATCH_TABLE_RESOLUTION):
+        if trap.catch_rate <= 0:
+            row.append(0.0)
+            continue
+        # The shake check falls as HP rises; compare it at both ends of the bucket
+        high = _shake_check(catch_rate, 1 - 2 * bucket / (3 * CATCH_TABLE_RESOLUTION))
+        low = _shake_check(catch_rate, 1 - 2 * (bucket + 1) / (3 * CATCH_TABLE_RESOLUTION))
+        if int(high + 1e-9) == int(low - 1e-9):
+            row.append((min(int(low - 1e-9), SHAKE_RANGE) / SHAKE_RANGE) ** 4)
+        else:
+            row.append(None)
+    row.append(catch_probability(trap, 1, 1, STATUS.names[status]))
+    return row
+
+
+def _build_catch_rows(trap):
+    return [_build_catch_row(trap, status) for status in range(len(STATUS))]
+
+
+# Catch probability lookup table: trap name -> status id -> per-bucket probabilities
+CATCH_TABLE = {name: _build_catch_rows(trap) for name, trap in TRAP_TYPES.items()}
+
+
+def catch_chance(trap, current_hp, max_hp, status=None):
+    """O(1) catch probability lookup through CATCH_TABLE (exact, no dice rolled)"""
+    rows = CATCH_TABLE.get(trap.name)
+    if rows is None:
+        rows = CATCH_TABLE[trap.name] = _build_catch_rows(trap)
+    row = rows[NO_STATUS if status is None else STATUS.status_id(status)]
+    chance = row[current_hp * CATCH_TABLE_RESOLUTION // max_hp]
+    if chance is None:
+        chance = catch_probability(trap, current_hp, max_hp, status)
+    return chance
+
+
+# Damage roll: uniform(ROLL_LOW, ROLL_HIGH), written out (same draws, no method call)
+ROLL_LOW = 0.85
+ROLL_SPAN = 1.0 - ROLL_LOW
+
+# Inventory entries a battle can change (traps thrown, heal items used)
+BATTLE_ITEMS = tuple(TRAP_TYPES) + tuple(HEAL_ITEMS)
+
+
+class RandomMovePolicy:
+    """
+    Move policy that picks uniformly at random (the default for wild creatures).
+    A move policy is any object with choose_move(creature, target, battle)
+    returning one of creature.moves.
+    """
+    
+    def choose_move(self, creature, target, battle):
+        moves = creature.moves
+        return moves[int(battle.rng.random() * len(moves))]
+
+
+def _wild_prefix(battle, actor):
+    return "Wild " if battle.is_wild(actor) else ""
+
+
+# Text for each event outcome: (battle, actor, detail, value) -> message
+EVENT_TEXT = {
+    BattleEvent.MESSAGE: lambda b, a, d, v: d,
+    BattleEvent.HIT: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} used {d.name}! Dealt {v} damage.",
+    BattleEvent.MISS: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name}'s {d.name} missed!",
+    BattleEvent.FAINT: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} fainted!",
+    BattleEvent.THROW: lambda b, a, d, v: f"{a.name} threw a {d}!",
+    BattleEvent.CAUGHT: lambda b, a, d, v: f"Gotcha! {a.name} was caught!",
+    BattleEvent.BROKE_FREE: lambda b, a, d, v: f"{a.name} broke free!",
+    BattleEvent.NO_TRAPS: lambda b, a, d, v: "You don't have any traps!",
+    BattleEvent.NO_ITEM: lambda b, a, d, v: "You don't have that item!",
+    BattleEvent.HEALED: lambda b, a, d, v: f"Used {d}! Restored {v} HP.",
+    BattleEvent.RAN_AWAY: lambda b, a, d, v: "Got away safely!",
+    BattleEvent.NO_ESCAPE: lambda b, a, d, v: "Can't escape!",
+    BattleEvent.CANT_SWITCH: lambda b, a, d, v: f"{a.name} has fainted and can't battle!",
+    BattleEvent.RECALL: lambda b, a, d, v: f"{a.name} called back {d.name}!",
+    BattleEvent.SEND_OUT: lambda b, a, d, v: f"Go, {a.name}!",
+    BattleEvent.WIN: lambda b, a, d, v: f"You won! Earned ${v}.",
+    BattleEvent.AUTO_SWITCH: lambda b, a, d, v: f"Switch to {a.name}!",
+    BattleEvent.LOSE: lambda b, a, d, v: "All your creatures fainted! You lost the battle.",
+    BattleEvent.INVALID_MOVE: lambda b, a, d, v: "Invalid move!",
+    BattleEvent.STATUS_INFLICTED: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} is now {d}!",
+    BattleEvent.STATUS_SKIP: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} is {d} and can't move!",
+    BattleEvent.STATUS_DAMAGE: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} is hurt by being {d}! Lost {v} HP.",
+    BattleEvent.STATUS_RECOVERED: lambda b, a, d, v: f"{_wild_prefix(b, a)}{a.name} is no longer {d}!",
+}
+
+
 class Battle:
     """
-    Manages a battle between player and wild creature
+    Manages a battle between player and wild creature.
+    
+    In headless mode (for simulations) the battle keeps structured event
+    tuples in a ring buffer of log_size entries instead of formatting log
+    text; text is rendered only when battle_log or get_battle_state is read.
+    log_size=FULL_LOG keeps every event.
+    The wild creature's moves are chosen by wild_policy (a RandomMovePolicy
+    by default).
     """
     
-    def __init__(self, player, wild_creature):
+    HEADLESS_LOG_SIZE = 64
+    FULL_LOG = 0
+    
+    def __init__(self, player, wild_creature, rng=None, headless=False, log_size=None,
+                 wild_policy=None):
         self.player = player
+        # Random generator for every roll in this battle (defaults to the random module)
+        self.rng = rng if rng is not None else random
         self.wild_creature = wild_creature
+        self.wild_policy = wild_policy if wild_policy is not None else RandomMovePolicy()
         self.player_creature = player.get_active_creature()
-        self.battle_log = []
         self.result = BattleResult.ONGOING
+        # Creature.base_damage results, keyed by (attacker, move, target)
+        self._base_damage = {}
+        # Turns left on timed status conditions, keyed by creature
+        self._status_turns = {}
+        self.headless = headless
+        # Events recorded so far, including those a wrapped ring buffer dropped
+        self._event_total = 0
+        if headless:
+            if log_size == self.FULL_LOG:
+                self.events = deque()
+                self._record = self.events.append
+            else:
+                self.events = deque(maxlen=log_size or self.HEADLESS_LOG_SIZE)
+                self._record = self._count_event
+        else:
+            self.events = None
+            self._battle_log = []
+            self._record = self._log_event
+    
+    @property
+    def battle_log(self):
+        """Battle log messages (rendered from the event buffer in headless mode)"""
+        if self.headless:
+            return [self.render_event(event) for event in self.events]
+        return self._battle_log
+    
+    def is_wild(self, creature):
+        """Check if a creature fights on the wild side"""
+        return creature is self.wild_creature
+    
+    def render_event(self, event):
+        """Turn an event tuple into its log message"""
+        actor, detail, value, outcome = event
+        return EVENT_TEXT[outcome](self, actor, detail, value)
+    
+    def _log_event(self, event):
+        self._battle_log.append(self.render_event(event))
+    
+    def _count_event(self, event):
+        self._event_total += 1
+        self.events.append(event)
+    
+    def _log_total(self):
+        """Number of events recorded so far (the ring buffer's length stops growing once it wraps)"""
+        if not self.headless:
+            return len(self._battle_log)
+        if self.events.maxlen is None:
+            return len(self.events)
+        return self._event_total
         
     def add_log(self, message):
         """Add a message to battle log"""
-        self.battle_log.append(message)
+        self._record((None, message, 0, BattleEvent.MESSAGE))
     
     def get_battle_state(self):
         """Get current state of battle"""
+        if self.headless:
+            log = [self.render_event(event) for event in list(self.events)[-5:]]
+        else:
+            log = self._battle_log[-5:]
         return {
             'player_creature': self.player_creature,
             'wild_creature': self.wild_creature,
-            'log': self.battle_log[-5:],  # Last 5 messages
+            'log': log,  # Last 5 messages
             'result': self.result
         }
     
+    def snapshot(self):
+        """
+        Capture the mutable battle state in a compact tuple for restore():
+        result, active creature, party and wild HP/status, status durations,
+        battle item counts, money, party/PC box sizes, RNG state and the number
+        of events logged so far.
+        Nothing else is copied, so the cost doesn't grow with the PC box.
+        """
+        player = self.player
+        inventory = player.inventory
+        wild = self.wild_creature
+        return (
+            self.result,
+            self.player_creature,
+            tuple((c.current_hp, c.status) for c in player.party),
+            wild.current_hp,
+            wild.status,
+            tuple(self._status_turns.items()),
+            tuple(inventory.get(name) for name in BATTLE_ITEMS),
+            player.money,
+            len(player.pc_box),
+            self.rng.getstate(),
+            self._log_total(),
+        )
+    
+    def restore(self, snapshot):
+        """
+        Rewind the battle to a snapshot() taken earlier in the same battle.
+        Creatures caught since are removed again and the events logged since
+        are dropped. Once a headless ring buffer has wrapped, events it
+        evicted to make room for them are not brought back, so the log can
+        be shorter than it was at the snapshot.
+        """
+        (self.result, self.player_creature, party, wild_hp, wild_status, status_turns,
+         item_counts, money, box_size, rng_state, log_total) = snapshot
+        player = self.player
+        
+        del player.party[len(party):]
+        for creature, (hp, status) in zip(player.party, party):
+            creature.current_hp = hp
+            creature.status = status
+        player.refresh_party()
+        while len(player.pc_box) > box_size:
+            player.pc_box.pop()
+        self.wild_creature.current_hp = wild_hp
+        self.wild_creature.status = wild_status
+        self._status_turns = dict(status_turns)
+        
+        inventory = player.inventory
+        for name, count in zip(BATTLE_ITEMS, item_counts):
+            if count is None:
+                inventory.pop(name, None)
+            else:
+                inventory[name] = count
+        player.money = money
+        self.rng.setstate(rng_state)
+        
+        log = self.events if self.headless else self._battle_log
+        for _ in range(min(self._log_total() - log_total, len(log))):
+            log.pop()
+        self._event_total = log_total
+    
     def player_attack(self, move_index):
         """Player creature attacks with selected move"""
         if self.result != BattleResult.ONGOING:
             return
         
         if move_index >= len(self.player_creature.moves):
-            self.add_log("Invalid move!")
+            self._record((None, None, 0, BattleEvent.INVALID_MOVE))
             return
         
-        move = self.player_creature.moves[move_index]
+        player_creature = self.player_creature
+        wild = self.wild_creature
+        move = player_creature.moves[move_index]
         
         # Determine turn order based on speed
-        player_first = self.player_creature.speed >= self.wild_creature.speed
-        
-        if player_first:
-            self._execute_player_move(move)
-            if not self.wild_creature.is_fainted():
+        if player_creature.speed >= wild.speed:
+            self._execute_move(player_creature, move, wild)
+            if wild.current_hp > 0 and player_creature.current_hp > 0:
                 self._execute_wild_move()
         else:
             self._execute_wild_move()
-            if not self.player_creature.is_fainted():
-                self._execute_player_move(move)
+            if player_creature.current_hp > 0 and wild.current_hp > 0:
+                self._execute_move(player_creature, move, wild)
         
         self._check_battle_end()
     
+    def _roll_damage(self, attacker, move, target):
+        """
+        Same rolls as Creature.calculate_damage, but the deterministic part
+        of the formula is computed once per attacker/move/target in a battle.
+        """
+        key = (attacker, move, target)
+        base = self._base_damage.get(key)
+        if base is None:
+            base = self._base_damage[key] = attacker.base_damage(move, target)
+        
+        rng = self.rng
+        if rng.random() * 100 >= move.accuracy:
+            return 0  # Move missed
+        return int(base * (ROLL_LOW + ROLL_SPAN * rng.random()))
+    
     def _execute_player_move(self, move):
         """Execute player's move"""
-        damage = self.player_creature.calculate_damage(move, self.wild_creature)
-        
-        if damage == 0:
-            self.add_log(f"{self.player_creature.name}'s {move.name} missed!")
-        else:
-            self.wild_creature.take_damage(damage)
-            self.add_log(f"{self.player_creature.name} used {move.name}! Dealt {damage} damage.")
-            
-            if self.wild_creature.is_fainted():
-                self.add_log(f"Wild {self.wild_creature.name} fainted!")
+        self._execute_move(self.player_creature, move, self.wild_creature)
     
     def _execute_wild_move(self):
         """Execute wild creature's move"""
-        if not self.wild_creature.moves:
+        wild = self.wild_creature
+        if not wild.moves:
             return
         
-        move = random.choice(self.wild_creature.moves)
-        damage = self.wild_creature.calculate_damage(move, self.player_creature)
+        move = self.wild_policy.choose_move(wild, self.player_creature, self)
+        self._execute_move(wild, move, self.player_creature)
+    
+    def _execute_move(self, attacker, move, target):
+        """One creature's turn: its move plus any status effects"""
+        multiplier = 1.0
+        if attacker.status is not None:
+            multiplier = self._status_turn(attacker)
+            if not multiplier:
+                self._status_residual(attacker)
+                return
+        
+        damage = self._roll_damage(attacker, move, target)
+        if multiplier != 1.0:
+            damage = int(damage * multiplier)
         
         if damage == 0:
-            self.add_log(f"Wild {self.wild_creature.name}'s {move.name} missed!")
+            self._record((attacker, move, 0, BattleEvent.MISS))
         else:
-            self.player_creature.take_damage(damage)
-            self.add_log(f"Wild {self.wild_creature.name} used {move.name}! Dealt {damage} damage.")
+            target.take_damage(damage)
+            self._record((attacker, move, damage, BattleEvent.HIT))
             
-            if self.player_creature.is_fainted():
-                self.add_log(f"{self.player_creature.name} fainted!")
+            if target.is_fainted():
+                self._record((target, None, 0, BattleEvent.FAINT))
+        
+        if attacker.status is not None:
+            self._status_residual(attacker)
+    
+    def inflict_status(self, creature, status):
+        """Give a creature a status condition (None cures it)"""
+        status_id = STATUS.status_id(status)
+        creature.status = status
+        if status_id == NO_STATUS:
+            self._status_turns.pop(creature, None)
+            return
+        self._status_turns[creature] = STATUS.roll_duration(status_id, self.rng)
+        self._record((creature, status, 0, BattleEvent.STATUS_INFLICTED))
+    
+    def _status_turn(self, creature):
+        """
+        Start of a statused creature's turn: count down the status duration,
+        then roll whether the creature loses its move.
+        Returns the damage multiplier for its move (0 if it can't move).
+        """
+        status = STATUS.ids.get(creature.status, NO_STATUS)
+        if STATUS.max_turns[status]:
+            turns = self._status_turns.get(creature)
+            if turns is None:
+                # Status set outside the battle: roll its duration now
+                turns = STATUS.roll_duration(status, self.rng)
+            if turns <= 0:
+                self._record((creature, creature.status, 0, BattleEvent.STATUS_RECOVERED))
+                creature.status = None
+                self._status_turns.pop(creature, None)
+                return 1.0
+            self._status_turns[creature] = turns - 1
+        
+        skip = STATUS.skip_chance[status]
+        if skip and (skip >= 1.0 or self.rng.random() < skip):
+            self._record((creature, creature.status, 0, BattleEvent.STATUS_SKIP))
+            return 0.0
+        return STATUS.damage_multiplier[status]
+    
+    def _status_residual(self, creature):
+        """Residual status damage at the end of a creature's turn"""
+        residual = STATUS.residual_damage[STATUS.ids.get(creature.status, NO_STATUS)]
+        if not residual or creature.is_fainted():
+            return
+        damage = max(1, int(creature.max_hp * residual))
+        creature.take_damage(damage)
+        self._record((creature, creature.status, damage, BattleEvent.STATUS_DAMAGE))
+        if creature.is_fainted():
+            self._record((creature, None, 0, BattleEvent.FAINT))
     
     def attempt_catch(self, trap_name):
         """
@@ -107,50 +460,47 @@ class Battle:
         
         # Use the trap
         if not self.player.use_item(trap_name):
-            self.add_log("You don't have any traps!")
+            self._record((None, None, 0, BattleEvent.NO_TRAPS))
             return False
         
         trap = TRAP_TYPES.get(trap_name)
         if not trap:
             return False
         
-        # Calculate catch chance
-        hp_factor = (3 * self.wild_creature.max_hp - 2 * self.wild_creature.current_hp) / (3 * self.wild_creature.max_hp)
-        catch_rate = hp_factor * trap.catch_rate * 255
-        
-        # Shake calculation (simplified)
-        shake_check = int((65536 / (255 / catch_rate)) ** 0.25)
+        self._record((self.player, trap_name, 0, BattleEvent.THROW))
         
-        self.add_log(f"{self.player.name} threw a {trap_name}!")
+        # One roll against the exact chance of all four shakes succeeding
+        wild = self.wild_creature
+        chance = catch_chance(trap, wild.current_hp, wild.max_hp, wild.status)
         
-        # Simulate shakes (1-4 times)
-        shakes = 0
-        for i in range(4):
-            if random.randint(0, 65535) < shake_check:
-                shakes += 1
-            else:
-                break
-        
-        if shakes == 4:
+        if self.rng.random() < chance:
             # Caught!
-            self.add_log(f"Gotcha! {self.wild_creature.name} was caught!")
+            self._record((self.wild_creature, None, 0, BattleEvent.CAUGHT))
             self.player.add_creature(self.wild_creature)
             self.result = BattleResult.CAUGHT
             return True
         else:
-            self.add_log(f"{self.wild_creature.name} broke free!")
+            self._record((self.wild_creature, None, 0, BattleEvent.BROKE_FREE))
             # Wild creature gets a free turn
             self._execute_wild_move()
             self._check_battle_end()
             return False
     
+    def get_catch_chance(self, trap_name):
+        """Chance that throwing trap_name right now catches the wild creature"""
+        trap = TRAP_TYPES.get(trap_name)
+        if not trap:
+            return 0.0
+        wild = self.wild_creature
+        return catch_chance(trap, wild.current_hp, wild.max_hp, wild.status)
+    
     def use_heal_item(self, item_name):
         """Use a healing item on player's creature"""
         if self.result != BattleResult.ONGOING:
             return False
         
         if not self.player.use_item(item_name):
-            self.add_log("You don't have that item!")
+            self._record((None, None, 0, BattleEvent.NO_ITEM))
             return False
         
         heal_item = HEAL_ITEMS.get(item_name)
@@ -161,7 +511,7 @@ class Battle:
         self.player_creature.heal(heal_item.heal_amount)
         healed = self.player_creature.current_hp - old_hp
         
-        self.add_log(f"Used {item_name}! Restored {healed} HP.")
+        self._record((self.player_creature, item_name, healed, BattleEvent.HEALED))
         
         # Wild creature gets a turn
         self._execute_wild_move()
@@ -179,12 +529,12 @@ class Battle:
         
         escape_chance = (player_speed * 128) / wild_speed + 30
         
-        if random.randint(0, 255) < escape_chance:
-            self.add_log("Got away safely!")
+        if self.rng.randint(0, 255) < escape_chance:
+            self._record((None, None, 0, BattleEvent.RAN_AWAY))
             self.result = BattleResult.RAN_AWAY
             return True
         else:
-            self.add_log("Can't escape!")
+            self._record((None, None, 0, BattleEvent.NO_ESCAPE))
             # Wild creature gets a turn
             self._execute_wild_move()
             self._check_battle_end()
@@ -196,12 +546,12 @@ class Battle:
             return False
         
         if new_creature.is_fainted():
-            self.add_log(f"{new_creature.name} has fainted and can't battle!")
+            self._record((new_creature, None, 0, BattleEvent.CANT_SWITCH))
             return False
         
-        self.add_log(f"{self.player.name} called back {self.player_creature.name}!")
+        self._record((self.player, self.player_creature, 0, BattleEvent.RECALL))
         self.player_creature = new_creature
-        self.add_log(f"Go, {self.player_creature.name}!")
+        self._record((self.player_creature, None, 0, BattleEvent.SEND_OUT))
         
         # Wild creature gets a turn
         self._execute_wild_move()
@@ -210,18 +560,18 @@ class Battle:
     
     def _check_battle_end(self):
         """Check if battle has ended"""
-        if self.wild_creature.is_fainted():
+        if self.wild_creature.current_hp <= 0:
             self.result = BattleResult.PLAYER_WIN
             # Award some money/experience (simplified)
             reward = self.wild_creature.level * 10
             self.player.money += reward
-            self.add_log(f"You won! Earned ${reward}.")
-        elif self.player_creature.is_fainted():
+            self._record((None, None, reward, BattleEvent.WIN))
+        elif self.player_creature.current_hp <= 0:
             # Check if player has other creatures
             next_creature = self.player.get_active_creature()
             if next_creature:
-                self.add_log(f"Switch to {next_creature.name}!")
+                self._record((next_creature, None, 0, BattleEvent.AUTO_SWITCH))
                 self.player_creature = next_creature
             else:
                 self.result = BattleResult.PLAYER_LOSE
-                self.add_log("All your creatures fainted! You lost the battle.")
+                self._record((None, None, 0, BattleEvent.LOSE))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Autosave benchmark.
+
+Usage:
+    python benchmarks/bench_autosave.py [largest box size]
+
+Compares the main-thread cost of a save: a synchronous Game.save_game()
+against AutoSaver.request(), which only snapshots the game and leaves
+diffing and writing to the worker thread. Also runs a 60 FPS frame
+loop that autosaves every 10 frames and reports the worst frame.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autosave import AutoSaver  # noqa: E402
+from creature import SPECIES  # noqa: E402
+from game import Game  # noqa: E402
+from player import Player  # noqa: E402
+
+FRAME = 1 / 60
+
+
+def make_game(path, n, seed=1):
+    rng = random.Random(seed)
+    game = Game(save_path=path)
+    game.player = Player("Ash")
+    for _ in range(6 + n):
+        game.player.add_creature(SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60)))
+    return game
+
+
+def frame_loop(autosaver, frames=120, every=10):
+    """Worst time spent in a frame's own work (money update + autosave request), in ms"""
+    worst = 0.0
+    for frame in range(frames):
+        start = time.perf_counter()
+        autosaver.game.player.money += 1
+        if frame % every == 0:
+            autosaver.request()
+        worst = max(worst, time.perf_counter() - start)
+        time.sleep(max(0.0, FRAME - (time.perf_counter() - start)))
+    return worst * 1e3
+
+
+def main(argv):
+    largest = int(argv[0]) if argv else 100_000
+    sizes = [n for n in (1_000, 10_000) if n < largest] + [largest]
+    print("Autosave (main-thread time per save)")
+    with tempfile.TemporaryDirectory() as tempdir:
+        for n in sizes:
+            for name in ("savegame.json", "savegame.sav"):
+                game = make_game(os.path.join(tempdir, f"{n}-{name}"), n)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    game.save_game()  # First save writes the full snapshot
+                    game.player.money += 1
+                    start = time.perf_counter()
+                    game.save_game()
+                sync_ms = (time.perf_counter() - start) * 1e3
+
+                autosaver = AutoSaver(game)
+                start = time.perf_counter()
+                autosaver.request()
+                request_ms = (time.perf_counter() - start) * 1e3
+                autosaver.wait()
+                worst_ms = frame_loop(autosaver)
+                autosaver.close()
+                print(f"  {n:>7,} boxed, {name:<13}: save_game {sync_ms:8.1f} ms"
+                      f"  request {request_ms:6.3f} ms  worst frame {worst_ms:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Battle hint benchmark: cost of solver.battle_hint() on the GUI render thread.
+
+Usage:
+    python benchmarks/bench_battle_hint.py
+
+For each level, every species x species matchup is solved from an empty
+solver cache (the first hint of a battle) and the slowest one is
+reported with its (player HP x wild HP) state count; later hints in the
+same matchup are cached table lookups. gui_app.py only shows hints for
+matchups up to HINT_MAX_STATES states and recomputes them only when the
+battle state changes.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import solver  # noqa: E402
+from creature import SPECIES  # noqa: E402
+from player import Player  # noqa: E402
+from battle import Battle  # noqa: E402
+
+LEVELS = (5, 10, 15, 20, 30, 50)
+LOOKUPS = 10_000
+
+
+def make_battle(species_a, species_b, level):
+    player = Player("Bench")
+    player.add_creature(species_a.spawn(level))
+    return Battle(player, species_b.spawn(level), rng=random.Random(1))
+
+
+def main():
+    print(f"  {'Level':>5} {'states':>8} {'worst first hint':>17} {'cached hint':>12}")
+    for level in LEVELS:
+        worst, worst_battle = 0.0, None
+        for species_a in SPECIES:
+            for species_b in SPECIES:
+                battle = make_battle(species_a, species_b, level)
+                solver._SOLVERS.clear()
+                start = time.perf_counter()
+                solver.battle_hint(battle)
+                elapsed = time.perf_counter() - start
+                if elapsed > worst:
+                    worst, worst_battle = elapsed, battle
+
+        start = time.perf_counter()
+        for _ in range(LOOKUPS):
+            solver.battle_hint(worst_battle)
+        cached = (time.perf_counter() - start) / LOOKUPS
+        states = worst_battle.player_creature.max_hp * worst_battle.wild_creature.max_hp
+        print(f"  {level:>5} {states:>8,} {worst * 1e3:>14.1f} ms {cached * 1e6:>9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
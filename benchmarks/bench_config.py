@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Config loading benchmark.
+
+Usage:
+    python benchmarks/bench_config.py
+
+Times parsing each YAML file in config/ against loading its compiled
+cache, then the startup of a fresh process importing the game modules
+with a cold cache (YAML parsed and cached) and a warm one.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config_loader  # noqa: E402
+
+RUNS = 20
+IMPORT_GAME = "import time; start = time.perf_counter(); import game; print(time.perf_counter() - start)"
+
+
+def best_ms(fn):
+    best = float('inf')
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def import_ms(cache_dir):
+    """Milliseconds a fresh interpreter spends importing game with the given cache dir"""
+    code = f"import config_loader; config_loader.CACHE_DIR = {cache_dir!r}; {IMPORT_GAME}"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    return float(output) * 1e3
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tempdir:
+        config_loader.CACHE_DIR = tempdir
+        print(f"  {'Config file':<22} {'YAML parse':>10} {'cache load':>11}")
+        for filename in sorted(os.listdir(config_loader.CONFIG_DIR)):
+            name = filename[:-len(".yaml")]
+
+            def parse():
+                with open(config_loader.config_path(name), 'rb') as f:
+                    config_loader.yaml.safe_load(f)
+
+            config_loader.load_config(name)
+            cached_ms = best_ms(lambda: config_loader.load_config(name))
+            print(f"  {name:<22} {best_ms(parse):7.2f} ms  {cached_ms:7.3f} ms")
+
+        cache_dir = os.path.join(tempdir, "startup")
+        cold = import_ms(cache_dir)
+        warm = min(import_ms(cache_dir) for _ in range(5))
+        shutil.rmtree(cache_dir)
+        print(f"\nImporting game in a new process: cold cache {cold:.1f} ms, warm cache {warm:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
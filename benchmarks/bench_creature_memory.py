@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: list of Creature objects vs CreatureStore.
+
+Usage:
+    python benchmarks/bench_creature_memory.py [sizes...]
+
+Default sizes are 10k, 100k and 1M creatures. Creatures are generated the
+same way wild encounters are, so each one carries its own moves list.
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import get_random_wild_creature  # noqa: E402
+from creature_store import CreatureStore  # noqa: E402
+
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def measure(build):
+    """Run build() and return (result, bytes allocated, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def bench(n):
+    random.seed(n)
+    objects, object_bytes, object_time = measure(
+        lambda: [get_random_wild_creature() for _ in range(n)])
+
+    store, store_bytes, store_time = measure(lambda: CreatureStore(objects))
+    assert len(store) == n
+    del objects, store
+
+    print(f"{n:>10,}  objects: {object_bytes / 2**20:9.1f} MiB ({object_bytes / n:6.1f} B/creature, "
+          f"{object_time:6.2f}s)   store: {store_bytes / 2**20:8.1f} MiB "
+          f"({store_bytes / n:5.1f} B/creature, {store_time:6.2f}s)   "
+          f"ratio: {object_bytes / store_bytes:5.1f}x")
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or DEFAULT_SIZES
+    print("Creature memory benchmark (list of Creature vs CreatureStore)")
+    for n in sizes:
+        bench(n)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Horde battle benchmark.
+
+Usage:
+    python benchmarks/bench_horde.py [battles]
+
+Plays seeded HordeBattles for several player-vs-wild sizes: 6v6 and 1v20,
+plus large wild hordes to check that the cost per turn stays flat as
+battles grow. The player side stays within the 6-creature party limit.
+Reports battles per second and microseconds per turn.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES  # noqa: E402
+from player import Player  # noqa: E402
+from battle import BattleResult  # noqa: E402
+from horde import HordeBattle  # noqa: E402
+
+SIZES = ((6, 6), (1, 20), (6, 100), (6, 1000), (1, 1000))
+
+
+def make_sides(n_player, n_wild, rng):
+    """Level-scaled species on the player side (level 60 when alone, so 1vN battles last)"""
+    player = Player("Sim")
+    level = 60 if n_player == 1 else 12
+    player.party = [SPECIES[3 + i % 4].spawn(level) for i in range(n_player)]
+    wild = [SPECIES[3 + i % 4].spawn(rng.randint(3, 7)) for i in range(n_wild)]
+    return player, wild
+
+
+def run(n_player, n_wild, battles, seed=1):
+    """Play battles and return (seconds, turns, wins)"""
+    rng = random.Random(seed)
+    seconds = 0.0
+    turns = wins = 0
+    for _ in range(battles):
+        player, wild = make_sides(n_player, n_wild, rng)
+        start = time.perf_counter()
+        battle = HordeBattle(player, wild, rng=rng)
+        battle.run(max_rounds=1000)
+        seconds += time.perf_counter() - start
+        turns += battle.turns
+        wins += battle.result == BattleResult.PLAYER_WIN
+    return seconds, turns, wins
+
+
+def main(argv):
+    battles = int(argv[0]) if argv else 2000
+    print("Horde battles")
+    for n_player, n_wild in SIZES:
+        count = max(1, battles * 12 // (n_player + n_wild))
+        seconds, turns, wins = run(n_player, n_wild, count)
+        print(f"  {n_player:>3}v{n_wild:<5} {count / seconds:10,.0f} battles/s"
+              f"  {turns / count:7.0f} turns/battle  {seconds / turns * 1e6:5.2f} us/turn"
+              f"  won {wins}/{count}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Lockstep engine benchmark: headless Battle loop vs LockstepBattles.
+
+Usage:
+    python benchmarks/bench_lockstep.py [battles]
+
+Both runs play Sparkrat vs Sparkrat at level 5 with random moves on both
+sides (the tournament policy) and report battles per second and win rate.
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES_BY_NAME  # noqa: E402
+from player import Player  # noqa: E402
+from battle import Battle, BattleResult  # noqa: E402
+from lockstep import LockstepBattles, side_columns, PLAYER_WIN  # noqa: E402
+
+SPECIES = "Sparkrat"
+LEVEL = 5
+
+
+def run_scalar(n, seed=1):
+    """Play n headless Battles and return (win rate, seconds)"""
+    rng = random.Random(seed)
+    species = SPECIES_BY_NAME[SPECIES]
+    wins = 0
+
+    start = time.perf_counter()
+    for _ in range(n):
+        player = Player("Sim")
+        player.add_creature(species.spawn(LEVEL))
+        battle = Battle(player, species.spawn(LEVEL), rng=rng, headless=True, log_size=8)
+        moves = battle.player_creature.moves
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(int(rng.random() * len(moves)))
+        wins += battle.result == BattleResult.PLAYER_WIN
+    return wins / n, time.perf_counter() - start
+
+
+def run_lockstep(n, seed=1):
+    """Play n lockstep battles and return (win rate, seconds)"""
+    side = side_columns([SPECIES_BY_NAME[SPECIES].spawn(LEVEL)])
+
+    start = time.perf_counter()
+    player = {name: np.repeat(column, n, axis=0) for name, column in side.items()}
+    wild = {name: np.repeat(column, n, axis=0) for name, column in side.items()}
+    battles = LockstepBattles(player, wild, rng=np.random.default_rng(seed))
+    battles.run()
+    return np.mean(battles.result == PLAYER_WIN), time.perf_counter() - start
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    scalar_n = min(n, 100_000)
+    scalar_rate, scalar_time = run_scalar(scalar_n)
+    lockstep_rate, lockstep_time = run_lockstep(n)
+
+    print(f"{SPECIES} vs {SPECIES}, level {LEVEL}, random moves")
+    print(f"  Battle:   {scalar_n / scalar_time:12,.0f} battles/s  win rate {scalar_rate:.3f}")
+    print(f"  lockstep: {n / lockstep_time:12,.0f} battles/s  win rate {lockstep_rate:.3f}"
+          f"  ({scalar_time / scalar_n * n / lockstep_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Indexed PC box benchmark.
+
+Usage:
+    python benchmarks/bench_pc_box.py [creatures]
+
+Fills a player's PC box with 1M creatures through Player.add_creature,
+then times box queries and species counts through the IndexedBox
+indexes against linear scans over the same columns.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES, CreatureType, type_id  # noqa: E402
+from player import Player  # noqa: E402
+
+QUERIES = (
+    ("Water above level 20", {'creature_type': CreatureType.WATER, 'min_level': 21}),
+    ("Sparkrat", {'species': "Sparkrat"}),
+    ("shiny Rockbug", {'species': "Rockbug", 'shiny': True}),
+    ("levels 40-45", {'min_level': 40, 'max_level': 45}),
+)
+
+
+def fill(n, seed=1):
+    """Player whose PC box holds n creatures; returns (player, seconds per add)"""
+    rng = random.Random(seed)
+    creatures = []
+    for _ in range(n):
+        creature = SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60))
+        creature.shiny = rng.random() < 0.001
+        creatures.append(creature)
+
+    player = Player("Collector")
+    start = time.perf_counter()
+    for creature in creatures:
+        player.add_creature(creature)
+    return player, (time.perf_counter() - start) / n
+
+
+def scan(box, species=None, creature_type=None, min_level=None, max_level=None, shiny=None):
+    """Linear scan over the box columns"""
+    species_id = None if species is None else box.species_names.index(species)
+    type_key = None if creature_type is None else type_id(creature_type)
+    low = min_level or 0
+    high = max_level if max_level is not None else 1 << 16
+    return [row for row, (s, t, level, sh) in enumerate(zip(box.species, box.type_id, box.level, box.shiny))
+            if (species_id is None or s == species_id) and (type_key is None or t == type_key)
+            and low <= level <= high and (shiny is None or sh == shiny)]
+
+
+def timed(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return (time.perf_counter() - start) / repeats * 1e3, result
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 1_000_000
+    player, add_seconds = fill(n)
+    box = player.pc_box
+    print(f"PC box with {len(box):,} creatures (add_creature {add_seconds * 1e6:.2f} us each)")
+    for label, criteria in QUERIES:
+        indexed_ms, rows = timed(lambda: box.query(**criteria), 5)
+        scan_ms, expected = timed(lambda: scan(box, **criteria), 1)
+        assert rows == expected, label
+        print(f"  {label:<22} {len(rows):>8,} rows  indexed {indexed_ms:9.3f} ms"
+              f"  scan {scan_ms:8.1f} ms  ({scan_ms / indexed_ms:,.0f}x)")
+
+    count_ms, _ = timed(lambda: box.count(species="Windbird"), 1000)
+    scan_ms, _ = timed(lambda: len(scan(box, species="Windbird")), 1)
+    print(f"  {'count Windbird':<22} {'':>8}       indexed {count_ms:9.4f} ms  scan {scan_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
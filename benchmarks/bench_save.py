@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Save format benchmark.
+
+Usage:
+    python benchmarks/bench_save.py [largest box size]
+
+Builds saves with growing PC boxes and compares the JSON save (as
+written by SaveJournal) with the binary save: file size, save time,
+load time into a Player and peak Python memory while loading.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES  # noqa: E402
+from game import Game  # noqa: E402
+from player import Player  # noqa: E402
+
+
+def make_game(path, n, seed=1):
+    rng = random.Random(seed)
+    game = Game(save_path=path)
+    game.player = Player("Ash")
+    for _ in range(6 + n):
+        game.player.add_creature(SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60)))
+    return game
+
+
+def measure(path, n):
+    """(file size, save seconds, load seconds, peak load memory) for one format"""
+    game = make_game(path, n)
+    state = game._save_state()
+    start = time.perf_counter()
+    game.saves.save(state)
+    save_s = time.perf_counter() - start
+
+    loader = Game(save_path=path)
+    tracemalloc.start()
+    start = time.perf_counter()
+    loader._restore_state(loader.saves.load())
+    load_s = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(loader.player.pc_box) == n
+    return os.path.getsize(path), save_s, load_s, peak
+
+
+def main(argv):
+    largest = int(argv[0]) if argv else 100_000
+    sizes = [n for n in (10_000, 100_000) if n < largest] + [largest]
+    print("Save formats (PC box creatures; load = file to Player)")
+    with tempfile.TemporaryDirectory() as tempdir:
+        for n in sizes:
+            for label, name in (("json  ", "savegame.json"), ("binary", "savegame.sav")):
+                size, save_s, load_s, peak = measure(os.path.join(tempdir, name), n)
+                print(f"  {n:>7,} creatures {label}: {size / 1024:8.0f} KB  save {save_s * 1e3:7.1f} ms"
+                      f"  load {load_s * 1e3:7.1f} ms  load peak {peak / 1024 / 1024:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Save slot listing benchmark.
+
+Usage:
+    python benchmarks/bench_save_slots.py [slots] [box size per slot]
+
+Fills save slots and times listing them for a load menu: through the
+slot index, rebuilding the index from the fixed slot headers (which also
+checks every body's CRC-32), and (for comparison) reading every full
+save as a picker without headers would.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES  # noqa: E402
+from save_binary import read_save  # noqa: E402
+from save_slots import HEADER, SaveSlots, describe_slot  # noqa: E402
+
+
+def make_state(box_size, rng):
+    creatures = [SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60)).to_dict()
+                 for _ in range(6 + box_size)]
+    return {'player_name': "Ash", 'money': rng.randrange(10_000),
+            'location': "Route 1", 'playtime': rng.randrange(100_000),
+            'party': creatures[:6], 'inventory': {"Potion": 3}, 'pc_box': creatures[6:]}
+
+
+def main(argv):
+    slot_count = int(argv[0]) if argv else 48
+    box_size = int(argv[1]) if len(argv) > 1 else 10_000
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tempdir:
+        slots = SaveSlots(tempdir)
+        state = make_state(box_size, rng)
+        for slot in range(1, slot_count + 1):
+            slots.save(slot, dict(state, player_name=f"Player {slot}"))
+
+        start = time.perf_counter()
+        lines = [describe_slot(slot, header) for slot, header in slots.list_slots()]
+        index_ms = (time.perf_counter() - start) * 1e3
+
+        os.remove(slots.index_path)
+        start = time.perf_counter()
+        slots.list_slots()
+        headers_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        for slot in range(1, slot_count + 1):
+            save = read_save(slots.path(slot), offset=HEADER.size)
+            list(save['pc_box'])
+        bodies_ms = (time.perf_counter() - start) * 1e3
+
+        print(f"Listing {len(lines)} save slots ({box_size:,} boxed creatures each)")
+        print(f"  slot index:           {index_ms:8.2f} ms")
+        print(f"  rebuild + CRC check:  {headers_ms:8.2f} ms")
+        print(f"  read every save:      {bodies_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Battle snapshot benchmark.
+
+Usage:
+    python benchmarks/bench_snapshot.py [repeats]
+
+Times Battle.snapshot() + restore() against copy.deepcopy of the battle
+for players with growing PC boxes. Snapshots should cost the same few
+microseconds whatever the box size.
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES  # noqa: E402
+from player import Player  # noqa: E402
+from battle import Battle  # noqa: E402
+
+BOX_SIZES = (0, 1000, 100000)
+
+
+def make_battle(box_size, seed=1):
+    rng = random.Random(seed)
+    player = Player("Sim")
+    for i in range(6):
+        player.add_creature(SPECIES[3 + i % 4].spawn(10))
+    for _ in range(box_size):
+        player.pc_box.append(SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(2, 30)))
+    battle = Battle(player, SPECIES[4].spawn(8), rng=rng, headless=True)
+    battle.player_attack(0)
+    return battle
+
+
+def per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main(argv):
+    repeats = int(argv[0]) if argv else 20000
+    print("Battle snapshot + restore vs deepcopy (microseconds per call)")
+    for box_size in BOX_SIZES:
+        battle = make_battle(box_size)
+        snapshot_us = per_call(lambda: battle.restore(battle.snapshot()), repeats)
+        deepcopy_us = per_call(lambda: copy.deepcopy(battle), max(1, repeats // 1000))
+        print(f"  PC box {box_size:>7,}:  snapshot+restore {snapshot_us:7.2f} us"
+              f"  deepcopy {deepcopy_us:12,.1f} us  ({deepcopy_us / snapshot_us:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+SQLite PC box benchmark.
+
+Usage:
+    python benchmarks/bench_sqlite_box.py [largest box size]
+
+Builds SQLite boxes of growing size, then reopens each one and reports
+the time and Python memory it takes to open the box and view a creature,
+random paged access, and an indexed query. Opening should stay flat as
+the box grows.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from creature import SPECIES, CreatureType  # noqa: E402
+from sqlite_box import SQLiteBox  # noqa: E402
+
+
+def build(path, n, seed=1):
+    """Fill a new box with n creatures; returns seconds per append"""
+    rng = random.Random(seed)
+    creatures = [SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60)) for _ in range(n)]
+    start = time.perf_counter()
+    with SQLiteBox(path) as box:
+        for creature in creatures:
+            box.append(creature)
+    return (time.perf_counter() - start) / n
+
+
+def main(argv):
+    largest = int(argv[0]) if argv else 1_000_000
+    sizes = [n for n in (10_000, 100_000, 1_000_000) if n < largest] + [largest]
+    print("SQLite PC box")
+    with tempfile.TemporaryDirectory() as tempdir:
+        for n in sizes:
+            path = os.path.join(tempdir, f"box{n}.sqlite")
+            append_us = build(path, n) * 1e6
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            box = SQLiteBox(path)
+            box[n // 2]
+            open_ms = (time.perf_counter() - start) * 1e3
+            memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+
+            rng = random.Random(2)
+            start = time.perf_counter()
+            for _ in range(1000):
+                box[rng.randrange(n)]
+            access_us = (time.perf_counter() - start) * 1e3
+
+            start = time.perf_counter()
+            rows = box.query(creature_type=CreatureType.WATER, min_level=50)
+            query_ms = (time.perf_counter() - start) * 1e3
+            box.close()
+
+            print(f"  {n:>9,} creatures: append {append_us:5.1f} us  open+view {open_ms:6.2f} ms"
+                  f"  ({memory_kb:6.0f} KB)  random view (page miss) {access_us:6.1f} us"
+                  f"  query {len(rows):>6,} rows {query_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
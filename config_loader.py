@@ -0,0 +1,85 @@
+"""
+Loader for the YAML files in config/.
+
+Parsed configs are compiled into a pickle cache in .config_cache/, keyed
+by each YAML file's mtime, size and SHA-256, so a process only parses
+YAML when a file has changed. A file whose mtime changed but whose
+contents didn't keeps its cache entry. Cache files are read through
+mmap, so processes loading the same config share the page cache; forked
+workers (ProcessPoolExecutor on Linux) inherit the tables built from
+configs at import time and don't load them at all.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+
+import yaml
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".config_cache")
+# Bump when the cache layout changes, to invalidate old cache files
+CACHE_VERSION = 1
+
+
+def config_path(name):
+    """Path of a config file by name, e.g. "status_effects" """
+    return os.path.join(CONFIG_DIR, f"{name}.yaml")
+
+
+def cache_path(name):
+    """Path of a config's compiled cache file"""
+    return os.path.join(CACHE_DIR, f"{name}.pickle")
+
+
+def _digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _read_cache(name):
+    """(key, data) from a config's cache file, or None if it is missing or unreadable"""
+    try:
+        with open(cache_path(name), 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            version, key, data = pickle.loads(buffer)
+    except Exception:  # Missing, empty, truncated or foreign: rebuilt by the caller
+        return None
+    if version != CACHE_VERSION:
+        return None
+    return key, data
+
+
+def _write_cache(name, key, data):
+    """Atomically replace a config's cache file; skipped if the cache dir isn't writable"""
+    temp_path = f"{cache_path(name)}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            pickle.dump((CACHE_VERSION, key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path(name))
+    except OSError:
+        pass
+
+
+def load_config(name):
+    """Load config/<name>.yaml as plain Python data (from the compiled cache when it is current)"""
+    path = config_path(name)
+    stat = os.stat(path)
+    cached = _read_cache(name)
+    if cached is not None:
+        (mtime_ns, size, digest), data = cached
+        if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+            return data
+        digest_now = _digest(path)
+        if digest_now == digest:
+            # Touched but unchanged: refresh the key so the next load skips hashing
+            _write_cache(name, (stat.st_mtime_ns, stat.st_size, digest), data)
+            return data
+
+    with open(path, 'rb') as f:
+        source = f.read()
+    data = yaml.safe_load(source)
+    _write_cache(name, (stat.st_mtime_ns, stat.st_size, hashlib.sha256(source).hexdigest()), data)
+    return data
@@ -4,6 +4,8 @@ Similar to Pokemon in the original games.
 """
 
 import random
+from enum import IntEnum
+from functools import lru_cache
 
 
 class CreatureType:
@@ -17,15 +19,55 @@ class CreatureType:
     GROUND = "Ground"
     FLYING = "Flying"
     ANCIENT = "Ancient"
+    ICE = "Ice"
+    PSYCHIC = "Psychic"
+    GHOST = "Ghost"
+    DRAGON = "Dragon"
+
+
+class TypeId(IntEnum):
+    """Interned integer ids for creature types, used to index TYPE_CHART"""
+    NORMAL = 0
+    FIRE = 1
+    WATER = 2
+    GRASS = 3
+    ELECTRIC = 4
+    ROCK = 5
+    GROUND = 6
+    FLYING = 7
+    ANCIENT = 8
+    ICE = 9
+    PSYCHIC = 10
+    GHOST = 11
+    DRAGON = 12
+
+
+# Type name <-> id lookups
+TYPE_IDS = {getattr(CreatureType, t.name): t for t in TypeId}
+TYPE_NAMES = tuple(getattr(CreatureType, t.name) for t in TypeId)
+
+
+def type_id(type_name):
+    """Get the interned TypeId for a type name"""
+    try:
+        return TYPE_IDS[type_name]
+    except KeyError:
+        raise ValueError(f"Unknown creature type: {type_name!r}") from None
 
 
 # Type effectiveness chart (attacker -> defender -> multiplier)
+# Pairs not listed are neutral (1.0). This is the editable source;
+# the damage code reads the dense TYPE_CHART / MOVE_MULTIPLIERS below.
 TYPE_EFFECTIVENESS = {
+    CreatureType.NORMAL: {
+        CreatureType.GHOST: 0.0,
+    },
     CreatureType.FIRE: {
         CreatureType.GRASS: 2.0,
         CreatureType.WATER: 0.5,
         CreatureType.FIRE: 0.5,
         CreatureType.ROCK: 0.5,
+        CreatureType.ICE: 2.0,
     },
     CreatureType.WATER: {
         CreatureType.FIRE: 2.0,
@@ -47,17 +89,87 @@ TYPE_EFFECTIVENESS = {
         CreatureType.ELECTRIC: 0.5,
         CreatureType.GROUND: 0.0,
     },
+    CreatureType.ICE: {
+        CreatureType.GRASS: 2.0,
+        CreatureType.GROUND: 2.0,
+        CreatureType.FLYING: 2.0,
+        CreatureType.DRAGON: 2.0,
+        CreatureType.FIRE: 0.5,
+        CreatureType.WATER: 0.5,
+        CreatureType.ICE: 0.5,
+    },
+    CreatureType.PSYCHIC: {
+        CreatureType.PSYCHIC: 0.5,
+    },
+    CreatureType.GHOST: {
+        CreatureType.GHOST: 2.0,
+        CreatureType.PSYCHIC: 2.0,
+        CreatureType.NORMAL: 0.0,
+    },
+    CreatureType.DRAGON: {
+        CreatureType.DRAGON: 2.0,
+    },
 }
 
 
+def _build_type_chart():
+    """Expand TYPE_EFFECTIVENESS into a dense [attacker][defender] table"""
+    chart = [[1.0] * len(TypeId) for _ in TypeId]
+    for move_type, row in TYPE_EFFECTIVENESS.items():
+        for target_type, multiplier in row.items():
+            chart[TYPE_IDS[move_type]][TYPE_IDS[target_type]] = multiplier
+    return tuple(tuple(row) for row in chart)
+
+
+def _build_move_multipliers():
+    """Combine STAB and effectiveness into [move type][attacker type][defender type]"""
+    return tuple(
+        tuple(
+            tuple((1.5 if move_type == attacker_type else 1.0) * effectiveness
+                  for effectiveness in TYPE_CHART[move_type])
+            for attacker_type in TypeId
+        )
+        for move_type in TypeId
+    )
+
+
+# Dense N x N effectiveness matrix indexed by TypeId
+TYPE_CHART = _build_type_chart()
+
+# Total type multiplier (STAB x effectiveness) for every type combination
+MOVE_MULTIPLIERS = _build_move_multipliers()
+
+
 class Move:
-    """Represents a creature's move/attack"""
+    """
+    Represents a creature's move/attack.
+    Moves are immutable, so one instance can be shared by every creature that knows it.
+    """
     
-    def __init__(self, name, move_type, power, accuracy=100):
-        self.name = name
-        self.type = move_type
-        self.power = power
-        self.accuracy = accuracy
+    __slots__ = ('name', 'type', 'type_id', 'multipliers', 'power', 'accuracy', 'priority')
+    
+    def __init__(self, name, move_type, power, accuracy=100, priority=0):
+        set_field = object.__setattr__
+        set_field(self, 'name', name)
+        set_field(self, 'type', move_type)
+        set_field(self, 'type_id', type_id(move_type))
+        # [attacker type][defender type] multiplier table for this move
+        set_field(self, 'multipliers', MOVE_MULTIPLIERS[self.type_id])
+        set_field(self, 'power', power)
+        set_field(self, 'accuracy', accuracy)
+        set_field(self, 'priority', priority)  # Higher priority moves act first in horde battles
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Move objects are immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Move objects are immutable")
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self  # Immutable: copies can share it
 
 
 class Creature:
@@ -65,6 +177,10 @@ class Creature:
     Represents a creature (similar to Pokemon)
     """
     
+    __slots__ = ('name', '_type', 'type_id', 'species_id', 'level', 'max_hp', 'attack',
+                 'defense', 'speed', 'current_hp', 'moves', 'status', 'shiny',
+                 'party_hook', 'party_slot')
+    
     def __init__(self, name, creature_type, level=5, max_hp=None, attack=None, 
                  defense=None, speed=None, moves=None):
         self.name = name
@@ -80,6 +196,20 @@ class Creature:
         self.current_hp = self.max_hp
         self.moves = moves or []
         self.status = None  # For status effects like poison, paralysis, etc.
+        self.species_id = None  # Set when spawned from a Species template
+        self.shiny = False
+        # Called as party_hook(party_slot, fainted) when HP changes (set by Player)
+        self.party_hook = None
+        self.party_slot = 0
+    
+    @property
+    def type(self):
+        return self._type
+    
+    @type.setter
+    def type(self, creature_type):
+        self._type = creature_type
+        self.type_id = type_id(creature_type)
         
     def is_fainted(self):
         """Check if creature has fainted"""
@@ -88,108 +218,290 @@ class Creature:
     def take_damage(self, damage):
         """Apply damage to the creature"""
         self.current_hp = max(0, self.current_hp - damage)
+        if self.party_hook is not None:
+            self.party_hook(self.party_slot, self.current_hp <= 0)
     
     def heal(self, amount):
         """Heal the creature"""
         self.current_hp = min(self.max_hp, self.current_hp + amount)
+        if self.party_hook is not None:
+            self.party_hook(self.party_slot, self.current_hp <= 0)
     
     def full_heal(self):
         """Fully restore HP"""
         self.current_hp = self.max_hp
         self.status = None
+        if self.party_hook is not None:
+            self.party_hook(self.party_slot, self.current_hp <= 0)
     
-    def calculate_damage(self, move, target):
+    def base_damage(self, move, target):
         """
-        Calculate damage dealt to target using a move.
-        Based on Pokemon damage formula (simplified).
+        Deterministic part of the damage formula: everything except the
+        accuracy check and the random factor. Constant while stats don't change.
         """
-        if random.randint(1, 100) > move.accuracy:
-            return 0  # Move missed
-        
-        # Base damage calculation
         level_factor = (2 * self.level / 5) + 2
         damage = (level_factor * move.power * (self.attack / target.defense)) / 50
         damage += 2
         
-        # Type effectiveness
-        effectiveness = 1.0
-        if move.type in TYPE_EFFECTIVENESS:
-            if target.type in TYPE_EFFECTIVENESS[move.type]:
-                effectiveness = TYPE_EFFECTIVENESS[move.type][target.type]
-        
-        # STAB (Same Type Attack Bonus)
-        if move.type == self.type:
-            damage *= 1.5
+        # STAB (Same Type Attack Bonus) and type effectiveness
+        damage *= move.multipliers[self.type_id][target.type_id]
+        return damage
+    
+    def calculate_damage(self, move, target, rng=None):
+        """
+        Calculate damage dealt to target using a move.
+        Based on Pokemon damage formula (simplified).
+        rng is the random generator to roll with (defaults to the random module).
+        """
+        if rng is None:
+            rng = random
         
-        damage *= effectiveness
+        # Misses with probability (100 - accuracy)%
+        if rng.random() * 100 >= move.accuracy:
+            return 0  # Move missed
         
         # Random factor (85-100%)
-        damage *= random.uniform(0.85, 1.0)
+        return int(self.base_damage(move, target) * rng.uniform(0.85, 1.0))
+    
+    def to_dict(self):
+        """Convert creature to a JSON-friendly dict (save files, battle recordings)"""
+        return {
+            'name': self.name,
+            'type': self.type,
+            'species_id': self.species_id,
+            'level': self.level,
+            'max_hp': self.max_hp,
+            'current_hp': self.current_hp,
+            'attack': self.attack,
+            'defense': self.defense,
+            'speed': self.speed,
+            'status': self.status,
+            'shiny': self.shiny,
+            'moves': [{'name': m.name, 'type': m.type, 'power': m.power, 'accuracy': m.accuracy}
+                      for m in self.moves],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a creature from a to_dict() dict"""
+        moves = [get_move(m['name'], m['type'], m['power'], m['accuracy'])
+                 for m in data['moves']]
         
-        return int(damage)
+        creature = cls(
+            data['name'],
+            data['type'],
+            data['level'],
+            data['max_hp'],
+            data['attack'],
+            data['defense'],
+            data['speed'],
+            moves
+        )
+        creature.current_hp = data['current_hp']
+        creature.status = data.get('status')
+        creature.species_id = data.get('species_id')
+        creature.shiny = data.get('shiny', False)
+        return creature
     
     def __str__(self):
         return f"{self.name} (Lv.{self.level}) - {self.current_hp}/{self.max_hp} HP"
 
 
+class Species:
+    """
+    Immutable template that creatures of one species are spawned from.
+    Stats left as None are derived from the level, as in Creature.
+    """
+    
+    __slots__ = ('id', 'name', 'type', 'type_id', 'moves', 'level', 'max_hp', 'attack',
+                 'defense', 'speed', 'wild_levels')
+    
+    def __init__(self, species_id, name, creature_type, moves, level=5, max_hp=None,
+                 attack=None, defense=None, speed=None, wild_levels=None):
+        set_field = object.__setattr__
+        set_field(self, 'id', species_id)
+        set_field(self, 'name', name)
+        set_field(self, 'type', creature_type)
+        set_field(self, 'type_id', type_id(creature_type))
+        set_field(self, 'moves', tuple(moves))
+        set_field(self, 'level', level)
+        set_field(self, 'max_hp', max_hp)
+        set_field(self, 'attack', attack)
+        set_field(self, 'defense', defense)
+        set_field(self, 'speed', speed)
+        set_field(self, 'wild_levels', wild_levels)  # (min, max) level when found in the wild
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Species templates are immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Species templates are immutable")
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self  # Immutable: copies can share it
+    
+    def spawn(self, level=None, rng=None):
+        """
+        Create a new creature of this species.
+        If no level is given, wild species roll one from wild_levels
+        using rng (defaults to the random module).
+        The new creature shares this template's Move objects.
+        """
+        if level is None:
+            if self.wild_levels is None:
+                level = self.level
+            else:
+                level = (rng or random).randint(*self.wild_levels)
+        
+        # Fast clone path: fill the slots directly instead of going through __init__
+        creature = Creature.__new__(Creature)
+        creature.name = self.name
+        creature._type = self.type
+        creature.type_id = self.type_id
+        creature.species_id = self.id
+        creature.level = level
+        creature.max_hp = self.max_hp or (20 + level * 5)
+        creature.attack = self.attack or (5 + level * 2)
+        creature.defense = self.defense or (5 + level * 2)
+        creature.speed = self.speed or (5 + level * 2)
+        creature.current_hp = creature.max_hp
+        creature.moves = list(self.moves)
+        creature.status = None
+        creature.shiny = False
+        creature.party_hook = None
+        creature.party_slot = 0
+        return creature
+
+
+# Shared Move instances, keyed by move name
+MOVES = {}
+
+# Species templates, indexed by species id
+SPECIES = []
+SPECIES_BY_NAME = {}
+
+
+def register_move(name, move_type, power, accuracy=100, priority=0):
+    """Create the shared Move instance for a move name"""
+    move = Move(name, move_type, power, accuracy, priority)
+    MOVES[name] = move
+    return move
+
+
+def get_move(name, move_type, power, accuracy=100):
+    """Get the shared Move with these fields, or a new Move if none matches"""
+    move = MOVES.get(name)
+    if move is not None and (move.type, move.power, move.accuracy) == (move_type, power, accuracy):
+        return move
+    return Move(name, move_type, power, accuracy)
+
+
+def register_species(name, creature_type, move_names, **template):
+    """Add a species template to the registry; moves are given by name"""
+    species = Species(len(SPECIES), name, creature_type,
+                      [MOVES[move_name] for move_name in move_names], **template)
+    SPECIES.append(species)
+    SPECIES_BY_NAME[name] = species
+    return species
+
+
+def spawn(species_id, level=None, rng=None):
+    """Create a new creature from the species with this id"""
+    return SPECIES[species_id].spawn(level, rng)
+
+
+register_move("Scratch", CreatureType.NORMAL, 40)
+register_move("Tackle", CreatureType.NORMAL, 40)
+register_move("Quick Attack", CreatureType.NORMAL, 40, priority=1)
+register_move("Ember", CreatureType.FIRE, 40)
+register_move("Water Gun", CreatureType.WATER, 40)
+register_move("Vine Whip", CreatureType.GRASS, 45)
+register_move("Thunder Shock", CreatureType.ELECTRIC, 40)
+register_move("Peck", CreatureType.FLYING, 35)
+
+
 # Predefined creatures similar to starter Pokemon
 STARTER_CREATURES = {
-    "Flamepup": Creature(
+    "Flamepup": register_species(
         "Flamepup",
         CreatureType.FIRE,
+        ["Scratch", "Ember"],
         level=5,
         max_hp=25,
         attack=12,
         defense=8,
         speed=11,
-        moves=[
-            Move("Scratch", CreatureType.NORMAL, 40),
-            Move("Ember", CreatureType.FIRE, 40),
-        ]
     ),
-    "Aquatail": Creature(
+    "Aquatail": register_species(
         "Aquatail",
         CreatureType.WATER,
+        ["Tackle", "Water Gun"],
         level=5,
         max_hp=24,
         attack=10,
         defense=11,
         speed=9,
-        moves=[
-            Move("Tackle", CreatureType.NORMAL, 40),
-            Move("Water Gun", CreatureType.WATER, 40),
-        ]
     ),
-    "Leafsprout": Creature(
+    "Leafsprout": register_species(
         "Leafsprout",
         CreatureType.GRASS,
+        ["Tackle", "Vine Whip"],
         level=5,
         max_hp=26,
         attack=11,
         defense=10,
         speed=10,
-        moves=[
-            Move("Tackle", CreatureType.NORMAL, 40),
-            Move("Vine Whip", CreatureType.GRASS, 45),
-        ]
     ),
 }
 
 
 # Wild creatures that can be encountered
-WILD_CREATURES = [
-    lambda: Creature("Rockbug", CreatureType.ROCK, level=random.randint(2, 6),
-                     moves=[Move("Tackle", CreatureType.NORMAL, 40)]),
-    lambda: Creature("Sparkrat", CreatureType.ELECTRIC, level=random.randint(3, 7),
-                     moves=[Move("Quick Attack", CreatureType.NORMAL, 40),
-                            Move("Thunder Shock", CreatureType.ELECTRIC, 40)]),
-    lambda: Creature("Sandmole", CreatureType.GROUND, level=random.randint(2, 5),
-                     moves=[Move("Scratch", CreatureType.NORMAL, 40)]),
-    lambda: Creature("Windbird", CreatureType.FLYING, level=random.randint(3, 6),
-                     moves=[Move("Peck", CreatureType.FLYING, 35)]),
-]
-
-
-def get_random_wild_creature():
-    """Generate a random wild creature"""
-    return random.choice(WILD_CREATURES)()
+WILD_CREATURES = (
+    register_species("Rockbug", CreatureType.ROCK, ["Tackle"], wild_levels=(2, 6)),
+    register_species("Sparkrat", CreatureType.ELECTRIC, ["Quick Attack", "Thunder Shock"],
+                     wild_levels=(3, 7)),
+    register_species("Sandmole", CreatureType.GROUND, ["Scratch"], wild_levels=(2, 5)),
+    register_species("Windbird", CreatureType.FLYING, ["Peck"], wild_levels=(3, 6)),
+)
+
+
+@lru_cache(maxsize=None)
+def shiny_chance():
+    """
+    Chance that a wild creature is a shiny variant, from creature_spawns.yaml.
+    Loaded on first use, so importing this module doesn't need PyYAML.
+    """
+    from config_loader import load_config
+    return load_config("creature_spawns")['shiny_variants']['base_probability']
+
+
+# Creature types found in each habitat (the tile types of the world map)
+HABITAT_TYPES = {
+    "water": (CreatureType.WATER, CreatureType.ELECTRIC),
+    "rock": (CreatureType.ROCK, CreatureType.GROUND),
+    "grass": (CreatureType.GRASS, CreatureType.NORMAL, CreatureType.FLYING, CreatureType.GROUND),
+}
+
+
+def wild_species_for(environment=None):
+    """
+    Get the wild species that can appear in an environment.
+    Falls back to every wild species if the environment is unknown
+    or none of its types are found in the wild.
+    """
+    if environment is None:
+        return WILD_CREATURES
+    types = HABITAT_TYPES.get(environment, ())
+    return tuple(s for s in WILD_CREATURES if s.type in types) or WILD_CREATURES
+
+
+def get_random_wild_creature(environment=None, rng=None):
+    """Generate a random wild creature (shiny with chance shiny_chance())"""
+    if rng is None:
+        rng = random
+    creature = rng.choice(wild_species_for(environment)).spawn(rng=rng)
+    creature.shiny = rng.random() < shiny_chance()
+    return creature
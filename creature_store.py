@@ -0,0 +1,278 @@
+"""
+Columnar creature storage for Trapper-Mastering.
+Packs large creature collections (like the PC box) into typed arrays
+instead of keeping one Creature object per stored creature.
+"""
+
+from array import array
+
+from creature import Creature, TYPE_NAMES
+
+# Stats are stored in unsigned 16-bit ('H') columns
+MAX_STAT = 0xFFFF
+STAT_COLUMNS = ('level', 'max_hp', 'current_hp', 'attack', 'defense', 'speed')
+
+
+def check_stat(name, value):
+    """Return value if a stat column can hold it; raises ValueError otherwise"""
+    if not 0 <= value <= MAX_STAT:
+        raise ValueError(f"{name} {value} is outside the storable range 0-{MAX_STAT}")
+    return value
+
+
+def _column(name, doc):
+    """Property reading/writing one column of the view's row"""
+    def fget(self):
+        store = self._store
+        row = self._row if self._generation == store.generation else self._current_row()
+        return getattr(store, name)[row]
+
+    def fset(self, value):
+        store, row = self._store, self._current_row()
+        getattr(store, name)[row] = check_stat(name, value)
+        store.changed.add(row)
+
+    return property(fget, fset, doc=doc)
+
+
+class CreatureView:
+    """
+    Lightweight handle to one row of a CreatureStore.
+    Behaves like a Creature for battles and menus; changes write
+    straight back into the store. A view goes stale when a pop removes
+    its row or moves it (pops of earlier rows); using a stale view
+    raises ValueError instead of reading another creature's row.
+    """
+
+    __slots__ = ('_store', '_row', '_generation', 'party_hook', 'party_slot')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+        self._generation = store.generation  # Store pops this view has been checked against
+        self.party_hook = None  # See Creature.party_hook
+        self.party_slot = 0
+
+    def _current_row(self):
+        """The view's row, after checking that no pop since the last check moved it"""
+        store = self._store
+        if self._generation != store.generation:
+            if any(popped <= self._row for popped in store.popped[self._generation:]):
+                raise ValueError("stale creature view: its row was removed or moved by a pop")
+            self._generation = store.generation
+        return self._row
+
+    level = _column('level', "Creature level")
+    max_hp = _column('max_hp', "Maximum HP")
+    current_hp = _column('current_hp', "Current HP")
+    attack = _column('attack', "Attack stat")
+    defense = _column('defense', "Defense stat")
+    speed = _column('speed', "Speed stat")
+    type_id = _column('type_id', "Interned TypeId")
+
+    @property
+    def name(self):
+        return self._store.species_names[self._store.species[self._current_row()]]
+
+    @property
+    def type(self):
+        return TYPE_NAMES[self._store.type_id[self._current_row()]]
+
+    @property
+    def moves(self):
+        return self._store.get_moves(self._current_row())
+
+    @property
+    def status(self):
+        return self._store.status_names[self._store.status[self._current_row()]]
+
+    @status.setter
+    def status(self, status):
+        store, row = self._store, self._current_row()
+        store.status[row] = store.intern_status(status)
+        store.changed.add(row)
+
+    @property
+    def shiny(self):
+        return bool(self._store.shiny[self._current_row()])
+
+    # Game logic is shared with Creature; it only touches the attributes above
+    is_fainted = Creature.is_fainted
+    take_damage = Creature.take_damage
+    heal = Creature.heal
+    full_heal = Creature.full_heal
+    base_damage = Creature.base_damage
+    calculate_damage = Creature.calculate_damage
+    __str__ = Creature.__str__
+
+    def to_creature(self):
+        """Build a standalone Creature from this row"""
+        return self._store.materialize(self._current_row())
+
+    def to_dict(self):
+        """Creature.to_dict() of this row (species_id is not stored)"""
+        return self.to_creature().to_dict()
+
+
+class CreatureStore:
+    """
+    Struct-of-arrays storage for creatures.
+    Each stat is one typed array; species names, statuses and moves are
+    interned into small tables and referenced by id. Supports the list
+    operations the game uses on the PC box (append, len, index, iterate, pop).
+    Stats must fit their columns (0 to MAX_STAT); others raise ValueError.
+    """
+
+    MAX_MOVES = 4
+    NO_MOVE = -1
+    view_class = CreatureView
+
+    def __init__(self, creatures=()):
+        self.species = array('H')
+        self.type_id = array('B')
+        self.level = array('H')
+        self.max_hp = array('H')
+        self.current_hp = array('H')
+        self.attack = array('H')
+        self.defense = array('H')
+        self.speed = array('H')
+        self.status = array('B')
+        self.shiny = array('B')
+        self.moves = array('h')  # MAX_MOVES ids per row, NO_MOVE = empty slot
+
+        self.species_names = []
+        self._species_ids = {}
+        self.move_table = []
+        self._move_ids = {}
+        self.status_names = [None]
+        self._status_ids = {None: 0}
+        # Rows removed by pop(), in order; views use them to detect that they went stale
+        self.popped = array('I')
+        self.generation = 0
+        # Rows written through views since a save last cleared it (see Game._box_dicts)
+        self.changed = set()
+
+        for creature in creatures:
+            self.append(creature)
+
+    def __len__(self):
+        return len(self.level)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("creature store index out of range")
+        return self.view_class(self, index)
+
+    def __iter__(self):
+        view_class = self.view_class
+        for row in range(len(self)):
+            yield view_class(self, row)
+
+    def intern_species(self, name):
+        """Get the id for a species name, adding it if new"""
+        species_id = self._species_ids.get(name)
+        if species_id is None:
+            species_id = self._species_ids[name] = len(self.species_names)
+            self.species_names.append(name)
+        return species_id
+
+    def intern_move(self, move):
+        """Get the id for a move, adding it if new"""
+        key = (move.name, move.type, move.power, move.accuracy)
+        move_id = self._move_ids.get(key)
+        if move_id is None:
+            move_id = self._move_ids[key] = len(self.move_table)
+            self.move_table.append(move)
+        return move_id
+
+    def intern_status(self, status):
+        """Get the id for a status condition, adding it if new"""
+        status_id = self._status_ids.get(status)
+        if status_id is None:
+            status_id = self._status_ids[status] = len(self.status_names)
+            self.status_names.append(status)
+        return status_id
+
+    def append(self, creature):
+        """Pack a creature into a new row and return the row index"""
+        if len(creature.moves) > self.MAX_MOVES:
+            raise ValueError(f"{creature.name} knows more than {self.MAX_MOVES} moves")
+        # Checked before any column grows, so a bad creature leaves no partial row
+        for name in STAT_COLUMNS:
+            check_stat(name, getattr(creature, name))
+
+        self.species.append(self.intern_species(creature.name))
+        self.type_id.append(creature.type_id)
+        self.level.append(creature.level)
+        self.max_hp.append(creature.max_hp)
+        self.current_hp.append(creature.current_hp)
+        self.attack.append(creature.attack)
+        self.defense.append(creature.defense)
+        self.speed.append(creature.speed)
+        self.status.append(self.intern_status(creature.status))
+        self.shiny.append(creature.shiny)
+
+        move_ids = [self.intern_move(m) for m in creature.moves]
+        move_ids += [self.NO_MOVE] * (self.MAX_MOVES - len(move_ids))
+        self.moves.extend(move_ids)
+        return len(self) - 1
+
+    def get_moves(self, row):
+        """Get the (shared) Move objects known by a row"""
+        start = row * self.MAX_MOVES
+        return [self.move_table[m] for m in self.moves[start:start + self.MAX_MOVES]
+                if m != self.NO_MOVE]
+
+    def materialize(self, row):
+        """Build a standalone Creature from a row"""
+        creature = Creature(
+            self.species_names[self.species[row]],
+            TYPE_NAMES[self.type_id[row]],
+            self.level[row],
+            self.max_hp[row],
+            self.attack[row],
+            self.defense[row],
+            self.speed[row],
+            self.get_moves(row),
+        )
+        creature.current_hp = self.current_hp[row]
+        creature.status = self.status_names[self.status[row]]
+        creature.shiny = bool(self.shiny[row])
+        return creature
+
+    def pop(self, index=-1):
+        """Remove a row and return it as a standalone Creature"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pop index out of range")
+
+        creature = self.materialize(index)
+        for column in (self.species, self.type_id, self.level, self.max_hp,
+                       self.current_hp, self.attack, self.defense, self.speed,
+                       self.status, self.shiny):
+            del column[index]
+        start = index * self.MAX_MOVES
+        del self.moves[start:start + self.MAX_MOVES]
+        self.popped.append(index)
+        self.generation += 1
+        return creature
+
+    def copy(self):
+        """
+        Plain CreatureStore holding the same rows, built with one array copy
+        per column, so it is cheap to take even for a large PC box
+        """
+        store = CreatureStore()
+        for name in ('species', 'type_id', 'level', 'max_hp', 'current_hp', 'attack',
+                     'defense', 'speed', 'status', 'shiny', 'moves'):
+            setattr(store, name, getattr(self, name)[:])
+        store.species_names = list(self.species_names)
+        store._species_ids = dict(self._species_ids)
+        store.move_table = list(self.move_table)
+        store._move_ids = dict(self._move_ids)
+        store.status_names = list(self.status_names)
+        store._status_ids = dict(self._status_ids)
+        return store
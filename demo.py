@@ -25,17 +25,7 @@ def demo_game():
     
     # Add a starter creature
     print("2. Choosing starter creature: Flamepup (Fire type)")
-    starter = STARTER_CREATURES["Flamepup"]
-    player_starter = Creature(
-        starter.name,
-        starter.type,
-        starter.level,
-        starter.max_hp,
-        starter.attack,
-        starter.defense,
-        starter.speed,
-        starter.moves.copy()
-    )
+    player_starter = STARTER_CREATURES["Flamepup"].spawn()
     player.add_creature(player_starter)
     print(f"   {player_starter}")
     print(f"   Type: {player_starter.type}")
@@ -4,11 +4,19 @@ A Pokemon-like game where you catch creatures using traps.
 """
 
 import random
-import json
 import os
-from creature import STARTER_CREATURES, get_random_wild_creature, Creature, Move
+import time
+from creature import STARTER_CREATURES, get_random_wild_creature, Creature
 from player import Player
+from creature_store import CreatureStore
+from sqlite_box import SQLiteBox
 from battle import Battle, BattleResult
+from save_binary import open_save
+from save_journal import ChangedList
+from save_slots import SaveSlots, SLOT_DIR, MAX_SLOTS, describe_slot
+
+# Save file: a JSON snapshot with its savegame.journal, or a binary save if it ends in .sav
+SAVE_FILE = 'savegame.json'
 
 
 class Game:
@@ -16,8 +24,23 @@ class Game:
     Main game class managing game state and flow
     """
     
-    def __init__(self):
+    def __init__(self, rng=None, save_path=SAVE_FILE, slot_dir=SLOT_DIR, box_path=None):
         self.player = None
+        # SQLite file for a new game's PC box (None keeps the box in memory);
+        # loaded games reopen the box file their save refers to
+        self.box_path = box_path
+        # SaveJournal or BinarySave, picked by the save file's extension;
+        # the save menus switch it to one of the save slots
+        self.saves = open_save(save_path)
+        self.slots = SaveSlots(slot_dir)
+        # (PC box, its pop generation, ChangedList of its creature dicts) at the last snapshot
+        self._box_rows = None
+        # Seconds played before this session (from the loaded save)
+        self.playtime_before = 0
+        self.clock = time.monotonic
+        self.session_start = self.clock()
+        # Random generator for encounters and battles (defaults to the random module)
+        self.rng = rng if rng is not None else random
         self.current_location = "Starting Town"
         self.locations = {
             "Starting Town": {
@@ -51,7 +74,7 @@ class Game:
         if not player_name:
             player_name = "Trainer"
         
-        self.player = Player(player_name)
+        self.player = self._new_player(player_name, self.box_path)
         
         # Choose starter creature
         print(f"\nHello, {player_name}!")
@@ -69,18 +92,8 @@ class Game:
                 choice = int(input("Choose your starter (1-3): "))
                 if 1 <= choice <= len(starters):
                     starter_name = starters[choice - 1]
-                    # Create a copy of the starter
-                    starter = STARTER_CREATURES[starter_name]
-                    player_starter = Creature(
-                        starter.name,
-                        starter.type,
-                        starter.level,
-                        starter.max_hp,
-                        starter.attack,
-                        starter.defense,
-                        starter.speed,
-                        starter.moves.copy()
-                    )
+                    # Spawn the starter from its species template
+                    player_starter = STARTER_CREATURES[starter_name].spawn()
                     self.player.add_creature(player_starter)
                     print(f"\nYou chose {starter_name}! Great choice!")
                     break
@@ -120,7 +133,7 @@ class Game:
             elif choice == "5":
                 self.heal_creatures()
             elif choice == "6":
-                self.save_game()
+                self.save_menu()
             elif choice == "7":
                 print("\nThanks for playing Trapper-Mastering!")
                 break
@@ -192,8 +205,8 @@ class Game:
         
         print("\nSearching for wild creatures...")
         
-        if random.random() < encounter_rate:
-            wild_creature = get_random_wild_creature()
+        if self.rng.random() < encounter_rate:
+            wild_creature = get_random_wild_creature(rng=self.rng)
             print(f"\nA wild {wild_creature.name} (Lv.{wild_creature.level}) appeared!")
             self.start_battle(wild_creature)
         else:
@@ -205,7 +218,7 @@ class Game:
             print("\nAll your creatures have fainted! Heal them first!")
             return
         
-        battle = Battle(self.player, wild_creature)
+        battle = Battle(self.player, wild_creature, rng=self.rng)
         
         while battle.result == BattleResult.ONGOING:
             self.battle_menu(battle)
@@ -276,8 +289,8 @@ class Game:
     
     def battle_trap_menu(self, battle):
         """Show trap menu and attempt to catch"""
-        traps = [(name, count) for name, count in self.player.inventory.items() 
-                 if "Trap" in name]
+        inventory = self.player.inventory
+        traps = [(name, inventory[name]) for name in inventory.category('trap')]
         
         if not traps:
             print("\nYou don't have any traps!")
@@ -299,8 +312,8 @@ class Game:
     
     def battle_item_menu(self, battle):
         """Show item menu and use item"""
-        heal_items = [(name, count) for name, count in self.player.inventory.items() 
-                      if "Potion" in name]
+        inventory = self.player.inventory
+        heal_items = [(name, inventory[name]) for name in inventory.category('heal')]
         
         if not heal_items:
             print("\nYou don't have any healing items!")
@@ -339,20 +352,61 @@ class Game:
             else:
                 print("Cancelled.")
     
+    def playtime(self):
+        """Total seconds played, including earlier sessions"""
+        return self.playtime_before + round(self.clock() - self.session_start)
+    
+    def print_slots(self):
+        """List the save slots (from the slot index); returns {slot: header}"""
+        headers = dict(self.slots.list_slots())
+        for slot, header in headers.items():
+            print(describe_slot(slot, header))
+        return headers
+    
+    def save_menu(self):
+        """Pick a save slot and save to it (later saves to the same slot journal only changes)"""
+        print("\n" + "=" * 60)
+        print("SAVE GAME")
+        print("=" * 60)
+        headers = self.print_slots()
+        # Default to the slot in use, else the first free one
+        default = getattr(self.saves, 'slot', None) or min(set(range(1, MAX_SLOTS + 1)) - set(headers), default=1)
+        
+        try:
+            choice = input(f"\nSave to slot (1-{MAX_SLOTS}, Enter for {default}): ").strip()
+            slot = int(choice) if choice else default
+            if not 1 <= slot <= MAX_SLOTS:
+                raise ValueError
+        except ValueError:
+            print("Invalid slot.")
+            return
+        self.saves = self.slots.slot(slot)
+        self.save_game()
+    
+    def load_menu(self):
+        """Pick a save slot and load it (falls back to the single save file without slots)"""
+        print("\n" + "=" * 60)
+        print("LOAD GAME")
+        print("=" * 60)
+        headers = self.print_slots()
+        if not headers:
+            self.load_game()
+            return
+        
+        try:
+            slot = int(input("\nLoad slot: "))
+        except ValueError:
+            slot = None
+        if slot not in headers:
+            print("No such save slot.")
+            return
+        self.saves = self.slots.slot(slot)
+        self.load_game()
+    
     def save_game(self):
-        """Save game to file"""
+        """Save game to file (only the changes since the last save are written)"""
         try:
-            save_data = {
-                'player_name': self.player.name,
-                'money': self.player.money,
-                'location': self.current_location,
-                'party': [self._serialize_creature(c) for c in self.player.party],
-                'inventory': self.player.inventory,
-            }
-            
-            with open('savegame.json', 'w') as f:
-                json.dump(save_data, f, indent=2)
-            
+            self.saves.save(self._save_state())
             print("\nGame saved successfully!")
         except Exception as e:
             print(f"\nError saving game: {e}")
@@ -360,18 +414,7 @@ class Game:
     def load_game(self):
         """Load game from file"""
         try:
-            with open('savegame.json', 'r') as f:
-                save_data = json.load(f)
-            
-            self.player = Player(save_data['player_name'])
-            self.player.money = save_data['money']
-            self.current_location = save_data['location']
-            self.player.inventory = save_data['inventory']
-            
-            for creature_data in save_data['party']:
-                creature = self._deserialize_creature(creature_data)
-                self.player.add_creature(creature)
-            
+            self._restore_state(self.saves.load())
             print("\nGame loaded successfully!")
             self.main_menu()
             
@@ -380,38 +423,98 @@ class Game:
         except Exception as e:
             print(f"\nError loading game: {e}")
     
+    def _save_state(self):
+        """Current game state as a save dict"""
+        return self._serialize_snapshot(self._snapshot_state())
+    
+    def _snapshot_state(self):
+        """
+        Copy of the game state that later play doesn't change, cheap enough
+        to take every frame (see autosave.py). Only the PC box creatures
+        changed since the last snapshot are serialized again (see
+        _box_dicts). A SQLiteBox keeps itself on disk, so it is flushed and
+        only its path goes in the save.
+        """
+        pc_box = self.player.pc_box
+        snapshot = {
+            'player_name': self.player.name,
+            'money': self.player.money,
+            'location': self.current_location,
+            'playtime': self.playtime(),
+            'party': [self._serialize_creature(c) for c in self.player.party],
+            'inventory': dict(self.player.inventory),
+        }
+        if isinstance(pc_box, SQLiteBox):
+            pc_box.flush()  # On this thread: the connection can't be shared with a save worker
+            snapshot['pc_box_path'] = pc_box.path
+        else:
+            snapshot['pc_box'] = self._box_dicts(pc_box)
+        return snapshot
+    
+    def _box_dicts(self, pc_box):
+        """
+        Creature dicts of an in-memory PC box, as a ChangedList against the
+        last snapshot's. For a CreatureStore only rows appended, moved by a
+        pop or written through a view since then are serialized again; the
+        dicts of other rows are shared, so never change them in place.
+        """
+        serialize = self._serialize_creature
+        if self._box_rows is None or self._box_rows[0] is not pc_box:
+            rows = ChangedList(serialize(c) for c in pc_box)
+        else:
+            _, generation, previous = self._box_rows
+            # Rows from the first one a pop moved (or the first appended one) on are all new
+            first = min(min(pc_box.popped[generation:], default=len(previous)), len(previous), len(pc_box))
+            changed = sorted(row for row in pc_box.changed if row < first)
+            rows = ChangedList(previous[:first], base=previous,
+                               changed=changed + list(range(first, len(pc_box))))
+            for row in changed:
+                rows[row] = serialize(pc_box[row])
+            rows.extend(serialize(pc_box[row]) for row in range(first, len(pc_box)))
+        if isinstance(pc_box, CreatureStore):
+            pc_box.changed.clear()
+            self._box_rows = (pc_box, pc_box.generation, rows)
+        return rows
+    
+    def _serialize_snapshot(self, snapshot):
+        """Save dict from a _snapshot_state() copy (already save data; kept for AutoSaver)"""
+        return dict(snapshot)
+    
+    def _restore_state(self, save_data):
+        """Rebuild the player and location from a save dict"""
+        # A SQLite box is reopened from its file rather than loaded
+        self.player = self._new_player(save_data['player_name'], save_data.get('pc_box_path'))
+        self.player.money = save_data['money']
+        self.current_location = save_data['location']
+        self.player.inventory = save_data['inventory']
+        self.playtime_before = save_data.get('playtime', 0)
+        self.session_start = self.clock()
+        
+        for creature_data in save_data['party']:
+            creature = self._deserialize_creature(creature_data)
+            self.player.add_creature(creature)
+        
+        # Binary saves stream the box in; older saves don't have one
+        for creature_data in save_data.get('pc_box', ()):
+            self.player.pc_box.append(self._deserialize_creature(creature_data))
+    
+    def _new_player(self, name, box_path):
+        """Player replacing the current one, with its PC box in SQLite at box_path if given"""
+        self.close()
+        return Player(name, pc_box=SQLiteBox(box_path) if box_path else None)
+    
+    def close(self):
+        """Write out and close the player's SQLite PC box, if they have one"""
+        if self.player is not None and isinstance(self.player.pc_box, SQLiteBox):
+            self.player.pc_box.close()
+    
     def _serialize_creature(self, creature):
         """Convert creature to dict for saving"""
-        return {
-            'name': creature.name,
-            'type': creature.type,
-            'level': creature.level,
-            'max_hp': creature.max_hp,
-            'current_hp': creature.current_hp,
-            'attack': creature.attack,
-            'defense': creature.defense,
-            'speed': creature.speed,
-            'moves': [{'name': m.name, 'type': m.type, 'power': m.power, 'accuracy': m.accuracy} 
-                     for m in creature.moves],
-        }
+        return creature.to_dict()
     
     def _deserialize_creature(self, data):
         """Convert dict to creature"""
-        moves = [Move(m['name'], m['type'], m['power'], m['accuracy']) 
-                for m in data['moves']]
-        
-        creature = Creature(
-            data['name'],
-            data['type'],
-            data['level'],
-            data['max_hp'],
-            data['attack'],
-            data['defense'],
-            data['speed'],
-            moves
-        )
-        creature.current_hp = data['current_hp']
-        return creature
+        return Creature.from_dict(data)
 
 
 def main():
@@ -427,14 +530,17 @@ def main():
     
     choice = input("\nChoice: ").strip()
     
-    if choice == "1":
-        game.start_new_game()
-    elif choice == "2":
-        game.load_game()
-    elif choice == "3":
-        print("\nGoodbye!")
-    else:
-        print("\nInvalid choice.")
+    try:
+        if choice == "1":
+            game.start_new_game()
+        elif choice == "2":
+            game.load_menu()
+        elif choice == "3":
+            print("\nGoodbye!")
+        else:
+            print("\nInvalid choice.")
+    finally:
+        game.close()
 
 
 if __name__ == "__main__":
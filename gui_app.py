@@ -13,10 +13,12 @@ import random
 import pygame
 from pygame import Rect
 
-from creature import STARTER_CREATURES, Creature, get_random_wild_creature
-from player import Player, TRAP_TYPES, HEAL_ITEMS
+from creature import STARTER_CREATURES, get_random_wild_creature
+from player import Player, TRAP_TYPES
 from game import Game
 from battle import Battle, BattleResult
+from solver import battle_hint
+from autosave import AutoSaver
 
 WIDTH, HEIGHT = 900, 640
 BG = (40, 80, 40)
@@ -24,6 +26,10 @@ PANEL = (28, 48, 28)
 TEXT = (240, 240, 240)
 ACCENT = (200, 160, 40)
 FPS = 60
+# Battle hints are skipped for matchups with more (player HP x wild HP) states
+# than this: a first solve grows with the state count and runs on the render
+# thread (about one 60 FPS frame at the cap, see benchmarks/bench_battle_hint.py)
+HINT_MAX_STATES = 10_000
 
 # Tilemap / world settings for improved visuals
 TILE_SIZE = 48
@@ -68,20 +74,6 @@ class Button:
         return mouse_pressed[0] and self.rect.collidepoint(mouse_pos)
 
 
-def create_starter_copy(starter_template):
-    # Starter template is a Creature instance in STARTER_CREATURES
-    return Creature(
-        starter_template.name,
-        starter_template.type,
-        starter_template.level,
-        starter_template.max_hp,
-        starter_template.attack,
-        starter_template.defense,
-        starter_template.speed,
-        [m for m in starter_template.moves],
-    )
-
-
 def run():
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -160,6 +152,8 @@ def run():
 
     # Game model (lazily created when player chooses starter)
     game = None
+    # Background saver for game, so saving never stalls a frame
+    autosaver = None
     # Map / player movement state
     player_px = None
     player_py = None
@@ -174,6 +168,9 @@ def run():
     in_battle = False
     battle_message = ""
     battle_mode = "action"  # action, moves, trap, item
+    # Hint text and the battle state it was computed for (solved once per change)
+    hint_key = None
+    hint = ""
 
     running = True
     while running:
@@ -235,10 +232,11 @@ def run():
                     # Create game and player
                     player_name = "Player"  # could prompt via a text field in future
                     player = Player(player_name)
-                    starter_obj = create_starter_copy(starter)
+                    starter_obj = starter.spawn()
                     player.add_creature(starter_obj)
                     game = Game()
                     game.player = player
+                    autosaver = AutoSaver(game)
                     message = f"You chose {starter.name}! Welcome, {player_name}."
                     scene = SCENE_MAP
                     pygame.time.delay(180)
@@ -248,6 +246,7 @@ def run():
             if game is None:
                 draw_text(screen, "No game instance found.", (40, 40), font)
             else:
+                autosaver.tick(dt)
                 # Left panel: map / locations
                 panel = Rect(16, 16, 540, HEIGHT - 32)
                 pygame.draw.rect(screen, PANEL, panel)
@@ -262,12 +261,14 @@ def run():
                 # define location marker positions once
                 if not location_coords:
                     # lazy-create a simple procedural tile map and location markers
+                    # fixed-seed generator so the map is the same every run
+                    # without reseeding the global random module
                     tiles = []
-                    random.seed(1234)
+                    map_rng = random.Random(1234)
                     for ry in range(MAP_ROWS):
                         row = []
                         for rx in range(MAP_COLS):
-                            r = random.random()
+                            r = map_rng.random()
                             if r < 0.1:
                                 row.append("water")
                             elif r < 0.18:
@@ -369,7 +370,7 @@ def run():
                     move_accum += dt
                 if move_accum >= 1.0 and not in_battle:
                     rate = game.locations.get(game.current_location, {}).get('wild_encounter_rate', 0.0)
-                    if rate > 0 and random.random() < rate * 0.12:
+                    if rate > 0 and game.rng.random() < rate * 0.12:
                         # spawn a wild creature based on tile under player
                         def spawn_wild_at(wx, wy):
                             # determine tile type under player
@@ -380,23 +381,12 @@ def run():
                             except Exception:
                                 tile = "grass"
 
-                            # try to pick a creature whose type matches a simple habitat map
-                            habitat_map = {
-                                "water": ["Water", "Electric"],
-                                "rock": ["Rock", "Ground"],
-                                "grass": ["Grass", "Normal", "Flying", "Ground"],
-                            }
-
-                            preferred = habitat_map.get(tile, ["Normal"])
-                            for _ in range(8):
-                                c = get_random_wild_creature()
-                                if c.type in preferred:
-                                    return c
-                            return get_random_wild_creature()
+                            # pick a creature whose type matches the tile's habitat
+                            return get_random_wild_creature(environment=tile, rng=game.rng)
 
                         wild = spawn_wild_at(player_px, player_py)
                         # start a Battle instance
-                        battle = Battle(game.player, wild)
+                        battle = Battle(game.player, wild, rng=game.rng)
                         in_battle = True
                         battle_message = f"A wild {wild.name} appeared!"
                     move_accum = 0.0
@@ -434,6 +424,21 @@ def run():
             draw_text(screen, f"Your: {pc.name} (Lv.{pc.level})", (right.x + 8, right.y + 8), font)
             draw_text(screen, f"HP: {pc.current_hp}/{pc.max_hp}", (right.x + 8, right.y + 34), font)
             draw_text(screen, f"Type: {pc.type}", (right.x + 8, right.y + 58), font)
+            if battle.result == BattleResult.ONGOING and not pc.is_fainted():
+                # hint overlay: exact win odds when playing the best moves
+                wild = battle.wild_creature
+                key = (battle, pc, pc.current_hp, wild.current_hp, pc.status, wild.status)
+                if key != hint_key:
+                    hint_key = key
+                    hint = ""
+                    if pc.max_hp * wild.max_hp <= HINT_MAX_STATES:
+                        win_chance, best_move = battle_hint(battle)
+                        hint = f"Win odds: {win_chance:.0%}"
+                        if best_move is not None:
+                            hint += f" (try {best_move.name})"
+                        if pc.status or wild.status:
+                            hint += " - ignores status"
+                draw_text(screen, hint, (right.x + 8, right.y + 80), font, ACCENT)
 
             # action buttons
             btn_w = 88
@@ -488,19 +493,21 @@ def run():
 
             elif battle_mode == 'trap':
                 # show trap items from player inventory
-                inv_traps = [n for n in game.player.inventory.keys() if 'Trap' in n]
+                inv_traps = game.player.inventory.category('trap')
                 for i, tname in enumerate(inv_traps):
                     trect = Rect(sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36)
                     pygame.draw.rect(screen, (80, 120, 80), trect)
-                    draw_text(screen, f"{tname} x{game.player.get_item_count(tname)}", (trect.x + 6, trect.y + 8), font)
+                    chance = battle.get_catch_chance(tname)
+                    draw_text(screen, f"{tname} x{game.player.get_item_count(tname)} ({chance:.0%})", (trect.x + 6, trect.y + 8), font)
                     if mouse_pressed[0] and trect.collidepoint(mouse_pos):
                         caught = battle.attempt_catch(tname)
                         battle_message = 'Tried catching.'
                         battle_mode = 'action'
                         pygame.time.delay(120)
+                        break  # the throw may have removed tname from inv_traps
 
             elif battle_mode == 'item':
-                heal_items = [n for n in game.player.inventory.keys() if n in HEAL_ITEMS]
+                heal_items = game.player.inventory.category('heal')
                 for i, iname in enumerate(heal_items):
                     irect = Rect(sub.x + 12 + (i % 3) * 220, sub.y + 8 + (i // 3) * 44, 200, 36)
                     pygame.draw.rect(screen, (80, 80, 120), irect)
@@ -510,6 +517,7 @@ def run():
                         battle_message = 'Used item.'
                         battle_mode = 'action'
                         pygame.time.delay(120)
+                        break  # using the item may have removed it from heal_items
 
             # if battle ended, show result and a button to close overlay
             if battle.result != BattleResult.ONGOING:
@@ -533,6 +541,10 @@ def run():
 
         pygame.display.flip()
 
+    if autosaver is not None:
+        # Save on exit; close() waits for the write to finish
+        autosaver.request()
+        autosaver.close()
     pygame.quit()
 
 
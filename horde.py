@@ -0,0 +1,196 @@
+"""
+Horde and double battles for Trapper-Mastering.
+
+HordeBattle pits several player creatures against several wild creatures.
+Each round every active creature picks a move, and turns are popped from a
+heap ordered by move priority, then speed. Attackers target the weakest
+active foe, found through a lazily cleaned heap of (HP, creature) entries,
+so scheduling, targeting and faint handling cost O(log n) per action. HP
+changed outside the battle (healing, revives) is picked up when the
+creature's entry is next looked at.
+"""
+
+import heapq
+import random
+from collections import deque
+
+from battle import Battle, BattleResult, BattleEvent, RandomMovePolicy
+
+
+class HordeSide:
+    """
+    Creatures fighting on one side of a horde battle.
+    Up to slots creatures are active at once; the rest wait on the bench and
+    step in (in order) when an active creature faints.
+    """
+
+    def __init__(self, creatures, slots=None):
+        self.creatures = list(creatures)
+        fighters = [i for i, c in enumerate(self.creatures) if not c.is_fainted()]
+        slots = len(fighters) if slots is None else slots
+        self.active = set(fighters[:slots])
+        self.bench = deque(fighters[slots:])
+        self.alive = len(fighters)
+        self._targets = []  # (HP, seq, index); only each creature's latest entry counts
+        self._latest = {}  # index -> seq of its latest entry
+        self._down = set()  # Active creatures knocked out outside the battle loop
+        self._seq = 0
+        for index in self.active:
+            self.push_target(index)
+
+    def push_target(self, index):
+        """Record a creature's current HP in the target heap"""
+        self._seq += 1
+        self._latest[index] = self._seq
+        heapq.heappush(self._targets, (self.creatures[index].current_hp, self._seq, index))
+
+    def weakest(self):
+        """Index of the active creature with the lowest HP, or None"""
+        if self._down:
+            # Revived since they were set aside
+            for index in [i for i in self._down if self.creatures[i].current_hp > 0]:
+                self._down.discard(index)
+                if index in self.active:
+                    self.push_target(index)
+        targets = self._targets
+        while targets:
+            hp, seq, index = targets[0]
+            if index in self.active and self._latest[index] == seq:
+                current = self.creatures[index].current_hp
+                if current == hp and hp > 0:
+                    return index
+                heapq.heappop(targets)
+                # HP changed outside the battle: requeue at the new HP, or set aside at 0
+                if current > 0:
+                    self.push_target(index)
+                else:
+                    self._down.add(index)
+                continue
+            heapq.heappop(targets)
+        return None
+
+    def faint(self, index):
+        """Take a fainted creature out and send in the next benched one"""
+        self.active.discard(index)
+        self.alive -= 1
+        if self.bench:
+            replacement = self.bench.popleft()
+            self.active.add(replacement)
+            self.push_target(replacement)
+            return self.creatures[replacement]
+        return None
+
+
+class HordeBattle:
+    """
+    Battle between a player's party and a horde of wild creatures.
+    player_slots/wild_slots limit how many creatures fight at once
+    (2 and 2 for a double battle); by default everyone fights.
+    Events are kept as structured tuples, as in a headless Battle.
+    """
+
+    PLAYER = 0
+    WILD = 1
+
+    def __init__(self, player, wild_creatures, rng=None, player_slots=None, wild_slots=None,
+                 player_policy=None, wild_policy=None, log_size=None):
+        self.player = player
+        self.rng = rng if rng is not None else random
+        self.sides = (HordeSide(player.party, player_slots), HordeSide(wild_creatures, wild_slots))
+        self.policies = (player_policy or RandomMovePolicy(), wild_policy or RandomMovePolicy())
+        self._wild_ids = {id(c) for c in self.sides[self.WILD].creatures}
+        self.events = deque(maxlen=log_size or Battle.HEADLESS_LOG_SIZE)
+        self._record = self.events.append
+        self.rounds = 0
+        self.turns = 0  # moves executed
+        self.result = BattleResult.ONGOING
+        self._seq = 0
+        self._check_battle_end()
+
+    # Event rendering is shared with Battle
+    render_event = Battle.render_event
+
+    def is_wild(self, creature):
+        """Check if a creature fights on the wild side"""
+        return id(creature) in self._wild_ids
+
+    @property
+    def battle_log(self):
+        """Battle log messages rendered from the event buffer"""
+        return [self.render_event(event) for event in self.events]
+
+    def play_round(self):
+        """Every active creature picks a move; turns run by move priority, then speed"""
+        if self.result != BattleResult.ONGOING:
+            return
+        self.rounds += 1
+
+        queue = []
+        for side_index, side in enumerate(self.sides):
+            foes = self.sides[1 - side_index]
+            target_index = foes.weakest()
+            if target_index is None:
+                continue  # Nobody left standing on the other side
+            target = foes.creatures[target_index]
+            policy = self.policies[side_index]
+            for index in side.active:
+                creature = side.creatures[index]
+                if not creature.moves:
+                    continue
+                move = policy.choose_move(creature, target, self)
+                self._seq += 1
+                # Ties go to the player side, as in Battle.player_attack
+                heapq.heappush(queue, (-move.priority, -creature.speed, self._seq,
+                                       side_index, index, move))
+
+        while queue and self.result == BattleResult.ONGOING:
+            _, _, _, side_index, index, move = heapq.heappop(queue)
+            side = self.sides[side_index]
+            if index not in side.active:
+                continue  # fainted before its turn
+            self._execute_move(side.creatures[index], move, self.sides[1 - side_index])
+
+    def _execute_move(self, attacker, move, foes):
+        """Attack the weakest active foe"""
+        target_index = foes.weakest()
+        if target_index is None:
+            return
+        self.turns += 1
+        target = foes.creatures[target_index]
+        damage = attacker.calculate_damage(move, target, self.rng)
+
+        if damage == 0:
+            self._record((attacker, move, 0, BattleEvent.MISS))
+            return
+
+        target.take_damage(damage)
+        self._record((attacker, move, damage, BattleEvent.HIT))
+        if target.is_fainted():
+            self._record((target, None, 0, BattleEvent.FAINT))
+            replacement = foes.faint(target_index)
+            if replacement is not None and foes is self.sides[self.PLAYER]:
+                self._record((replacement, None, 0, BattleEvent.AUTO_SWITCH))
+            elif replacement is not None:
+                self._record((None, f"Wild {replacement.name} joined the fight!", 0, BattleEvent.MESSAGE))
+            self._check_battle_end()
+        else:
+            foes.push_target(target_index)
+
+    def _check_battle_end(self):
+        """Check if either side has no creatures left"""
+        if self.sides[self.WILD].alive == 0:
+            self.result = BattleResult.PLAYER_WIN
+            reward = sum(c.level for c in self.sides[self.WILD].creatures) * 10
+            self.player.money += reward
+            self._record((None, None, reward, BattleEvent.WIN))
+        elif self.sides[self.PLAYER].alive == 0:
+            self.result = BattleResult.PLAYER_LOSE
+            self._record((None, None, 0, BattleEvent.LOSE))
+
+    def run(self, max_rounds=200):
+        """Play rounds until the battle ends or max_rounds is reached"""
+        for _ in range(max_rounds):
+            if self.result != BattleResult.ONGOING:
+                break
+            self.play_round()
+        return self.result
@@ -0,0 +1,236 @@
+"""
+Indexed PC box for Trapper-Mastering.
+A CreatureStore that keeps secondary indexes by species, type, level
+bucket and shiny flag up to date as creatures are stored, so box queries
+and encyclopedia counts don't scan every stored creature.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+
+from creature import type_id
+from creature_store import CreatureStore, CreatureView, check_stat
+
+# Levels per level-bucket index entry
+LEVEL_BUCKET = 10
+
+_NO_ROWS = array('I')
+
+
+def _discard(rows, row):
+    """Remove row from a sorted row array if present"""
+    i = bisect_left(rows, row)
+    if i < len(rows) and rows[i] == row:
+        del rows[i]
+
+
+class IndexedView(CreatureView):
+    """CreatureView whose level and type writes keep the box indexes current"""
+
+    __slots__ = ()
+
+    @property
+    def level(self):
+        return self._store.level[self._current_row()]
+
+    @level.setter
+    def level(self, level):
+        self._store.set_level(self._current_row(), level)
+
+    @property
+    def type_id(self):
+        return self._store.type_id[self._current_row()]
+
+    @type_id.setter
+    def type_id(self, value):
+        self._store.set_type_id(self._current_row(), value)
+
+
+class IndexedBox(CreatureStore):
+    """
+    CreatureStore with secondary indexes: a sorted array of rows per
+    species id, TypeId and level bucket, plus one for shiny creatures.
+    append() extends the indexes in O(1), and so does pop() from the end;
+    popping from the middle renumbers the later rows in O(n).
+    """
+
+    view_class = IndexedView
+
+    def __init__(self, creatures=()):
+        self.by_species = {}
+        self.by_type = {}
+        self.by_level = {}
+        self.shiny_rows = array('I')
+        super().__init__(creatures)
+
+    @staticmethod
+    def _rows(index, key):
+        rows = index.get(key)
+        if rows is None:
+            rows = index[key] = array('I')
+        return rows
+
+    def _indexes_of(self, row):
+        """Every index row array that row belongs in"""
+        indexes = [
+            self._rows(self.by_species, self.species[row]),
+            self._rows(self.by_type, self.type_id[row]),
+            self._rows(self.by_level, self.level[row] // LEVEL_BUCKET),
+        ]
+        if self.shiny[row]:
+            indexes.append(self.shiny_rows)
+        return indexes
+
+    def _all_indexes(self):
+        yield from self.by_species.values()
+        yield from self.by_type.values()
+        yield from self.by_level.values()
+        yield self.shiny_rows
+
+    def append(self, creature):
+        row = super().append(creature)
+        # Rows only grow, so appending keeps every index sorted
+        for rows in self._indexes_of(row):
+            rows.append(row)
+        return row
+
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self):
+            for rows in self._indexes_of(index):
+                _discard(rows, index)
+        creature = super().pop(index)
+
+        if index < len(self):
+            # Rows after the removed one moved down by one
+            for rows in self._all_indexes():
+                start = bisect_right(rows, index)
+                if start < len(rows):
+                    rows[start:] = array('I', [row - 1 for row in rows[start:]])
+        return creature
+
+    def set_level(self, row, level):
+        """Change a stored creature's level, moving it to its new level bucket"""
+        check_stat('level', level)
+        old_bucket, new_bucket = self.level[row] // LEVEL_BUCKET, level // LEVEL_BUCKET
+        self.level[row] = level
+        self.changed.add(row)
+        if old_bucket != new_bucket:
+            _discard(self.by_level[old_bucket], row)
+            insort(self._rows(self.by_level, new_bucket), row)
+
+    def set_type_id(self, row, value):
+        """Change a stored creature's type, moving it to its new type index"""
+        old = self.type_id[row]
+        self.type_id[row] = value
+        self.changed.add(row)
+        if old != value:
+            _discard(self.by_type[old], row)
+            insort(self._rows(self.by_type, value), row)
+
+    def _level_rows(self, low, high):
+        """
+        Rows with low <= level <= high, sorted. Only the buckets at either
+        end of the range need their levels checked.
+        """
+        level = self.level
+        parts = []
+        for bucket in range(low // LEVEL_BUCKET, min(high, self._max_level()) // LEVEL_BUCKET + 1):
+            rows = self.by_level.get(bucket)
+            if not rows:
+                continue
+            if low <= bucket * LEVEL_BUCKET and bucket * LEVEL_BUCKET + LEVEL_BUCKET - 1 <= high:
+                parts.append(rows)
+            else:
+                parts.append([row for row in rows if low <= level[row] <= high])
+        if len(parts) == 1:
+            return list(parts[0])
+        # Each bucket is a sorted run, which sorted() merges without a full sort
+        return sorted(chain.from_iterable(parts))
+
+    def _level_size(self, low, high):
+        """Upper bound on the number of rows _level_rows returns"""
+        return sum(len(self.by_level.get(bucket, _NO_ROWS))
+                   for bucket in range(low // LEVEL_BUCKET, min(high, self._max_level()) // LEVEL_BUCKET + 1))
+
+    def _max_level(self):
+        """Highest level the level index can hold"""
+        return max(self.by_level, default=0) * LEVEL_BUCKET + LEVEL_BUCKET - 1
+
+    def query(self, species=None, creature_type=None, min_level=None, max_level=None,
+              shiny=None):
+        """
+        Rows of stored creatures matching every given criterion, in box order.
+        Levels are inclusive bounds. Starts from the smallest matching index
+        and filters it by the remaining criteria through the columns.
+        """
+        # Candidate (size, criterion) pairs; the smallest one is read from its index
+        candidates = []
+        species_id = type_key = None
+        if species is not None:
+            species_id = self._species_ids.get(species)
+            if species_id is None:
+                return []
+            candidates.append((len(self.by_species.get(species_id, _NO_ROWS)), 'species'))
+        if creature_type is not None:
+            type_key = type_id(creature_type)
+            candidates.append((len(self.by_type.get(type_key, _NO_ROWS)), 'type'))
+        if shiny:
+            candidates.append((len(self.shiny_rows), 'shiny'))
+        levels = min_level is not None or max_level is not None
+        if levels:
+            low = min_level if min_level is not None else 0
+            high = max_level if max_level is not None else self._max_level()
+            candidates.append((self._level_size(low, high), 'level'))
+
+        source = min(candidates)[1] if candidates else None
+        if source == 'species':
+            rows = self.by_species.get(species_id, _NO_ROWS)
+        elif source == 'type':
+            rows = self.by_type.get(type_key, _NO_ROWS)
+        elif source == 'shiny':
+            rows = self.shiny_rows
+        elif source == 'level':
+            rows = self._level_rows(low, high)
+        else:
+            rows = range(len(self))
+
+        if species_id is not None and source != 'species':
+            column = self.species
+            rows = [row for row in rows if column[row] == species_id]
+        if type_key is not None and source != 'type':
+            column = self.type_id
+            rows = [row for row in rows if column[row] == type_key]
+        if levels and source != 'level':
+            column = self.level
+            rows = [row for row in rows if low <= column[row] <= high]
+        if shiny is not None and source != 'shiny':
+            column = self.shiny
+            rows = [row for row in rows if column[row] == shiny]
+        return list(rows)
+
+    def find(self, **criteria):
+        """Views of the stored creatures matching query(**criteria)"""
+        view_class = self.view_class
+        return [view_class(self, row) for row in self.query(**criteria)]
+
+    def count(self, **criteria):
+        """Number of stored creatures matching query(**criteria)"""
+        if len(criteria) == 1:
+            # Single-index counts are O(1)
+            (name, value), = criteria.items()
+            if name == 'species':
+                species_id = self._species_ids.get(value)
+                return 0 if species_id is None else len(self.by_species.get(species_id, _NO_ROWS))
+            if name == 'creature_type':
+                return len(self.by_type.get(type_id(value), _NO_ROWS))
+            if name == 'shiny' and value:
+                return len(self.shiny_rows)
+        return len(self.query(**criteria))
+
+    def species_counts(self):
+        """Stored creatures per species name (for encyclopedia entries)"""
+        return {self.species_names[species_id]: len(rows)
+                for species_id, rows in self.by_species.items() if rows}
@@ -0,0 +1,367 @@
+"""
+Lockstep battle engine for Trapper-Mastering balance farms.
+
+Advances K one-on-one wild battles at once with NumPy: each step resolves
+move choice, speed order, damage, status effects, faint checks and win
+rewards for every active battle, then drops finished battles from the
+active set. Rules mirror Battle.player_attack and Battle._check_battle_end
+for a player with a single creature, so outcome distributions match Battle
+for the same move policies. Status effects come from the status.STATUS
+tables and are only evaluated while some battle has a statused creature.
+
+With log_size set, each battle also keeps its last log_size events in a
+ring buffer of structured rows (acting side, move slot or status id,
+value, BattleEvent outcome), recorded in Battle's order. Nothing is
+formatted while battles run; battle_log() renders one battle's rows as
+Battle's log text on request.
+"""
+
+import numpy as np
+
+from creature import SPECIES
+from battle import BattleResult, BattleEvent, EVENT_TEXT
+from batch import calculate_damage_batch
+from status import STATUS, NO_STATUS
+
+
+# Result codes stored in LockstepBattles.result
+ONGOING = 0
+PLAYER_WIN = 1
+PLAYER_LOSE = 2
+RESULT_NAMES = (BattleResult.ONGOING, BattleResult.PLAYER_WIN, BattleResult.PLAYER_LOSE)
+
+MAX_MOVES = 4
+
+# Acting side of an event row (NO_ACTOR for WIN/LOSE)
+PLAYER_SIDE = 0
+WILD_SIDE = 1
+NO_ACTOR = -1
+# Outcomes whose detail column holds a move slot / a status id
+_MOVE_EVENTS = (BattleEvent.HIT, BattleEvent.MISS)
+_STATUS_EVENTS = (BattleEvent.STATUS_SKIP, BattleEvent.STATUS_DAMAGE, BattleEvent.STATUS_RECOVERED)
+
+# status.STATUS tables as arrays, indexed by status id
+SKIP_CHANCE = np.array(STATUS.skip_chance)
+RESIDUAL_DAMAGE = np.array(STATUS.residual_damage)
+DAMAGE_MULTIPLIER = np.array(STATUS.damage_multiplier)
+MIN_TURNS = np.array(STATUS.min_turns, dtype=np.int64)
+MAX_TURNS = np.array(STATUS.max_turns, dtype=np.int64)
+
+
+def side_columns(creatures):
+    """Pack creatures (one per battle) into the column dict of one battle side"""
+    k = len(creatures)
+    columns = {
+        'level': np.array([c.level for c in creatures], dtype=np.int64),
+        'attack': np.array([c.attack for c in creatures], dtype=np.int64),
+        'defense': np.array([c.defense for c in creatures], dtype=np.int64),
+        'speed': np.array([c.speed for c in creatures], dtype=np.int64),
+        'type': np.array([c.type_id for c in creatures], dtype=np.int64),
+        'hp': np.array([c.current_hp for c in creatures], dtype=np.int64),
+        'max_hp': np.array([c.max_hp for c in creatures], dtype=np.int64),
+        'status': np.array([STATUS.status_id(c.status) for c in creatures], dtype=np.int64),
+        'move_count': np.array([len(c.moves) for c in creatures], dtype=np.int64),
+        'move_power': np.zeros((k, MAX_MOVES), dtype=np.int64),
+        'move_accuracy': np.zeros((k, MAX_MOVES), dtype=np.int64),
+        'move_type': np.zeros((k, MAX_MOVES), dtype=np.int64),
+    }
+    for i, creature in enumerate(creatures):
+        for slot, move in enumerate(creature.moves[:MAX_MOVES]):
+            columns['move_power'][i, slot] = move.power
+            columns['move_accuracy'][i, slot] = move.accuracy
+            columns['move_type'][i, slot] = move.type_id
+    return columns
+
+
+def _species_move_tables():
+    """Per-species move columns, shape (species, MAX_MOVES)"""
+    n = len(SPECIES)
+    tables = {
+        'move_count': np.zeros(n, dtype=np.int64),
+        'move_power': np.zeros((n, MAX_MOVES), dtype=np.int64),
+        'move_accuracy': np.zeros((n, MAX_MOVES), dtype=np.int64),
+        'move_type': np.zeros((n, MAX_MOVES), dtype=np.int64),
+    }
+    for species in SPECIES:
+        tables['move_count'][species.id] = len(species.moves)
+        for slot, move in enumerate(species.moves[:MAX_MOVES]):
+            tables['move_power'][species.id, slot] = move.power
+            tables['move_accuracy'][species.id, slot] = move.accuracy
+            tables['move_type'][species.id, slot] = move.type_id
+    return tables
+
+
+def batch_side_columns(wild_batch):
+    """Side columns for a batch.WildBatch, without building Creature objects"""
+    tables = _species_move_tables()
+    species = wild_batch.species
+    return {
+        'level': wild_batch.level,
+        'attack': wild_batch.attack,
+        'defense': wild_batch.defense,
+        'speed': wild_batch.speed,
+        'type': wild_batch.type_id,
+        'hp': wild_batch.max_hp.copy(),
+        'max_hp': wild_batch.max_hp,
+        'status': np.zeros(len(species), dtype=np.int64),
+        'move_count': tables['move_count'][species],
+        'move_power': tables['move_power'][species],
+        'move_accuracy': tables['move_accuracy'][species],
+        'move_type': tables['move_type'][species],
+    }
+
+
+class LockstepBattles:
+    """
+    K concurrent player-vs-wild battles advanced together.
+    Both sides take side_columns()/batch_side_columns() dicts. The wild side
+    picks moves uniformly at random, as in Battle. player_moves is an array
+    of fixed move indexes per battle, or None for uniformly random moves.
+    A side's optional 'status' column holds status ids; durations of timed
+    statuses are rolled when the battles are created.
+    log_size > 0 keeps each battle's last log_size events (see battle_log).
+    """
+
+    def __init__(self, player_side, wild_side, rng=None, player_moves=None, log_size=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+        self.player = {name: np.array(column) for name, column in player_side.items()}
+        self.wild = {name: np.array(column) for name, column in wild_side.items()}
+        self.player_moves = None if player_moves is None else np.asarray(player_moves)
+
+        k = len(self.player['hp'])
+        for side in (self.player, self.wild):
+            status = side.setdefault('status', np.zeros(k, dtype=np.int64))
+            if 'status_turns' not in side:
+                high = MAX_TURNS[status]
+                side['status_turns'] = np.where(
+                    high > 0, rng.integers(MIN_TURNS[status], high + 1), 0)
+        self.result = np.full(k, ONGOING, dtype=np.int8)
+        self.reward = np.zeros(k, dtype=np.int64)
+        self.turns = np.zeros(k, dtype=np.int64)
+        self.active = np.flatnonzero((self.player['hp'] > 0) & (self.wild['hp'] > 0))
+        # Turns with no statused creature anywhere skip the status rules
+        self._has_status = bool(self.player['status'].any() or self.wild['status'].any())
+        # Event ring buffers, one row per event; event_count includes overwritten rows
+        self.log_size = log_size or 0
+        self.events = np.zeros((k, self.log_size, 4), dtype=np.int64) if log_size else None
+        self.event_count = np.zeros(k, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.result)
+
+    def _choose_moves(self, side, active, fixed=None):
+        """Move columns for the move each active battle's side uses this turn"""
+        if fixed is None:
+            slot = (self.rng.random(len(active)) * side['move_count'][active]).astype(np.int64)
+        else:
+            slot = fixed[active]
+        return {
+            'slot': slot,
+            'power': side['move_power'][active, slot],
+            'accuracy': side['move_accuracy'][active, slot],
+            'type': side['move_type'][active, slot],
+        }
+
+    def step(self):
+        """Play one turn (Battle.player_attack) of every active battle"""
+        active = self.active
+        if len(active) == 0:
+            return
+        player, wild = self.player, self.wild
+
+        player_cols = {name: player[name][active] for name in ('level', 'attack', 'defense', 'type')}
+        wild_cols = {name: wild[name][active] for name in ('level', 'attack', 'defense', 'type')}
+        player_move = self._choose_moves(player, active, self.player_moves)
+        wild_move = self._choose_moves(wild, active)
+        player_damage = calculate_damage_batch(player_cols, player_move, wild_cols, self.rng)
+        wild_damage = calculate_damage_batch(wild_cols, wild_move, player_cols, self.rng)
+
+        # Determine turn order based on speed; the second attacker only
+        # moves if neither creature has fainted
+        player_first = player['speed'][active] >= wild['speed'][active]
+        player_hp = player['hp'][active]
+        wild_hp = wild['hp'][active]
+
+        status = None
+        if self._has_status:
+            player_hp, wild_hp, after_first, status, damage = self._resolve_with_status(
+                active, player_first, player_hp, wild_hp, player_damage, wild_damage)
+            player_damage, wild_damage = damage
+            self._has_status = bool(player['status'].any() or wild['status'].any())
+        else:
+            wild_after_first = np.where(player_first, np.maximum(0, wild_hp - player_damage), wild_hp)
+            player_after_first = np.where(player_first, player_hp, np.maximum(0, player_hp - wild_damage))
+            after_first = (player_after_first, wild_after_first)
+            player_hp = np.where(player_first & (wild_after_first <= 0), player_hp,
+                                 np.maximum(0, player_hp - wild_damage))
+            wild_hp = np.where(~player_first & (player_hp <= 0), wild_hp,
+                               np.maximum(0, wild_hp - player_damage))
+        if self.events is not None:
+            self._record_turn(active, player_first, (player_move['slot'], wild_move['slot']),
+                              (player_damage, wild_damage), after_first, (player_hp, wild_hp), status)
+
+        player['hp'][active] = player_hp
+        wild['hp'][active] = wild_hp
+        self.turns[active] += 1
+
+        # _check_battle_end: a wild faint wins (checked first), then a player faint loses
+        won = wild_hp <= 0
+        lost = ~won & (player_hp <= 0)
+        self.result[active[won]] = PLAYER_WIN
+        self.reward[active[won]] = wild['level'][active[won]] * 10
+        self.result[active[lost]] = PLAYER_LOSE
+        if self.events is not None:
+            self._record(active[won], NO_ACTOR, 0, self.reward[active[won]], BattleEvent.WIN)
+            self._record(active[lost], NO_ACTOR, 0, 0, BattleEvent.LOSE)
+        self.active = active[~(won | lost)]
+
+    def _record(self, battles, side, detail, value, outcome):
+        """Append one event row to each of battles' ring buffers (scalars broadcast)"""
+        if len(battles) == 0:
+            return
+        count = self.event_count[battles]
+        rows = np.empty((len(battles), 4), dtype=np.int64)
+        rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3] = side, detail, value, outcome
+        self.events[battles, count % self.log_size] = rows
+        self.event_count[battles] = count + 1
+
+    def _record_turn(self, active, player_first, slots, damage, after_first, after, status):
+        """
+        Record a turn's events as Battle would: for the first mover, then for
+        the second if both creatures are still up, a status cure, its move
+        (HIT, MISS or STATUS_SKIP), the target fainting, then residual status
+        damage and the mover fainting from it. slots, damage and HP after the
+        first mover / after the turn are (player, wild) pairs; status is
+        (cured, lost, residual, status before, status after) pairs from
+        _resolve_with_status, or None for a turn without status effects.
+        """
+        everyone = np.ones(len(active), dtype=bool)
+        second_moves = (after_first[0] > 0) & (after_first[1] > 0)
+        for is_player, hp, moved in ((player_first, after_first, everyone),
+                                     (~player_first, after, second_moves)):
+            def pick(pair, targets=False):
+                return np.where(is_player ^ targets, pair[0], pair[1])
+
+            side = np.where(is_player, PLAYER_SIDE, WILD_SIDE)[moved]
+            battles = active[moved]
+            hit = pick(damage)[moved]
+            target_hp = pick(hp, targets=True)[moved]
+            if status is None:
+                self._record(battles, side, pick(slots)[moved], hit,
+                             np.where(hit > 0, BattleEvent.HIT, BattleEvent.MISS))
+                fainted = (hit > 0) & (target_hp <= 0)
+                self._record(battles[fainted], 1 - side[fainted], 0, 0, BattleEvent.FAINT)
+                continue
+
+            cured, lost, residual, before, current = (pick(pair)[moved] for pair in status)
+            self._record(battles[cured], side[cured], before[cured], 0, BattleEvent.STATUS_RECOVERED)
+            self._record(battles, side, np.where(lost, current, pick(slots)[moved]), hit,
+                         np.where(lost, BattleEvent.STATUS_SKIP,
+                                  np.where(hit > 0, BattleEvent.HIT, BattleEvent.MISS)))
+            fainted = (hit > 0) & (target_hp <= 0)
+            self._record(battles[fainted], 1 - side[fainted], 0, 0, BattleEvent.FAINT)
+            hurt = residual > 0
+            self._record(battles[hurt], side[hurt], current[hurt], residual[hurt], BattleEvent.STATUS_DAMAGE)
+            fainted = hurt & (pick(hp)[moved] <= 0)
+            self._record(battles[fainted], side[fainted], 0, 0, BattleEvent.FAINT)
+
+    def _status_phase(self, side, active):
+        """
+        Battle._status_turn for one side: tick durations (curing expired
+        statuses) and roll lost moves. Returns the damage multiplier (0 for
+        a lost move), the residual damage taken after the creature's turn,
+        and (cured, lost, status before, status after) for the event log.
+        """
+        before = side['status'][active]
+        turns = side['status_turns'][active]
+        timed = MAX_TURNS[before] > 0
+        cured = timed & (turns <= 0)
+        status = np.where(cured, NO_STATUS, before)
+        side['status'][active] = status
+        side['status_turns'][active] = np.where(timed & ~cured, turns - 1, turns)
+
+        lost = self.rng.random(len(active)) < SKIP_CHANCE[status]
+        multiplier = np.where(lost, 0.0, DAMAGE_MULTIPLIER[status])
+        fraction = RESIDUAL_DAMAGE[status]
+        residual = np.where(fraction > 0,
+                            np.maximum(1, (side['max_hp'][active] * fraction).astype(np.int64)), 0)
+        return multiplier, residual, (cured, lost, before, status)
+
+    def _resolve_with_status(self, active, player_first, player_hp, wild_hp, player_damage, wild_damage):
+        """
+        Turn order with status effects: each slot is the move, then residual
+        damage. Returns the HP after the turn, the HP after the first mover,
+        the status details for _record_turn and the damage actually dealt,
+        each as a (player, wild) pair where it has two sides.
+        """
+        player_multiplier, player_residual, player_info = self._status_phase(self.player, active)
+        wild_multiplier, wild_residual, wild_info = self._status_phase(self.wild, active)
+        player_damage = (player_damage * player_multiplier).astype(np.int64)
+        wild_damage = (wild_damage * wild_multiplier).astype(np.int64)
+        wild_first = ~player_first
+
+        # First mover
+        wild_hp = np.where(player_first, np.maximum(0, wild_hp - player_damage),
+                           np.maximum(0, wild_hp - wild_residual))
+        player_hp = np.where(player_first, np.maximum(0, player_hp - player_residual),
+                             np.maximum(0, player_hp - wild_damage))
+        after_first = (player_hp, wild_hp)
+
+        # Second mover
+        both = (player_hp > 0) & (wild_hp > 0)
+        player_hp = np.where(both & player_first, np.maximum(0, player_hp - wild_damage), player_hp)
+        wild_hp = np.where(both & player_first, np.maximum(0, wild_hp - wild_residual), wild_hp)
+        wild_hp = np.where(both & wild_first, np.maximum(0, wild_hp - player_damage), wild_hp)
+        player_hp = np.where(both & wild_first, np.maximum(0, player_hp - player_residual), player_hp)
+
+        (player_cured, player_lost, player_before, player_status) = player_info
+        (wild_cured, wild_lost, wild_before, wild_status) = wild_info
+        status = ((player_cured, wild_cured), (player_lost, wild_lost),
+                  (player_residual, wild_residual), (player_before, wild_before),
+                  (player_status, wild_status))
+        return player_hp, wild_hp, after_first, status, (player_damage, wild_damage)
+
+    def run(self, max_turns=200):
+        """Step until every battle ends or max_turns is reached (unfinished stay ONGOING)"""
+        for _ in range(max_turns):
+            if len(self.active) == 0:
+                break
+            self.step()
+        return self.result
+
+    def outcome_counts(self):
+        """Number of battles per BattleResult value"""
+        counts = np.bincount(self.result, minlength=len(RESULT_NAMES))
+        return {name: int(count) for name, count in zip(RESULT_NAMES, counts)}
+
+    def battle_log(self, index, player_creature, wild_creature):
+        """
+        Log messages for one battle's recorded events, oldest first, as
+        Battle would word them. player_creature and wild_creature are the
+        creatures the battle's columns came from (for names and move slots).
+        """
+        size = self.log_size
+        count = int(self.event_count[index])
+        sides = _LogSides(wild_creature)
+        messages = []
+        for n in range(max(0, count - size), count):
+            side, detail, value, outcome = (int(x) for x in self.events[index, n % size])
+            actor = None if side == NO_ACTOR else (player_creature, wild_creature)[side]
+            if outcome in _MOVE_EVENTS:
+                detail = actor.moves[detail]
+            elif outcome in _STATUS_EVENTS:
+                detail = STATUS.names[detail]
+            messages.append(EVENT_TEXT[outcome](sides, actor, detail, value))
+        return messages
+
+
+class _LogSides:
+    """Stands in for a Battle when rendering event text: tells which creature is wild"""
+
+    def __init__(self, wild_creature):
+        self.wild_creature = wild_creature
+
+    def is_wild(self, creature):
+        return creature is self.wild_creature
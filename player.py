@@ -3,7 +3,9 @@ Player module for Trapper-Mastering game.
 Manages player inventory, party, and items.
 """
 
+from config_loader import load_config
 from creature import Creature
+from indexed_box import IndexedBox
 
 
 class Item:
@@ -33,6 +35,14 @@ class HealItem(Item):
         self.heal_amount = heal_amount
 
 
+class Berry(Item):
+    """Berries that attract and calm wild creatures"""
+    
+    def __init__(self, name, description, effects):
+        super().__init__(name, description, 'berry')
+        self.effects = effects  # Effect name -> strength, from config/berry_types.yaml
+
+
 # Predefined traps (similar to different Pokeball types)
 TRAP_TYPES = {
     "Basic Trap": Trap("Basic Trap", "A basic trap for catching creatures.", 1.0),
@@ -47,21 +57,193 @@ HEAL_ITEMS = {
 }
 
 
+def _load_berries():
+    """Berry items from config/berry_types.yaml, e.g. oran_berry -> "Oran Berry" """
+    berries = {}
+    for key, data in load_config("berry_types")['berries'].items():
+        name = key.replace('_', ' ').title()
+        berries[name] = Berry(name, data.get('description', ''), data.get('effects') or {})
+    return berries
+
+
+BERRY_ITEMS = _load_berries()
+
+# Every known item by name
+ITEMS = {**TRAP_TYPES, **HEAL_ITEMS, **BERRY_ITEMS}
+
+# Category of items missing from ITEMS
+OTHER_ITEMS = 'other'
+
+
+def item_category(item_name):
+    """Inventory category of an item name: its Item.effect_type"""
+    item = ITEMS.get(item_name)
+    return item.effect_type if item is not None else OTHER_ITEMS
+
+
+class Inventory(dict):
+    """
+    Item counts keyed by item name, plus an ordered list of the held item
+    names for each category (Item.effect_type). The lists are kept up to
+    date as items are added and removed, so menus read them directly.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._categories = {}
+        self.update(*args, **kwargs)
+    
+    def category(self, effect_type):
+        """Live list of held item names in a category, in inventory order (read-only)"""
+        names = self._categories.get(effect_type)
+        if names is None:
+            names = self._categories[effect_type] = []
+        return names
+    
+    def __setitem__(self, item_name, count):
+        if item_name not in self:
+            self.category(item_category(item_name)).append(item_name)
+        super().__setitem__(item_name, count)
+    
+    def __delitem__(self, item_name):
+        super().__delitem__(item_name)
+        self._categories[item_category(item_name)].remove(item_name)
+    
+    def pop(self, item_name, *default):
+        if item_name in self:
+            self._categories[item_category(item_name)].remove(item_name)
+        return super().pop(item_name, *default)
+    
+    def popitem(self):
+        item_name, count = super().popitem()
+        self._categories[item_category(item_name)].remove(item_name)
+        return item_name, count
+    
+    def setdefault(self, item_name, default=None):
+        if item_name not in self:
+            self[item_name] = default
+        return self[item_name]
+    
+    def update(self, *args, **kwargs):
+        for item_name, count in dict(*args, **kwargs).items():
+            self[item_name] = count
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def clear(self):
+        super().clear()
+        for names in self._categories.values():
+            names.clear()
+    
+    def copy(self):
+        return Inventory(self)
+    
+    def __reduce__(self):
+        return Inventory, (dict(self),)
+
+
+def _flags_change(method):
+    """Wrap a list method so calling it marks the party as changed"""
+    def mutate(self, *args, **kwargs):
+        self.dirty = True
+        return method(self, *args, **kwargs)
+    mutate.__name__ = method.__name__
+    return mutate
+
+
+class Party(list):
+    """
+    List of the player's party creatures. Any change to its membership
+    marks it dirty, so Player rebuilds its fainted tracking on next use.
+    """
+    
+    dirty = True
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(Party, _name, _flags_change(getattr(list, _name)))
+
+
 class Player:
     """
-    Represents the player character
+    Represents the player character.
+    
+    The party's fainted creatures are tracked in fainted_mask (bit i set
+    when party[i] has fainted) and first_usable (index of the first
+    non-fainted creature, -1 if none). Party creatures report HP changes
+    through their party_hook, so active-creature lookups are O(1).
+    pc_box defaults to an in-memory IndexedBox; pass a sqlite_box.SQLiteBox
+    to keep the box on disk.
     """
     
-    def __init__(self, name):
+    def __init__(self, name, pc_box=None):
         self.name = name
+        self._hooked = ()
+        self.fainted_mask = 0
+        self.first_usable = -1
         self.party = []  # List of creatures in party (max 6)
-        self.pc_box = []  # Stored creatures
+        # Stored creatures, packed column-wise and indexed
+        self.pc_box = pc_box if pc_box is not None else IndexedBox()
         self.inventory = {
             "Basic Trap": 10,
             "Potion": 5,
         }
         self.money = 1000
         
+    @property
+    def inventory(self):
+        """Item counts by name, as an Inventory"""
+        return self._inventory
+    
+    @inventory.setter
+    def inventory(self, items):
+        self._inventory = Inventory(items)
+    
+    @property
+    def party(self):
+        """Party creatures, as a Party list"""
+        return self._party
+    
+    @party.setter
+    def party(self, creatures):
+        self._party = Party(creatures)
+    
+    def refresh_party(self):
+        """
+        Rebuild fainted_mask and first_usable and hook the party creatures.
+        Runs automatically after the party list changes; call it after
+        setting current_hp of party creatures directly.
+        """
+        party = self._party
+        for creature in self._hooked:
+            creature.party_hook = None
+        mask = 0
+        hook = self._party_hp_changed
+        for slot, creature in enumerate(party):
+            creature.party_hook = hook
+            creature.party_slot = slot
+            if creature.is_fainted():
+                mask |= 1 << slot
+        self._hooked = tuple(party)
+        self._set_fainted_mask(mask)
+        party.dirty = False
+    
+    def _set_fainted_mask(self, mask):
+        self.fainted_mask = mask
+        usable = ~mask & ((1 << len(self._party)) - 1)
+        self.first_usable = (usable & -usable).bit_length() - 1
+    
+    def _party_hp_changed(self, slot, fainted):
+        """Party hook: update the fainted bit of one party slot"""
+        if self._party.dirty:
+            return  # Rebuilt from scratch on next use
+        mask = self.fainted_mask | (1 << slot) if fainted else self.fainted_mask & ~(1 << slot)
+        if mask != self.fainted_mask:
+            self._set_fainted_mask(mask)
+    
     def add_creature(self, creature):
         """Add a creature to party or PC"""
         if len(self.party) < 6:
@@ -73,14 +255,16 @@ class Player:
     
     def get_active_creature(self):
         """Get the first non-fainted creature in party"""
-        for creature in self.party:
-            if not creature.is_fainted():
-                return creature
-        return None
+        if self._party.dirty:
+            self.refresh_party()
+        slot = self.first_usable
+        return self._party[slot] if slot >= 0 else None
     
     def has_usable_creatures(self):
         """Check if player has any non-fainted creatures"""
-        return any(not c.is_fainted() for c in self.party)
+        if self._party.dirty:
+            self.refresh_party()
+        return self.first_usable >= 0
     
     def add_item(self, item_name, quantity=1):
         """Add item to inventory"""
@@ -6,7 +6,7 @@ Simulates a player playing through key game features
 
 import sys
 from io import StringIO
-from creature import STARTER_CREATURES, get_random_wild_creature, Creature
+from creature import STARTER_CREATURES, get_random_wild_creature
 from player import Player
 from battle import Battle, BattleResult
 
@@ -26,12 +26,7 @@ def automated_playthrough():
     
     # Choose starter
     print("\n>>> Choosing starter creature: Flamepup...")
-    starter = STARTER_CREATURES["Flamepup"]
-    player_creature = Creature(
-        starter.name, starter.type, starter.level,
-        starter.max_hp, starter.attack, starter.defense, starter.speed,
-        starter.moves.copy()
-    )
+    player_creature = STARTER_CREATURES["Flamepup"].spawn()
     player.add_creature(player_creature)
     print(f"    ✓ {player_creature.name} added to party")
     print(f"    ✓ Moves: {', '.join(m.name for m in player_creature.moves)}")
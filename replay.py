@@ -0,0 +1,210 @@
+"""
+Battle recording and replay for Trapper-Mastering.
+
+A RecordingBattle plays like a normal Battle, but rolls on its own seeded
+random generator and appends every player action to a compact byte stream
+(two bytes per action). The resulting BattleRecording holds the seed, the
+starting state of the player and wild creature, and the actions. replay()
+plays it back headlessly, reproducing the original battle_log and result,
+or showing the new outcome after a balance change.
+
+Messages added with Battle.add_log are not player actions and are not recorded.
+"""
+
+import json
+import random
+import struct
+
+from creature import Creature
+from player import Player, TRAP_TYPES, HEAL_ITEMS
+from battle import Battle, RandomMovePolicy
+
+
+# Action opcodes; every action is (opcode, argument) packed in two bytes
+ATTACK = 0  # argument: move index
+CATCH = 1   # argument: item name id
+HEAL = 2    # argument: item name id
+RUN = 3     # argument: unused
+SWITCH = 4  # argument: party slot
+
+MAGIC = b"TMRB"
+VERSION = 1
+
+# magic, version, seed, state length, actions length
+HEADER = struct.Struct("<4sBQII")
+
+
+class BattleRecording:
+    """
+    Seed, starting state and action stream of one battle.
+    state is a JSON-friendly dict: player (name, money, inventory, party),
+    wild creature, the item name table actions refer to, and the result.
+    """
+
+    __slots__ = ('seed', 'state', 'actions')
+
+    def __init__(self, seed, state, actions):
+        self.seed = seed
+        self.state = state
+        self.actions = bytes(actions)
+
+    @property
+    def result(self):
+        """BattleResult the recorded battle ended with"""
+        return self.state.get('result')
+
+    def __len__(self):
+        """Number of recorded actions"""
+        return len(self.actions) // 2
+
+    def to_bytes(self):
+        """Encode as header + JSON state + action bytes"""
+        state = json.dumps(self.state, separators=(',', ':')).encode('utf-8')
+        return HEADER.pack(MAGIC, VERSION, self.seed, len(state), len(self.actions)) + state + self.actions
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """Decode one recording at offset; returns (recording, next offset)"""
+        if len(data) - offset < HEADER.size:
+            raise ValueError("truncated battle recording")
+        magic, version, seed, state_len, actions_len = HEADER.unpack_from(data, offset)
+        if magic != MAGIC:
+            raise ValueError("not a battle recording")
+        if version != VERSION:
+            raise ValueError(f"unsupported battle recording version: {version}")
+
+        start = offset + HEADER.size
+        end = start + state_len + actions_len
+        if end > len(data):
+            raise ValueError("truncated battle recording")
+        state = json.loads(data[start:start + state_len].decode('utf-8'))
+        return cls(seed, state, data[start + state_len:end]), end
+
+
+def write_recordings(path, recordings):
+    """Write recordings back to back into one file"""
+    with open(path, 'wb') as f:
+        for recording in recordings:
+            f.write(recording.to_bytes())
+
+
+def read_recordings(path):
+    """Read every recording from a write_recordings() file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    recordings = []
+    offset = 0
+    while offset < len(data):
+        recording, offset = BattleRecording.from_bytes(data, offset)
+        recordings.append(recording)
+    return recordings
+
+
+class RecordingBattle(Battle):
+    """
+    Battle that records itself for replay.
+    The battle rolls on random.Random(seed); without a seed one is drawn
+    from rng (or the random module), so seeded games stay reproducible.
+    Recordings don't hold the wild creature's move policy, so only the
+    default RandomMovePolicy can be recorded.
+    """
+
+    def __init__(self, player, wild_creature, rng=None, seed=None, wild_policy=None, **kwargs):
+        if wild_policy is not None and type(wild_policy) is not RandomMovePolicy:
+            raise ValueError(f"can't record a battle with wild_policy {type(wild_policy).__name__}: "
+                             "replay() plays the wild creature with RandomMovePolicy")
+        if seed is None:
+            seed = (rng if rng is not None else random).getrandbits(64)
+        self.seed = seed
+        self.actions = bytearray()
+        self.item_names = list(TRAP_TYPES) + list(HEAL_ITEMS)
+        self.start_state = {
+            'player': {
+                'name': player.name,
+                'money': player.money,
+                'inventory': dict(player.inventory),
+                'party': [c.to_dict() for c in player.party],
+            },
+            'wild': wild_creature.to_dict(),
+        }
+        super().__init__(player, wild_creature, rng=random.Random(seed), **kwargs)
+
+    def _write(self, opcode, argument=0):
+        if not 0 <= argument <= 255:
+            raise ValueError(f"can't record action argument {argument}")
+        self.actions += bytes((opcode, argument))
+
+    def _item_id(self, item_name):
+        if item_name not in self.item_names:
+            self.item_names.append(item_name)
+        return self.item_names.index(item_name)
+
+    def player_attack(self, move_index):
+        self._write(ATTACK, move_index)
+        super().player_attack(move_index)
+
+    def attempt_catch(self, trap_name):
+        self._write(CATCH, self._item_id(trap_name))
+        return super().attempt_catch(trap_name)
+
+    def use_heal_item(self, item_name):
+        self._write(HEAL, self._item_id(item_name))
+        return super().use_heal_item(item_name)
+
+    def attempt_run(self):
+        self._write(RUN)
+        return super().attempt_run()
+
+    def switch_creature(self, new_creature):
+        slot = next((i for i, c in enumerate(self.player.party) if c is new_creature), None)
+        if slot is None:
+            raise ValueError(f"can't record switching to {new_creature.name}: not in the party")
+        self._write(SWITCH, slot)
+        return super().switch_creature(new_creature)
+
+    def snapshot(self):
+        return super().snapshot(), len(self.actions)
+
+    def restore(self, snapshot):
+        battle_state, action_count = snapshot
+        super().restore(battle_state)
+        del self.actions[action_count:]
+
+    def recording(self):
+        """Get the BattleRecording of the battle so far"""
+        state = dict(self.start_state, items=list(self.item_names), result=self.result)
+        return BattleRecording(self.seed, state, self.actions)
+
+
+def replay(recording):
+    """
+    Play a recording back as a headless Battle that keeps its full event log.
+    Returns the finished Battle (compare battle_log and result to the original).
+    """
+    saved = recording.state['player']
+    player = Player(saved['name'])
+    player.money = saved['money']
+    player.inventory = dict(saved['inventory'])
+    for data in saved['party']:
+        player.add_creature(Creature.from_dict(data))
+
+    battle = Battle(player, Creature.from_dict(recording.state['wild']),
+                    rng=random.Random(recording.seed), headless=True, log_size=Battle.FULL_LOG)
+
+    items = recording.state['items']
+    actions = recording.actions
+    for i in range(0, len(actions), 2):
+        opcode, argument = actions[i], actions[i + 1]
+        if opcode == ATTACK:
+            battle.player_attack(argument)
+        elif opcode == CATCH:
+            battle.attempt_catch(items[argument])
+        elif opcode == HEAL:
+            battle.use_heal_item(items[argument])
+        elif opcode == RUN:
+            battle.attempt_run()
+        elif opcode == SWITCH:
+            battle.switch_creature(player.party[argument])
+        else:
+            raise ValueError(f"unknown action opcode {opcode}")
+    return battle
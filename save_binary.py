@@ -0,0 +1,273 @@
+"""
+Binary save format for Trapper-Mastering.
+
+A compact alternative to the JSON save. Every string (species, types,
+statuses, moves, items, location) is stored once in a string table and
+moves once in a move table; creatures are fixed-width struct records that
+refer to them by index. The file is laid out as:
+
+    header      magic, format version
+    strings     count, then (length, UTF-8 bytes) per string
+    moves       count, then MOVE records
+    player      name, money, location, playtime (version 2+), PC box
+                path (version 3+, for a box kept in its own SQLite file)
+    inventory   count, then (item name, count) pairs
+    party       count, then CREATURE records
+    pc box      count, then CREATURE records
+
+Loading reads the tables and party up front and streams the PC box
+records in chunks, so a large box is never held in memory as a document.
+A save with a PC box path has no box records.
+
+Usage (converts between formats, picked by file extension):
+    python save_binary.py savegame.json savegame.sav
+"""
+
+import argparse
+import os
+import struct
+
+from save_journal import SaveJournal
+
+MAGIC = b'TMSV'
+VERSION = 3
+# Save files with this extension use the binary format
+BINARY_SUFFIX = '.sav'
+
+_HEADER = struct.Struct('<4sH')
+_COUNT = struct.Struct('<I')
+_LENGTH = struct.Struct('<H')
+_PLAYER = struct.Struct('<HqHIH')  # name, money, location, playtime seconds, PC box path
+_PLAYER_V2 = struct.Struct('<HqHI')  # Version 2: no PC box path
+_PLAYER_V1 = struct.Struct('<HqH')  # Version 1: no playtime
+_ITEM = struct.Struct('<HI')  # name, count
+MOVE = struct.Struct('<HHHH')  # name, type, power, accuracy
+MAX_MOVES = 4
+# name, type, species id, level, max hp, current hp, attack, defense,
+# speed, status, shiny, move count, move table indexes
+CREATURE = struct.Struct(f'<HHiHIIHHHHBB{MAX_MOVES}H')
+
+_NONE = 0xFFFF  # String/move index for "no value"
+_NO_SPECIES = -1
+# Creature records read per file read while streaming
+STREAM_CHUNK = 4096
+
+
+class _Tables:
+    """String and move tables built while packing a save"""
+
+    def __init__(self):
+        self.strings = {}
+        self.moves = {}
+
+    def string(self, value):
+        if value is None:
+            return _NONE
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def move(self, move):
+        key = (move['name'], move['type'], move['power'], move['accuracy'])
+        index = self.moves.get(key)
+        if index is None:
+            index = self.moves[key] = len(self.moves)
+            self.string(move['name'])
+            self.string(move['type'])
+        return index
+
+    def creature(self, data):
+        """Pack one creature dict (Creature.to_dict() layout) into a record"""
+        moves = [self.move(m) for m in data['moves']]
+        if len(moves) > MAX_MOVES:
+            raise ValueError(f"{data['name']} knows more than {MAX_MOVES} moves")
+        species_id = data.get('species_id')
+        return CREATURE.pack(
+            self.string(data['name']), self.string(data['type']),
+            _NO_SPECIES if species_id is None else species_id,
+            data['level'], data['max_hp'], data['current_hp'], data['attack'],
+            data['defense'], data['speed'], self.string(data.get('status')),
+            bool(data.get('shiny')), len(moves), *moves, *[_NONE] * (MAX_MOVES - len(moves)))
+
+
+def encode_save(state):
+    """Binary save bytes for a save dict (see Game._save_state), including an optional 'pc_box'"""
+    tables = _Tables()
+    player = _PLAYER.pack(tables.string(state['player_name']), state['money'],
+                          tables.string(state['location']), state.get('playtime', 0),
+                          tables.string(state.get('pc_box_path')))
+    inventory = [_ITEM.pack(tables.string(name), count) for name, count in state['inventory'].items()]
+    sections = []
+    for key in ('party', 'pc_box'):
+        records = [tables.creature(data) for data in state.get(key, ())]
+        sections.append(_COUNT.pack(len(records)) + b''.join(records))
+
+    # Tables are complete only after every record is packed, but go first in the file
+    strings = [_COUNT.pack(len(tables.strings))]
+    for value in tables.strings:
+        encoded = value.encode('utf-8')
+        strings.append(_LENGTH.pack(len(encoded)) + encoded)
+    moves = [_COUNT.pack(len(tables.moves))]
+    moves.extend(MOVE.pack(tables.strings[name], tables.strings[move_type], power, accuracy)
+                 for name, move_type, power, accuracy in tables.moves)
+    return b''.join([_HEADER.pack(MAGIC, VERSION), *strings, *moves, player,
+                     _COUNT.pack(len(inventory)), *inventory, *sections])
+
+
+def write_save(path, state):
+    """Write a binary save; a temporary file is swapped in so the old save survives a crash"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(encode_save(state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _read(f, layout):
+    data = f.read(layout.size)
+    if len(data) != layout.size:
+        raise ValueError("truncated save file")
+    return layout.unpack(data)
+
+
+class _Reader:
+    """Decodes creature records using a save's string and move tables"""
+
+    def __init__(self, strings, moves):
+        self.strings = strings
+        # Move dicts are shared by every record that uses the move
+        self.moves = moves
+
+    def creature(self, record):
+        strings = self.strings
+        species_id, status = record[2], record[9]
+        return {
+            'name': strings[record[0]],
+            'type': strings[record[1]],
+            'species_id': None if species_id == _NO_SPECIES else species_id,
+            'level': record[3],
+            'max_hp': record[4],
+            'current_hp': record[5],
+            'attack': record[6],
+            'defense': record[7],
+            'speed': record[8],
+            'status': None if status == _NONE else strings[status],
+            'shiny': bool(record[10]),
+            'moves': [self.moves[i] for i in record[12:12 + record[11]]],
+        }
+
+    def records(self, f, count):
+        """Creature dicts for the next count records, read STREAM_CHUNK at a time"""
+        creature = self.creature
+        while count:
+            chunk = min(count, STREAM_CHUNK)
+            data = f.read(chunk * CREATURE.size)
+            if len(data) != chunk * CREATURE.size:
+                raise ValueError("truncated save file")
+            for record in CREATURE.iter_unpack(data):
+                yield creature(record)
+            count -= chunk
+
+
+def read_save(path, offset=0):
+    """
+    Read a binary save (starting offset bytes into the file) into a save
+    dict. 'party' is a list; 'pc_box' is an iterator that streams its
+    creature dicts from the file.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        magic, version = _read(f, _HEADER)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary save file")
+        if version > VERSION:
+            raise ValueError(f"unsupported save format version {version}")
+
+        strings = []
+        for _ in range(_read(f, _COUNT)[0]):
+            length, = _read(f, _LENGTH)
+            strings.append(f.read(length).decode('utf-8'))
+        moves = []
+        for _ in range(_read(f, _COUNT)[0]):
+            name, move_type, power, accuracy = _read(f, MOVE)
+            moves.append({'name': strings[name], 'type': strings[move_type],
+                          'power': power, 'accuracy': accuracy})
+        reader = _Reader(strings, moves)
+
+        box_path = _NONE
+        if version == 1:
+            name, money, location = _read(f, _PLAYER_V1)
+            playtime = 0
+        elif version == 2:
+            name, money, location, playtime = _read(f, _PLAYER_V2)
+        else:
+            name, money, location, playtime, box_path = _read(f, _PLAYER)
+        inventory = {}
+        for _ in range(_read(f, _COUNT)[0]):
+            item, count = _read(f, _ITEM)
+            inventory[strings[item]] = count
+        party = list(reader.records(f, _read(f, _COUNT)[0]))
+        box_count, = _read(f, _COUNT)
+        box_offset = f.tell()
+
+    def pc_box():
+        with open(path, 'rb') as f:
+            f.seek(box_offset)
+            yield from reader.records(f, box_count)
+
+    state = {
+        'player_name': strings[name],
+        'money': money,
+        'location': strings[location],
+        'playtime': playtime,
+        'party': party,
+        'inventory': inventory,
+        'pc_box': pc_box(),
+    }
+    if box_path != _NONE:
+        state['pc_box_path'] = strings[box_path]
+    return state
+
+
+def is_binary_save(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinarySave:
+    """Binary save file with the same save()/load() interface as SaveJournal"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, state):
+        write_save(self.path, state)
+
+    def load(self):
+        return read_save(self.path)
+
+
+def open_save(path):
+    """Save handler for a save path: BinarySave for BINARY_SUFFIX files, else a SaveJournal"""
+    return BinarySave(path) if path.endswith(BINARY_SUFFIX) else SaveJournal(path)
+
+
+def convert(source, target):
+    """Convert a save between the JSON and binary formats (chosen by file extension)"""
+    state = read_save(source) if is_binary_save(source) else SaveJournal(source).load()
+    state['pc_box'] = list(state.get('pc_box', ()))
+    open_save(target).save(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert saves between JSON and binary")
+    parser.add_argument('source', help="save file to read (JSON or binary)")
+    parser.add_argument('target', help=f"save file to write (binary if it ends in {BINARY_SUFFIX})")
+    args = parser.parse_args()
+    convert(args.source, args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Journaled saves for Trapper-Mastering.
+
+A save is a snapshot file (the full save dict, as JSON) plus an
+append-only journal of deltas next to it. Each save appends one line
+holding only what changed since the previous save: money, location,
+playtime, item counts, party and PC box creatures. Loading replays the journal
+over the snapshot. Once the journal holds COMPACT_AFTER saves it is folded into
+a new snapshot, which is written to a temporary file and swapped in
+with os.replace, so a crash never leaves a half-written snapshot. A
+torn last journal line (a crash mid-append) is dropped on load.
+"""
+
+import json
+import os
+import weakref
+
+# Top-level save fields replaced as a whole when they change
+SCALAR_FIELDS = ('player_name', 'money', 'location', 'playtime', 'pc_box_path')
+# Creature list fields: (field, set-slot op, truncate op)
+LIST_FIELDS = (('party', 'creature', 'party_size'), ('pc_box', 'box', 'box_size'))
+_LIST_OPS = {set_op: field for field, set_op, _ in LIST_FIELDS}
+_SIZE_OPS = {size_op: field for field, _, size_op in LIST_FIELDS}
+
+
+class ChangedList(list):
+    """
+    Creature dicts for a list field that know which slots changed since an
+    earlier list of the same field (base). diff_state() compares only
+    those slots when the old save's list is base itself.
+    """
+
+    def __init__(self, creatures=(), base=None, changed=()):
+        super().__init__(creatures)
+        self.base = weakref.ref(base) if base is not None else None
+        self.changed = changed
+
+
+def diff_state(old, new):
+    """Journal operations that turn save dict old into new"""
+    ops = [[field, new.get(field)] for field in SCALAR_FIELDS if old.get(field) != new.get(field)]
+
+    old_items, new_items = old['inventory'], new['inventory']
+    for name, count in new_items.items():
+        if old_items.get(name) != count:
+            ops.append(['item', name, count])
+    ops.extend(['item', name, None] for name in old_items if name not in new_items)
+
+    for field, set_op, size_op in LIST_FIELDS:
+        old_list, new_list = old.get(field, ()), new.get(field, ())
+        base = getattr(new_list, 'base', None)
+        slots = new_list.changed if base is not None and base() is old_list else range(len(new_list))
+        for slot in slots:
+            creature = new_list[slot]
+            if slot >= len(old_list) or old_list[slot] != creature:
+                ops.append([set_op, slot, creature])
+        if len(new_list) < len(old_list):
+            ops.append([size_op, len(new_list)])
+    return ops
+
+
+def apply_ops(state, ops):
+    """Apply diff_state operations to a save dict in place"""
+    for op in ops:
+        kind = op[0]
+        if kind == 'item':
+            _, name, count = op
+            if count is None:
+                state['inventory'].pop(name, None)
+            else:
+                state['inventory'][name] = count
+        elif kind in _LIST_OPS:
+            _, slot, creature = op
+            creatures = state.setdefault(_LIST_OPS[kind], [])
+            if slot < len(creatures):
+                creatures[slot] = creature
+            else:
+                creatures.append(creature)
+        elif kind in _SIZE_OPS:
+            del state[_SIZE_OPS[kind]][op[1]:]
+        else:
+            state[kind] = op[1]
+    return state
+
+
+def _write_durably(f, text):
+    f.write(text)
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class SaveJournal:
+    """
+    Snapshot + journal save files for one save path.
+    save() takes the full save dict and writes only its changes since the
+    last save() or load(); the first save of a session writes a snapshot.
+    """
+
+    COMPACT_AFTER = 50
+
+    def __init__(self, path, compact_after=None):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        self.compact_after = compact_after or self.COMPACT_AFTER
+        self._saved = None  # Save dict as last written or loaded
+        self._seq = 0  # Sequence number of the last journal entry
+        self._entries = 0  # Journal entries since the last snapshot
+
+    def save(self, state):
+        """Save a save dict; returns the number of journal operations written"""
+        if self._saved is None:
+            self.compact(state)
+            return 0
+
+        ops = diff_state(self._saved, state)
+        if not ops:
+            return 0
+        self._seq += 1
+        line = json.dumps({'seq': self._seq, 'ops': ops}, separators=(',', ':'))
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            _write_durably(f, line + "\n")
+        self._saved = state
+        self._entries += 1
+        if self._entries >= self.compact_after:
+            self.compact(state)
+        return len(ops)
+
+    def compact(self, state):
+        """Write state as the new snapshot and empty the journal"""
+        snapshot = dict(state, journal_seq=self._seq)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            _write_durably(f, json.dumps(snapshot, indent=2))
+        os.replace(temp_path, self.path)
+        # Entries up to journal_seq are now in the snapshot, so a crash
+        # before this truncation only leaves entries that load skips
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self._saved = state
+        self._entries = 0
+
+    def load(self):
+        """Read the snapshot and replay the journal; raises FileNotFoundError without a save"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        seq = state.pop('journal_seq', 0)
+        entries = 0
+
+        try:
+            with open(self.journal_path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        good = 0  # Bytes of complete journal lines
+        for line in lines:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated journal line")
+                entry = json.loads(line)
+            except ValueError:
+                # Torn write from a crash: drop it so later appends start on a clean line
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good)
+                break
+            good += len(line)
+            if entry['seq'] <= seq:
+                continue  # Already folded into the snapshot
+            apply_ops(state, entry['ops'])
+            seq = entry['seq']
+            entries += 1
+
+        self._seq = seq
+        self._entries = entries
+        self._saved = json.loads(json.dumps(state))  # Private copy to diff against
+        return state
@@ -0,0 +1,397 @@
+"""
+Save slots for Trapper-Mastering.
+
+Each slot is a base snapshot file in SLOT_DIR plus a journal of deltas
+next to it. The snapshot is a fixed-size header followed by a binary save
+body (see save_binary.py). The header holds what a slot picker shows -
+player name, location, money, playtime, party summary and save time -
+plus the body's size and CRC-32, so a damaged save is caught before it
+is loaded. Saves after the first append one journal line each, holding
+the changes since the previous save (see save_journal.diff_state), that
+save's header fields and a CRC-32 of the line; every COMPACT_AFTER
+entries the slot is rewritten as a new snapshot and the journal emptied.
+
+index.json keeps a copy of every slot's current header, so listing slots
+reads one small file rather than every save; an entry is re-read (and
+the body's CRC checked) when the slot or journal file's size or
+modification time no longer match.
+"""
+
+import json
+import os
+import re
+import struct
+import time
+import zlib
+
+from save_binary import encode_save, read_save
+from save_journal import apply_ops, diff_state
+
+SLOT_DIR = 'saves'
+INDEX_FILE = 'index.json'
+MAX_SLOTS = 99
+
+SLOT_MAGIC = b'TMSL'
+SLOT_VERSION = 1
+NAME_BYTES = 24  # Player name and location, UTF-8, truncated to fit
+SPECIES_BYTES = 16
+PARTY_SLOTS = 6
+# magic, version, player name, location, money, playtime seconds, saved at
+# (Unix time), party size, (species, level) per party slot, body size, body CRC-32
+HEADER = struct.Struct(f'<4sH{NAME_BYTES}s{NAME_BYTES}sqIdB'
+                       + f'{SPECIES_BYTES}sH' * PARTY_SLOTS + 'II')
+
+_SLOT_FILE = re.compile(r'slot(\d\d)\.sav')
+JOURNAL_SUFFIX = '.journal'
+# Bytes per read while checking a body's CRC
+_CRC_CHUNK = 1 << 16
+
+
+def _fixed(text, size):
+    """UTF-8 bytes of text cut to at most size bytes without splitting a character"""
+    return text.encode('utf-8')[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _text(raw):
+    return raw.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+def pack_header(state, body, saved_at):
+    """Slot header bytes for a save dict and its encoded body"""
+    party = [(creature['name'], creature['level']) for creature in state['party'][:PARTY_SLOTS]]
+    fields = []
+    for name, level in party + [("", 0)] * (PARTY_SLOTS - len(party)):
+        fields += [_fixed(name, SPECIES_BYTES), level]
+    return HEADER.pack(SLOT_MAGIC, SLOT_VERSION, _fixed(state['player_name'], NAME_BYTES),
+                       _fixed(state['location'], NAME_BYTES), state['money'],
+                       state.get('playtime', 0), saved_at, len(party), *fields,
+                       len(body), zlib.crc32(body))
+
+
+def unpack_header(data):
+    """Header dict from slot header bytes; raises ValueError if they aren't a slot header"""
+    if len(data) != HEADER.size:
+        raise ValueError("truncated save slot header")
+    fields = HEADER.unpack(data)
+    magic, version, name, location, money, playtime, saved_at, party_size = fields[:8]
+    if magic != SLOT_MAGIC:
+        raise ValueError("not a save slot file")
+    if version > SLOT_VERSION:
+        raise ValueError(f"unsupported save slot version {version}")
+    party = fields[8:8 + 2 * PARTY_SLOTS]
+    return {
+        'player_name': _text(name),
+        'location': _text(location),
+        'money': money,
+        'playtime': playtime,
+        'saved_at': saved_at,
+        'party': [[_text(party[2 * i]), party[2 * i + 1]] for i in range(party_size)],
+        'body_size': fields[-2],
+        'crc': fields[-1],
+    }
+
+
+def describe_slot(slot, header):
+    """One menu line for a slot header"""
+    if header.get('corrupt'):
+        return f"{slot}. [unreadable save]"
+    hours, seconds = divmod(header['playtime'], 3600)
+    party = ", ".join(f"{name} Lv.{level}" for name, level in header['party'])
+    saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(header['saved_at']))
+    return (f"{slot}. {header['player_name']} - {header['location']} - ${header['money']}"
+            f" - {hours}:{seconds // 60:02d} played - {party} - saved {saved}")
+
+
+def summarize(state, saved_at):
+    """Header fields (as in unpack_header, without the body's) describing a save dict"""
+    header = unpack_header(pack_header(state, b'', saved_at))
+    del header['body_size'], header['crc']
+    return header
+
+
+def _journal_line(entry):
+    """Journal line for an entry: CRC-32 of its JSON, in hex, then the JSON"""
+    data = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(data), data)
+
+
+def _base_id(header):
+    """Identifies a base snapshot, so journal entries written for an older one are skipped"""
+    return [header['crc'], header['saved_at']]
+
+
+class SlotSave:
+    """
+    One save slot, with the same save()/load() interface as SaveJournal.
+    save() takes the full save dict; the first save of a session (without
+    a load()) writes a base snapshot, later ones journal only the changes
+    since the last save() or load().
+    """
+
+    COMPACT_AFTER = 50
+
+    def __init__(self, slots, slot, compact_after=None):
+        self.slots = slots
+        self.slot = slot
+        self.compact_after = compact_after or self.COMPACT_AFTER
+        self._saved = None  # Save dict as last written or loaded
+        self._header = None  # Header of the slot's base snapshot
+        self._entries = 0  # Journal entries since the base snapshot
+
+    def save(self, state):
+        """Save a save dict; returns the number of journal operations written"""
+        if self._saved is None:
+            self.compact(state)
+            return 0
+
+        ops = diff_state(self._saved, state)
+        if not ops:
+            return 0
+        header = summarize(state, time.time())
+        entry = {'base': _base_id(self._header), 'header': header, 'ops': ops}
+        self.slots._append_journal(self.slot, self._header, entry)
+        self._saved = state
+        self._entries += 1
+        if self._entries >= self.compact_after:
+            self.compact(state)
+        return len(ops)
+
+    def compact(self, state):
+        """Write state as the slot's new base snapshot and empty its journal"""
+        self._header = self.slots._write_base(self.slot, state)
+        self._saved = state
+        self._entries = 0
+
+    def load(self):
+        """Read the slot (see SaveSlots.load), with its PC box as a list to diff later saves against"""
+        state, header, entries = self.slots._load(self.slot, repair=True)
+        if 'pc_box' in state:
+            state['pc_box'] = list(state['pc_box'])
+        self._header = header
+        self._entries = entries
+        self._saved = json.loads(json.dumps(state))  # Private copy to diff against
+        return state
+
+
+class SaveSlots:
+    """Numbered save slots in one directory, listed through a header index"""
+
+    def __init__(self, directory=SLOT_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._handlers = {}  # slot -> SlotSave, so every save to a slot shares one journal position
+
+    def path(self, slot):
+        return os.path.join(self.directory, f"slot{slot:02d}.sav")
+
+    def journal_path(self, slot):
+        return os.path.join(self.directory, f"slot{slot:02d}{JOURNAL_SUFFIX}")
+
+    def slot(self, slot):
+        """Save handler for one slot (for Game.saves)"""
+        if not 1 <= slot <= MAX_SLOTS:
+            raise ValueError(f"save slots are numbered 1-{MAX_SLOTS}")
+        handler = self._handlers.get(slot)
+        if handler is None:
+            handler = self._handlers[slot] = SlotSave(self, slot)
+        return handler
+
+    def save(self, slot, state):
+        """Save a save dict to a slot through its handler (see SlotSave.save)"""
+        return self.slot(slot).save(state)
+
+    def _write_base(self, slot, state):
+        """Write a slot's base snapshot (atomically), empty its journal and update the index"""
+        body = encode_save(state)
+        header = pack_header(state, body, time.time())
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(slot)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        # Entries left by a crash before this truncation name the old base, so loads skip them
+        with open(self.journal_path(slot), 'wb'):
+            pass
+
+        header = unpack_header(header)
+        self._update_index(slot, header)
+        return header
+
+    def _append_journal(self, slot, base_header, entry):
+        """Append one journal entry durably and index the header fields it carries"""
+        with open(self.journal_path(slot), 'ab') as f:
+            f.write(_journal_line(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        self._update_index(slot, dict(base_header, **entry['header']))
+
+    def _update_index(self, slot, header):
+        index = self._read_index()
+        index[str(slot)] = self._entry(slot, header)
+        self._write_index(index)
+
+    def _base_header(self, slot):
+        """Header of a slot's base snapshot, reading only the header bytes"""
+        with open(self.path(slot), 'rb') as f:
+            return unpack_header(f.read(HEADER.size))
+
+    def _journal(self, slot, header, repair=False):
+        """
+        Journal entries written on top of the base snapshot with this header.
+        A torn last line (a crash mid-append) is skipped, and with repair cut
+        off so later appends start on a clean line; a damaged line before
+        the last raises ValueError.
+        """
+        try:
+            with open(self.journal_path(slot), 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        base = _base_id(header)
+        entries = []
+        good = 0  # Bytes of complete journal lines
+        for number, line in enumerate(lines):
+            try:
+                crc, _, data = line.rstrip(b"\n").partition(b" ")
+                if not line.endswith(b"\n") or int(crc, 16) != zlib.crc32(data):
+                    raise ValueError("damaged journal line")
+                entry = json.loads(data)
+            except ValueError:
+                if number < len(lines) - 1:
+                    raise ValueError(f"save slot {slot} journal is corrupt (checksum mismatch)")
+                if repair:
+                    with open(self.journal_path(slot), 'r+b') as f:
+                        f.truncate(good)
+                break
+            good += len(line)
+            if entry['base'] == base:
+                entries.append(entry)
+        return entries
+
+    def header(self, slot):
+        """
+        A slot's current header dict: its base snapshot's header, updated
+        with the fields of the last journal entry (no save body is read)
+        """
+        header = self._base_header(slot)
+        entries = self._journal(slot, header)
+        if entries:
+            header.update(entries[-1]['header'])
+        return header
+
+    def verify(self, slot):
+        """Whether a slot's body matches the size and CRC-32 in its header"""
+        try:
+            header = self._base_header(slot)
+            crc = 0
+            size = 0
+            with open(self.path(slot), 'rb') as f:
+                f.seek(HEADER.size)
+                for chunk in iter(lambda: f.read(_CRC_CHUNK), b''):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+        except ValueError:
+            return False
+        return size == header['body_size'] and crc == header['crc']
+
+    def load(self, slot):
+        """
+        Read a slot as a save dict with its journal replayed; checks the CRCs
+        first. The PC box is streamed (see read_save) unless journal entries
+        had to be applied to it.
+        """
+        return self._load(slot)[0]
+
+    def _load(self, slot, repair=False):
+        """(save dict, base snapshot header, journal entries applied) for a slot"""
+        if not os.path.exists(self.path(slot)):
+            raise FileNotFoundError(self.path(slot))
+        if not self.verify(slot):
+            raise ValueError(f"save slot {slot} is corrupt (checksum mismatch)")
+        header = self._base_header(slot)
+        entries = self._journal(slot, header, repair)
+        state = read_save(self.path(slot), offset=HEADER.size)
+        if entries and 'pc_box' in state:
+            state['pc_box'] = list(state['pc_box'])
+        for entry in entries:
+            apply_ops(state, entry['ops'])
+        return state, header, len(entries)
+
+    def delete(self, slot):
+        os.remove(self.path(slot))
+        try:
+            os.remove(self.journal_path(slot))
+        except FileNotFoundError:
+            pass
+        self._handlers.pop(slot, None)
+        index = self._read_index()
+        if index.pop(str(slot), None) is not None:
+            self._write_index(index)
+
+    def list_slots(self):
+        """
+        (slot, header dict) pairs for every slot file, in slot order. Headers
+        come from the index; slots written or changed behind its back are
+        re-read, with their body and journal checksums checked, and the index
+        is updated. Unreadable or damaged slots are returned as {'corrupt': True}.
+        """
+        index = self._read_index()
+        slots = []
+        changed = False
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            match = _SLOT_FILE.fullmatch(entry.name)
+            if not match:
+                continue
+            slot = int(match.group(1))
+            cached = index.get(str(slot))
+            if cached is None or cached.get('files') != self._stats(slot, entry.stat()):
+                try:
+                    header = self.header(slot) if self.verify(slot) else {'corrupt': True}
+                except ValueError:
+                    header = {'corrupt': True}
+                cached = index[str(slot)] = self._entry(slot, header)
+                changed = True
+            slots.append((slot, cached))
+
+        # Drop index entries whose slot files are gone
+        present = {str(slot) for slot, _ in slots}
+        for key in [key for key in index if key not in present]:
+            del index[key]
+            changed = True
+        if changed:
+            self._write_index(index)
+        return sorted(slots, key=lambda pair: pair[0])
+
+    def _stats(self, slot, stat=None):
+        """[size, mtime] of a slot's snapshot and journal files, to spot changes"""
+        stat = stat or os.stat(self.path(slot))
+        try:
+            journal = os.stat(self.journal_path(slot))
+            journal_stats = [journal.st_size, journal.st_mtime_ns]
+        except FileNotFoundError:
+            journal_stats = [0, 0]
+        return [stat.st_size, stat.st_mtime_ns] + journal_stats
+
+    def _entry(self, slot, header):
+        return dict(header, files=self._stats(slot))
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}  # Rebuilt from the slot headers by list_slots()
+
+    def _write_index(self, index):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_path)
@@ -0,0 +1,326 @@
+"""
+Exact outcome probabilities for one-on-one wild battles.
+
+A battle turn is fully defined by Creature.calculate_damage (accuracy,
+85-100% roll, type multiplier) and Battle.player_attack turn order, so the
+chance of winning or catching can be computed exactly instead of sampled.
+BattleSolver does dynamic programming over (player HP, wild HP, traps left)
+states for one matchup and policy. Damage distributions are exact for the
+continuous 85-100% roll and memoized per base damage and accuracy.
+
+The player side is the active creature only: if it faints the battle
+counts as lost, even when the party has other creatures.
+
+The solver is status-blind: lost turns, damage multipliers, residual
+damage and the catch-rate multiplier of status conditions are not
+modelled, so odds for a statused creature assume it has no status.
+"""
+
+from functools import lru_cache
+
+from player import TRAP_TYPES
+from battle import catch_chance
+
+
+@lru_cache(maxsize=4096)
+def hit_distribution(base, accuracy):
+    """
+    Exact damage distribution of one attack, as ((damage, probability), ...).
+    base is Creature.base_damage for the attacker/move/target; misses and
+    zero-damage hits both count as damage 0.
+    """
+    hit = min(max(accuracy / 100, 0.0), 1.0)
+    outcomes = {0: 1.0 - hit}
+    if hit and base > 0:
+        # damage = int(base * u) for u uniform in [0.85, 1.0)
+        low = 0.85 * base
+        for damage in range(int(low), int(base) + 1):
+            width = min(damage + 1, base) - max(damage, low)
+            if width > 0:
+                outcomes[damage] = outcomes.get(damage, 0.0) + hit * width / (base - low)
+    elif hit:
+        outcomes[0] = 1.0
+    return tuple(sorted((d, p) for d, p in outcomes.items() if p > 0))
+
+
+def damage_distribution(attacker, move, target):
+    """Exact damage distribution of attacker using move on target"""
+    return hit_distribution(attacker.base_damage(move, target), move.accuracy)
+
+
+def wild_distribution(wild_creature, target):
+    """Damage distribution of the wild creature's turn (a uniformly random move)"""
+    moves = wild_creature.moves
+    if not moves:
+        return ((0, 1.0),)
+    mixed = {}
+    for move in moves:
+        for damage, p in damage_distribution(wild_creature, move, target):
+            mixed[damage] = mixed.get(damage, 0.0) + p / len(moves)
+    return tuple(sorted(mixed.items()))
+
+
+def expected_damage(distribution):
+    return sum(d * p for d, p in distribution)
+
+
+class FixedMovePolicy:
+    """Always attack with the move at index"""
+
+    def __init__(self, index):
+        self.index = index
+        self.key = ('fixed', index)
+
+    def moves(self, distributions):
+        return [self.index]
+
+
+class GreedyPolicy:
+    """Always attack with the move with the highest expected damage"""
+
+    key = ('greedy',)
+
+    def moves(self, distributions):
+        damages = [expected_damage(d) for d in distributions]
+        return [damages.index(max(damages))]
+
+
+class BestMovePolicy:
+    """Pick the move that maximizes the win probability in every state"""
+
+    key = ('best',)
+
+    def moves(self, distributions):
+        return list(range(len(distributions)))
+
+
+class CatchBelowPolicy:
+    """
+    Throw trap_name while the wild creature is at or below hp_fraction of
+    its max HP and traps are left; otherwise attack with attack_policy.
+    """
+
+    def __init__(self, trap_name="Basic Trap", hp_fraction=0.5, attack_policy=None):
+        self.trap = TRAP_TYPES[trap_name]
+        self.hp_fraction = hp_fraction
+        self.attack_policy = attack_policy or GreedyPolicy()
+        self.key = ('catch', trap_name, hp_fraction, self.attack_policy.key)
+
+    def moves(self, distributions):
+        return self.attack_policy.moves(distributions)
+
+
+GREEDY = GreedyPolicy()
+BEST = BestMovePolicy()
+
+
+def stat_key(creature):
+    """Stat tuple identifying a creature for the solver cache"""
+    return (creature.level, creature.attack, creature.defense, creature.speed,
+            creature.type_id, creature.max_hp,
+            tuple((m.power, m.accuracy, m.type_id) for m in creature.moves))
+
+
+class BattleSolver:
+    """
+    Win and catch probabilities for every state of one matchup under one policy.
+    States are (player HP, wild HP, traps left); with unlimited_traps the
+    traps count is ignored.
+    Values are computed for all HP values up to max HP, so later queries
+    (after damage or healing) are table lookups.
+    """
+
+    THROW = -1  # action() value for throwing the policy's trap
+
+    def __init__(self, player_creature, wild_creature, policy=GREEDY, unlimited_traps=False):
+        self.policy = policy
+        self.player_max = player_creature.max_hp
+        self.wild_max = wild_creature.max_hp
+        self.player_first = player_creature.speed >= wild_creature.speed
+        self.unlimited_traps = unlimited_traps
+
+        self.move_dists = [damage_distribution(player_creature, m, wild_creature)
+                           for m in player_creature.moves]
+        self.wild_dist = wild_distribution(wild_creature, player_creature)
+        self.candidates = policy.moves(self.move_dists) if self.move_dists else []
+
+        trap = getattr(policy, 'trap', None)
+        self.catch_chances = [0.0] * (self.wild_max + 1)
+        self.catch_below = -1
+        if trap is not None:
+            self.catch_below = int(policy.hp_fraction * self.wild_max)
+            for w in range(1, self.catch_below + 1):
+                self.catch_chances[w] = catch_chance(trap, w, self.wild_max)
+
+        self._layers = []  # (win, catch, action) grids per traps left
+
+    def _layer(self, traps):
+        if self.unlimited_traps:
+            traps = 0
+        while len(self._layers) <= traps:
+            self._layers.append(self._solve_layer(len(self._layers)))
+        return self._layers[traps]
+
+    def _solve_layer(self, traps):
+        """Solve all (player HP, wild HP) states with traps left"""
+        pmax, wmax = self.player_max, self.wild_max
+        can_catch = self.unlimited_traps or traps > 0
+        below = self.catch_below if can_catch else -1
+        if traps and not self.unlimited_traps:
+            prev_win, prev_catch, _ = self._layers[traps - 1]
+
+        wild_hits = [(e, p) for e, p in self.wild_dist if e > 0]
+        wild_zero = sum(p for e, p in self.wild_dist if e == 0)
+        moves = []
+        for m in self.candidates:
+            dist = self.move_dists[m]
+            moves.append(([(d, p) for d, p in dist if d > 0], sum(p for d, p in dist if d == 0)))
+
+        win = [[0.0] * (wmax + 1) for _ in range(pmax + 1)]
+        catch = [[0.0] * (wmax + 1) for _ in range(pmax + 1)]
+        action = [[None] * (wmax + 1) for _ in range(pmax + 1)]
+        # Player first: h[p][w] = value after the player's hit left the wild at w
+        # Wild first: k[m][p][w] = value after the wild's hit left the player at p
+        if self.player_first:
+            h_win = [[0.0] * (wmax + 1) for _ in range(pmax + 1)]
+            h_catch = [[0.0] * (wmax + 1) for _ in range(pmax + 1)]
+        else:
+            k_win = [[[0.0] * (wmax + 1) for _ in range(pmax + 1)] for _ in moves]
+            k_catch = [[[0.0] * (wmax + 1) for _ in range(pmax + 1)] for _ in moves]
+
+        for w in range(1, wmax + 1):
+            for p in range(1, pmax + 1):
+                # Wild hits on the current wild HP (a free move, or the wild moving second)
+                after_win = after_catch = 0.0
+                for e, pe in wild_hits:
+                    if p > e:
+                        after_win += pe * win[p - e][w]
+                        after_catch += pe * catch[p - e][w]
+
+                best_win, best_catch, best_action = -1.0, 0.0, None
+                if w <= below:
+                    chance = self.catch_chances[w]
+                    best_action = self.THROW
+                    if self.unlimited_traps:
+                        # A miss by the wild leads back to this state
+                        scale = 1.0 / (1.0 - (1.0 - chance) * wild_zero)
+                        best_win = (1.0 - chance) * after_win * scale
+                        best_catch = (chance + (1.0 - chance) * after_catch) * scale
+                    else:
+                        free_win = free_catch = 0.0
+                        for e, pe in self.wild_dist:
+                            if p > e:
+                                free_win += pe * prev_win[p - e][w]
+                                free_catch += pe * prev_catch[p - e][w]
+                        best_win = (1.0 - chance) * free_win
+                        best_catch = chance + (1.0 - chance) * free_catch
+                else:
+                    for i, (hits, zero) in enumerate(moves):
+                        loop = zero * wild_zero
+                        if self.player_first:
+                            v = zero * after_win
+                            c = zero * after_catch
+                            for d, pd in hits:
+                                if w > d:
+                                    v += pd * h_win[p][w - d]
+                                    c += pd * h_catch[p][w - d]
+                                else:
+                                    v += pd
+                        else:
+                            k_w, k_c = k_win[i], k_catch[i]
+                            v = c = 0.0
+                            for e, pe in wild_hits:
+                                if p > e:
+                                    v += pe * k_w[p - e][w]
+                                    c += pe * k_c[p - e][w]
+                            own_win = own_catch = 0.0
+                            for d, pd in hits:
+                                if w > d:
+                                    own_win += pd * win[p][w - d]
+                                    own_catch += pd * catch[p][w - d]
+                                else:
+                                    own_win += pd
+                            v += wild_zero * own_win
+                            c += wild_zero * own_catch
+                            k_w[p][w] = own_win
+                            k_c[p][w] = own_catch
+                        if loop < 1.0:
+                            v /= 1.0 - loop
+                            c /= 1.0 - loop
+                        else:
+                            v = c = 0.0  # nobody can ever deal damage
+                        if v > best_win:
+                            best_win, best_catch, best_action = v, c, self.candidates[i]
+                    best_win = max(best_win, 0.0)
+
+                win[p][w] = best_win
+                catch[p][w] = best_catch
+                action[p][w] = best_action
+                if self.player_first:
+                    h_win[p][w] = after_win + wild_zero * best_win
+                    h_catch[p][w] = after_catch + wild_zero * best_catch
+                else:
+                    for i, (hits, zero) in enumerate(moves):
+                        k_win[i][p][w] += zero * best_win
+                        k_catch[i][p][w] += zero * best_catch
+
+        return win, catch, action
+
+    def outcome(self, player_hp, wild_hp, traps=0):
+        """(win probability, catch probability) from a state"""
+        if wild_hp <= 0:
+            return 1.0, 0.0
+        if player_hp <= 0:
+            return 0.0, 0.0
+        win, catch, _ = self._layer(traps)
+        return win[player_hp][wild_hp], catch[player_hp][wild_hp]
+
+    def action(self, player_hp, wild_hp, traps=0):
+        """Move index the policy uses in a state, THROW, or None if the battle is over"""
+        if player_hp <= 0 or wild_hp <= 0:
+            return None
+        return self._layer(traps)[2][player_hp][wild_hp]
+
+    def win_probability(self, player_hp, wild_hp, traps=0):
+        return self.outcome(player_hp, wild_hp, traps)[0]
+
+    def catch_probability(self, player_hp, wild_hp, traps=0):
+        return self.outcome(player_hp, wild_hp, traps)[1]
+
+
+# Solvers by matchup stats and policy; the oldest entry is dropped when full
+SOLVER_CACHE_SIZE = 256
+_SOLVERS = {}
+
+
+def get_solver(player_creature, wild_creature, policy=GREEDY, unlimited_traps=False):
+    """BattleSolver for this matchup, shared between creatures with equal stats"""
+    key = (stat_key(player_creature), stat_key(wild_creature), policy.key, unlimited_traps)
+    solver = _SOLVERS.get(key)
+    if solver is None:
+        if len(_SOLVERS) >= SOLVER_CACHE_SIZE:
+            del _SOLVERS[next(iter(_SOLVERS))]
+        solver = _SOLVERS[key] = BattleSolver(player_creature, wild_creature, policy,
+                                              unlimited_traps)
+    return solver
+
+
+def battle_odds(battle, policy=GREEDY):
+    """(win probability, catch probability) of a Battle's current state under policy"""
+    trap = getattr(policy, 'trap', None)
+    traps = battle.player.get_item_count(trap.name) if trap is not None else 0
+    solver = get_solver(battle.player_creature, battle.wild_creature, policy)
+    return solver.outcome(battle.player_creature.current_hp,
+                          battle.wild_creature.current_hp, traps)
+
+
+def battle_hint(battle):
+    """
+    (win probability with the best moves, Move to use now) for a Battle's
+    current state, ignoring status conditions (see the module docstring)
+    """
+    pc, wild = battle.player_creature, battle.wild_creature
+    solver = get_solver(pc, wild, BEST)
+    index = solver.action(pc.current_hp, wild.current_hp)
+    move = pc.moves[index] if index is not None else None
+    return solver.win_probability(pc.current_hp, wild.current_hp), move
@@ -0,0 +1,293 @@
+"""
+SQLite-backed PC box for Trapper-Mastering.
+Keeps boxed creatures in a local SQLite file instead of memory. Creatures
+are paged in lazily when viewed or withdrawn, and changes are written
+back in batched transactions, so opening a box costs the same however
+many creatures it holds. Supports the same box operations and query API
+as IndexedBox and can be passed to Player(pc_box=...).
+"""
+
+import json
+import sqlite3
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from creature import Creature
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS creatures (
+    pos INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    species_id INTEGER,
+    level INTEGER NOT NULL,
+    max_hp INTEGER NOT NULL,
+    current_hp INTEGER NOT NULL,
+    attack INTEGER NOT NULL,
+    defense INTEGER NOT NULL,
+    speed INTEGER NOT NULL,
+    status TEXT,
+    shiny INTEGER NOT NULL,
+    moves TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS creatures_pos ON creatures (pos);
+CREATE INDEX IF NOT EXISTS creatures_species ON creatures (name);
+CREATE INDEX IF NOT EXISTS creatures_type ON creatures (type);
+CREATE INDEX IF NOT EXISTS creatures_level ON creatures (level);
+CREATE INDEX IF NOT EXISTS creatures_shiny ON creatures (shiny) WHERE shiny;
+CREATE TABLE IF NOT EXISTS gaps (pos INTEGER PRIMARY KEY);
+"""
+
+_FIELDS = ('name', 'type', 'species_id', 'level', 'max_hp', 'current_hp', 'attack',
+           'defense', 'speed', 'status', 'shiny')
+_COLUMNS = ", ".join(_FIELDS) + ", moves"
+_INSERT = f"INSERT INTO creatures (pos, {_COLUMNS}) VALUES ({', '.join('?' * (len(_FIELDS) + 2))})"
+_UPDATE = f"UPDATE creatures SET {', '.join(f'{f} = ?' for f in _FIELDS)}, moves = ? WHERE pos = ?"
+
+
+def _values(creature):
+    """Column values of a creature, in _FIELDS order plus moves"""
+    return (creature.name, creature.type, creature.species_id, creature.level, creature.max_hp,
+            creature.current_hp, creature.attack, creature.defense, creature.speed,
+            creature.status, int(creature.shiny),
+            json.dumps([[m.name, m.type, m.power, m.accuracy] for m in creature.moves]))
+
+
+def _state(creature):
+    """Cheap fingerprint of a creature's stored fields, to spot changes"""
+    return (creature.name, creature.type, creature.species_id, creature.level, creature.max_hp,
+            creature.current_hp, creature.attack, creature.defense, creature.speed,
+            creature.status, bool(creature.shiny), tuple(creature.moves))
+
+
+def _creature(row):
+    data = dict(zip(_FIELDS, row))
+    data['shiny'] = bool(data['shiny'])
+    data['moves'] = [dict(zip(('name', 'type', 'power', 'accuracy'), m)) for m in json.loads(row[-1])]
+    return Creature.from_dict(data)
+
+
+class SQLiteBox:
+    """
+    PC box stored in a SQLite file, indexed by position, species, type,
+    level and shiny flag.
+
+    Reads load whole pages of PAGE_SIZE creatures into a small LRU cache
+    of CACHE_PAGES pages. Creatures can be changed in place while their
+    page is cached; changes are written back when the page is evicted or
+    on flush().
+    Appends are buffered and inserted BATCH_SIZE at a time. Call close()
+    (or use the box as a context manager) to write everything out.
+
+    Rows are stored by position, and withdrawing a creature leaves a gap
+    (kept in the gaps table) instead of renumbering every later row. Box
+    indexes skip the gaps; once there are more than GAP_LIMIT of them the
+    positions are compacted in one pass.
+    """
+
+    PAGE_SIZE = 256
+    CACHE_PAGES = 8
+    BATCH_SIZE = 1000
+    GAP_LIMIT = 1024
+
+    def __init__(self, path, page_size=None, cache_pages=None, batch_size=None):
+        self.path = path
+        self.page_size = page_size or self.PAGE_SIZE
+        self.cache_pages = cache_pages or self.CACHE_PAGES
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.connection = sqlite3.connect(path)
+        # Write-ahead log: batched commits append to the log instead of syncing the whole file
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+        # Uses the position index, so opening doesn't scan the table
+        self._end = self.connection.execute(
+            "SELECT COALESCE(MAX(pos) + 1, 0) FROM creatures").fetchone()[0]
+        # Sorted positions below _end that hold no creature
+        self._gaps = [pos for pos, in self.connection.execute("SELECT pos FROM gaps ORDER BY pos")]
+        self._appended = []
+        # page number -> (creatures, their positions, their _state() when loaded)
+        self._pages = OrderedDict()
+        self._updates = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def _stored(self):
+        """Number of creatures in the database"""
+        return self._end - len(self._gaps)
+
+    def __len__(self):
+        return self._stored + len(self._appended)
+
+    def _position(self, index):
+        """Stored position of a box index, skipping gaps"""
+        position = index
+        for gap in self._gaps:
+            if gap > position:
+                break
+            position += 1
+        return position
+
+    def _index(self, position):
+        """Box index of a stored position"""
+        return position - bisect_left(self._gaps, position)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("box index out of range")
+        page, offset = divmod(index, self.page_size)
+        return self._page(page)[offset]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def _page(self, page):
+        """Creatures of one page, loading it (and evicting the oldest) if needed"""
+        cached = self._pages.get(page)
+        if cached is not None:
+            self._pages.move_to_end(page)
+            return cached[0]
+
+        if self._appended or self._updates:
+            self._commit()
+        start = page * self.page_size
+        last = min(start + self.page_size, self._stored) - 1
+        rows = self.connection.execute(
+            f"SELECT pos, {_COLUMNS} FROM creatures WHERE pos >= ? AND pos <= ? ORDER BY pos",
+            (self._position(start), self._position(last)))
+        positions, creatures = [], []
+        for row in rows:
+            positions.append(row[0])
+            creatures.append(_creature(row[1:]))
+        self._pages[page] = (creatures, positions, [_state(c) for c in creatures])
+        if len(self._pages) > self.cache_pages:
+            self._write_back(*self._pages.popitem(last=False))
+        return creatures
+
+    def _write_back(self, page, cached):
+        """Queue updates for the changed creatures of a cached page"""
+        creatures, positions, states = cached
+        for offset, creature in enumerate(creatures):
+            if _state(creature) != states[offset]:
+                states[offset] = _state(creature)
+                self._updates.append(_values(creature) + (positions[offset],))
+
+    def append(self, creature):
+        """Box a creature and return its position"""
+        # A cached last page would stay short of the new creature: drop it (keeping its changes)
+        page = len(self) // self.page_size
+        cached = self._pages.pop(page, None)
+        if cached is not None:
+            self._write_back(page, cached)
+        self._appended.append(_values(creature))
+        if len(self._appended) >= self.batch_size:
+            self._commit()
+        return len(self) - 1
+
+    def flush(self):
+        """Write buffered appends and changes to cached creatures in one transaction"""
+        for page, cached in self._pages.items():
+            self._write_back(page, cached)
+        self._commit()
+
+    def _commit(self):
+        """Run the queued inserts and updates in one transaction"""
+        if not self._appended and not self._updates:
+            return
+        with self.connection:
+            if self._updates:
+                self.connection.executemany(_UPDATE, self._updates)
+            if self._appended:
+                self.connection.executemany(
+                    _INSERT, ((self._end + i,) + values for i, values in enumerate(self._appended)))
+        self._end += len(self._appended)
+        self._appended.clear()
+        self._updates.clear()
+
+    def pop(self, index=-1):
+        """Withdraw a creature: remove it from the box and return it"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pop index out of range")
+
+        creature = self[index]
+        self.flush()
+        position = self._position(index)
+        with self.connection:
+            self.connection.execute("DELETE FROM creatures WHERE pos = ?", (position,))
+            if position == self._end - 1:
+                self._end -= 1
+                # Gaps left at the end are just unused positions now
+                while self._gaps and self._gaps[-1] == self._end - 1:
+                    self._end -= 1
+                    self.connection.execute("DELETE FROM gaps WHERE pos = ?", (self._gaps.pop(),))
+            else:
+                insort(self._gaps, position)
+                self.connection.execute("INSERT INTO gaps (pos) VALUES (?)", (position,))
+            if len(self._gaps) > self.GAP_LIMIT:
+                self._compact()
+        first_page = index // self.page_size
+        for page in [p for p in self._pages if p >= first_page]:
+            del self._pages[page]
+        return creature
+
+    def _compact(self):
+        """Renumber positions to close every gap (inside a transaction)"""
+        # Two steps, so no position is ever held twice
+        self.connection.execute(
+            "UPDATE creatures SET pos = -1 - (pos - (SELECT COUNT(*) FROM gaps WHERE gaps.pos < creatures.pos))")
+        self.connection.execute("UPDATE creatures SET pos = -1 - pos WHERE pos < 0")
+        self.connection.execute("DELETE FROM gaps")
+        self._end -= len(self._gaps)
+        self._gaps.clear()
+        self._pages.clear()  # Cached positions are stale
+
+    def close(self):
+        """Write pending changes and close the database"""
+        self.flush()
+        self.connection.close()
+
+    def _where(self, species=None, creature_type=None, min_level=None, max_level=None,
+               shiny=None):
+        clauses, params = [], []
+        for clause, value in (("name = ?", species), ("type = ?", creature_type),
+                              ("level >= ?", min_level), ("level <= ?", max_level)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if shiny is not None:
+            clauses.append("shiny" if shiny else "NOT shiny")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, **criteria):
+        """Positions of the boxed creatures matching every criterion (see IndexedBox.query)"""
+        self.flush()
+        where, params = self._where(**criteria)
+        rows = self.connection.execute(f"SELECT pos FROM creatures{where} ORDER BY pos", params)
+        index = self._index
+        return [index(pos) for pos, in rows]
+
+    def find(self, **criteria):
+        """Creatures matching query(**criteria), paged in like box[pos]"""
+        return [self[pos] for pos in self.query(**criteria)]
+
+    def count(self, **criteria):
+        """Number of boxed creatures matching query(**criteria)"""
+        self.flush()
+        where, params = self._where(**criteria)
+        return self.connection.execute(f"SELECT COUNT(*) FROM creatures{where}", params).fetchone()[0]
+
+    def species_counts(self):
+        """Boxed creatures per species name (for encyclopedia entries)"""
+        self.flush()
+        return dict(self.connection.execute("SELECT name, COUNT(*) FROM creatures GROUP BY name"))
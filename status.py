@@ -0,0 +1,59 @@
+"""
+Status effect tables for Trapper-Mastering.
+
+Status conditions (Creature.status) are compiled once from
+config/status_effects.yaml and the by_status_condition catch modifiers in
+config/capture_probabilities.yaml into flat tables indexed by status id,
+with id 0 meaning no status. Battle and the lockstep engine read these
+tables instead of branching on status names.
+"""
+
+from config_loader import load_config
+
+NO_STATUS = 0
+
+
+class StatusTables:
+    """Per-status effect tables, indexed by status id"""
+
+    def __init__(self, effects, catch_modifiers):
+        names = list(effects) + [n for n in catch_modifiers if n != 'none' and n not in effects]
+        self.names = (None,) + tuple(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        healthy = {'skip_chance': 0.0, 'residual_damage': 0.0, 'damage_multiplier': 1.0}
+        rows = [healthy] + [effects.get(name) or {} for name in names]
+        self.skip_chance = tuple(float(r.get('skip_chance', 0.0)) for r in rows)
+        self.residual_damage = tuple(float(r.get('residual_damage', 0.0)) for r in rows)
+        self.damage_multiplier = tuple(float(r.get('damage_multiplier', 1.0)) for r in rows)
+        # Duration in turns; max_turns 0 means it lasts until cured
+        durations = [r.get('duration') or (0, 0) for r in rows]
+        self.min_turns = tuple(int(low) for low, _ in durations)
+        self.max_turns = tuple(int(high) for _, high in durations)
+        self.catch_multiplier = (float(catch_modifiers.get('none', 1.0)),) + tuple(
+            float(catch_modifiers.get(name, 1.0)) for name in names)
+
+    @classmethod
+    def from_config(cls):
+        """Compile the tables from the YAML config files"""
+        effects = load_config("status_effects")['status_effects']
+        capture = load_config("capture_probabilities")
+        return cls(effects, capture['creature_modifiers']['by_status_condition'])
+
+    def __len__(self):
+        return len(self.names)
+
+    def status_id(self, name):
+        """Get the id of a status name (None for no status)"""
+        try:
+            return self.ids[name]
+        except KeyError:
+            raise ValueError(f"Unknown status condition: {name!r}") from None
+
+    def roll_duration(self, status, rng):
+        """Turns a newly inflicted status lasts (0 = until cured)"""
+        high = self.max_turns[status]
+        return rng.randint(self.min_turns[status], high) if high else 0
+
+
+STATUS = StatusTables.from_config()
@@ -0,0 +1,132 @@
+"""
+Tests for battle move policies and the lookahead AI
+"""
+
+import random
+import time
+import unittest
+
+from creature import SPECIES_BY_NAME, Creature, CreatureType, Move
+from player import Player
+from battle import Battle, BattleResult, RandomMovePolicy
+from ai import LookaheadPolicy, coarsen, with_status
+from status import STATUS
+
+
+def play(seed, wild_policy=None, n=300):
+    """Player win rate in Leafsprout mirror battles with random player moves"""
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(n):
+        player = Player("Sim")
+        player.add_creature(SPECIES_BY_NAME["Leafsprout"].spawn(5))
+        battle = Battle(player, SPECIES_BY_NAME["Leafsprout"].spawn(5), rng=rng,
+                        headless=True, wild_policy=wild_policy)
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(int(rng.random() * len(battle.player_creature.moves)))
+        wins += battle.result == BattleResult.PLAYER_WIN
+    return wins / n
+
+
+class LastMovePolicy:
+    def choose_move(self, creature, target, battle):
+        return creature.moves[-1]
+
+
+class TestMovePolicies(unittest.TestCase):
+    """Test the pluggable wild move policy"""
+
+    def test_default_is_random(self):
+        """Test that the default policy rolls exactly like an explicit RandomMovePolicy"""
+        self.assertEqual(play(3, n=50), play(3, RandomMovePolicy(), n=50))
+
+    def test_custom_policy(self):
+        """Test that Battle asks the wild policy for its moves"""
+        player = Player("Ash")
+        player.add_creature(SPECIES_BY_NAME["Flamepup"].spawn(5))
+        wild = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+        battle = Battle(player, wild, rng=random.Random(1), wild_policy=LastMovePolicy())
+        for _ in range(3):
+            battle.player_attack(0)
+        wild_lines = [line for line in battle.battle_log if line.startswith("Wild Sparkrat used")]
+        self.assertTrue(wild_lines)
+        self.assertTrue(all(wild.moves[-1].name in line for line in wild_lines))
+
+
+class TestLookahead(unittest.TestCase):
+    """Test the expectiminimax policy"""
+
+    def test_coarsen(self):
+        """Test that coarsening keeps total probability and expected damage close"""
+        dist = ((0, 0.1), (5, 0.2), (6, 0.2), (7, 0.2), (8, 0.2), (9, 0.1))
+        coarse = coarsen(dist, buckets=2)
+        self.assertEqual(len(coarse), 3)
+        self.assertAlmostEqual(sum(p for _, p in coarse), 1.0)
+        self.assertAlmostEqual(sum(d * p for d, p in coarse), sum(d * p for d, p in dist), delta=0.2)
+
+    def test_picks_damaging_move(self):
+        """Test that a move with no effect is avoided"""
+        ghost = Creature("Shade", CreatureType.GHOST, level=5)
+        wild = Creature("Wisp", CreatureType.GHOST, level=5, speed=30,
+                        moves=[Move("Tackle", CreatureType.NORMAL, 40), Move("Lick", CreatureType.GHOST, 20)])
+        ghost.moves = [Move("Lick", CreatureType.GHOST, 20)]
+        player = Player("Ash")
+        player.add_creature(ghost)
+        battle = Battle(player, wild, rng=random.Random(1))
+        move = LookaheadPolicy().choose_move(wild, ghost, battle)
+        self.assertEqual(move.name, "Lick")
+
+    def test_node_budget_and_table(self):
+        """Test that decisions are reproducible within the node budget and reuse the table"""
+        player = Player("Ash")
+        player.add_creature(SPECIES_BY_NAME["Windbird"].spawn(30))
+        wild = SPECIES_BY_NAME["Sparkrat"].spawn(30)
+        battle = Battle(player, wild, rng=random.Random(2))
+        policy = LookaheadPolicy(node_budget=200)
+
+        move = policy.choose_move(wild, battle.player_creature, battle)
+        self.assertIn(move, wild.moves)
+        self.assertLess(policy.depth_reached, policy.max_depth)
+        self.assertLessEqual(len(policy.table), 200 + 1)
+        other = LookaheadPolicy(node_budget=200)
+        self.assertIs(other.choose_move(wild, battle.player_creature, battle), move)
+        self.assertEqual(other.depth_reached, policy.depth_reached)
+
+        table = policy.table
+        self.assertTrue(table)
+        policy.choose_move(wild, battle.player_creature, battle)
+        self.assertIs(policy.table, table)
+        # A status change is a new matchup
+        battle.player_creature.status = "poisoned"
+        policy.choose_move(wild, battle.player_creature, battle)
+        self.assertIsNot(policy.table, table)
+
+    def test_time_budget(self):
+        """Test the optional wall-clock limit"""
+        player = Player("Ash")
+        player.add_creature(SPECIES_BY_NAME["Windbird"].spawn(30))
+        wild = SPECIES_BY_NAME["Sparkrat"].spawn(30)
+        battle = Battle(player, wild, rng=random.Random(2))
+        policy = LookaheadPolicy(node_budget=10**9, time_budget=0.003)
+        start = time.perf_counter()
+        policy.choose_move(wild, battle.player_creature, battle)
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertGreaterEqual(policy.depth_reached, 1)
+
+    def test_status_distributions(self):
+        """Test that lost turns and damage multipliers reshape a damage distribution"""
+        dist = ((0, 0.2), (10, 0.4), (11, 0.4))
+        self.assertEqual(with_status(dist, STATUS.status_id(None)), dist)
+        self.assertEqual(with_status(dist, STATUS.status_id("asleep")), ((0, 1.0),))
+        self.assertEqual([d for d, _ in with_status(dist, STATUS.status_id("burned"))], [0, 5])
+        paralyzed = with_status(dist, STATUS.status_id("paralyzed"))
+        self.assertAlmostEqual(paralyzed[0][1], 0.25 + 0.75 * 0.2)
+        self.assertAlmostEqual(sum(p for _, p in paralyzed), 1.0)
+
+    def test_stronger_than_random(self):
+        """Test that the lookahead wild creature wins more often than a random one"""
+        self.assertLess(play(1, LookaheadPolicy()) + 0.15, play(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for the background autosave worker (autosave.py)
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from autosave import AutoSaver
+from creature import SPECIES_BY_NAME
+from game import Game
+from player import Player
+from save_journal import SaveJournal
+from sqlite_box import SQLiteBox
+
+
+class BlockingSaves:
+    """Save handler that records saves and can hold the worker mid-save"""
+
+    def __init__(self):
+        self.saved = []
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def save(self, state):
+        self.started.set()
+        self.release.wait()
+        self.saved.append(state)
+
+
+def make_game(path):
+    game = Game(save_path=path)
+    game.player = Player("Ash")
+    for _ in range(8):
+        game.player.add_creature(SPECIES_BY_NAME["Sparkrat"].spawn(5))
+    return game
+
+
+class TestAutoSaver(unittest.TestCase):
+    """Test background saves"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "savegame.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_saves_in_background(self):
+        """Test that a requested save is written as it was when requested"""
+        game = make_game(self.path)
+        autosaver = AutoSaver(game)
+        expected = game._save_state()
+        autosaver.request()
+        # Play on: none of this is in the requested save
+        game.player.money = 0
+        game.player.pc_box[0].take_damage(5)
+        game.player.add_creature(SPECIES_BY_NAME["Rockbug"].spawn(3))
+        autosaver.close()
+
+        self.assertIsNone(autosaver.error)
+        self.assertEqual(autosaver.saves_written, 1)
+        self.assertEqual(SaveJournal(self.path).load(), expected)
+
+    def test_sqlite_box_not_read(self):
+        """Test that snapshots of a SQLite PC box don't read its creatures"""
+        game = make_game(self.path)
+        box = SQLiteBox(os.path.join(self.directory.name, "box.sqlite"))
+        for _ in range(len(game.player.pc_box)):
+            box.append(SPECIES_BY_NAME["Sparkrat"].spawn(5))
+        game.player.pc_box = box
+        autosaver = AutoSaver(game)
+        with mock.patch.object(SQLiteBox, '_page', side_effect=AssertionError("box read")):
+            autosaver.request()
+            autosaver.close()
+        box.close()
+
+        self.assertIsNone(autosaver.error)
+        saved = SaveJournal(self.path).load()
+        self.assertEqual(saved['pc_box_path'], box.path)
+        self.assertNotIn('pc_box', saved)
+
+    def test_coalesces_requests(self):
+        """Test that requests made during a save collapse into one save of the newest state"""
+        game = make_game(self.path)
+        game.saves = BlockingSaves()
+        game.saves.release.clear()
+        autosaver = AutoSaver(game)
+        autosaver.request()
+        game.saves.started.wait()
+        for money in range(10):
+            game.player.money = money
+            autosaver.request()
+        game.saves.release.set()
+        autosaver.wait()
+
+        self.assertEqual([state['money'] for state in game.saves.saved], [1000, 9])
+        autosaver.close()
+
+    def test_tick_interval(self):
+        """Test that tick() requests a save once per interval"""
+        game = make_game(self.path)
+        game.saves = BlockingSaves()
+        autosaver = AutoSaver(game, interval=1.0)
+        for _ in range(25):
+            autosaver.tick(0.1)
+            autosaver.wait()
+        self.assertEqual(len(game.saves.saved), 2)
+        autosaver.close()
+        with self.assertRaises(RuntimeError):
+            autosaver.request()
+
+    def test_error_kept(self):
+        """Test that a failed save is recorded and later saves still run"""
+        game = make_game(os.path.join(self.directory.name, "missing", "savegame.json"))
+        autosaver = AutoSaver(game)
+        autosaver.request()
+        autosaver.wait()
+        self.assertIsInstance(autosaver.error, OSError)
+
+        game.saves = SaveJournal(self.path)
+        autosaver.request()
+        autosaver.close()
+        self.assertEqual(autosaver.saves_written, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
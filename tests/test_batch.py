@@ -0,0 +1,152 @@
+"""
+Tests for the batched damage engine
+"""
+
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from creature import Creature, Move, CreatureType, TypeId, SPECIES, WILD_CREATURES, shiny_chance
+from batch import calculate_damage_batch, creature_columns, move_columns, spawn_wild_batch
+
+
+class FixedRolls:
+    """Generator stand-in returning the same roll for every battle"""
+
+    def __init__(self, accuracy_roll, damage_roll):
+        self.accuracy_roll = accuracy_roll
+        self.damage_roll = damage_roll
+
+    def random(self, size=None):
+        return np.full(size, self.accuracy_roll, dtype=np.float64)
+
+    def uniform(self, low, high, size=None):
+        return np.full(size, self.damage_roll, dtype=np.float64)
+
+
+class TestDamageBatch(unittest.TestCase):
+    """Test calculate_damage_batch against Creature.calculate_damage"""
+
+    def setUp(self):
+        self.attackers = [
+            Creature("Fire", CreatureType.FIRE, level=10, attack=20),
+            Creature("Water", CreatureType.WATER, level=7),
+            Creature("Electric", CreatureType.ELECTRIC, level=4),
+            Creature("Normal", CreatureType.NORMAL, level=12),
+        ]
+        self.moves = [
+            Move("Ember", CreatureType.FIRE, 40),
+            Move("Water Gun", CreatureType.WATER, 40, accuracy=90),
+            Move("Thunder Shock", CreatureType.ELECTRIC, 40),
+            Move("Tackle", CreatureType.NORMAL, 35, accuracy=95),
+        ]
+        self.targets = [
+            Creature("Grass", CreatureType.GRASS, level=9, defense=10),
+            Creature("Fire", CreatureType.FIRE, level=5),
+            Creature("Ground", CreatureType.GROUND, level=6),
+            Creature("Rock", CreatureType.ROCK, level=8),
+        ]
+
+    def test_matches_scalar_for_same_rolls(self):
+        """Test that identical rolls give identical damage"""
+        for damage_roll in (0.85, 0.9137, 1.0):
+            rng = FixedRolls(0.0, damage_roll)
+            batch = calculate_damage_batch(creature_columns(self.attackers),
+                                           move_columns(self.moves),
+                                           creature_columns(self.targets), rng)
+            with mock.patch('creature.random.random', return_value=0.0), \
+                    mock.patch('creature.random.uniform', return_value=damage_roll):
+                scalar = [a.calculate_damage(m, t)
+                          for a, m, t in zip(self.attackers, self.moves, self.targets)]
+            self.assertEqual(batch.tolist(), scalar)
+
+    def test_miss(self):
+        """Test that rolls at or above accuracy miss"""
+        rng = FixedRolls(0.955, 1.0)
+        damage = calculate_damage_batch(creature_columns(self.attackers),
+                                        move_columns(self.moves),
+                                        creature_columns(self.targets), rng)
+        self.assertEqual(damage.tolist(), [damage[0], 0, damage[2], 0])
+        self.assertGreater(damage[0], 0)
+
+    def test_broadcast_single_move(self):
+        """Test applying one move to many attackers"""
+        attackers = creature_columns(self.attackers)
+        targets = creature_columns(self.targets)
+        move = {'power': 40, 'accuracy': 100, 'type': TypeId.NORMAL}
+        damage = calculate_damage_batch(attackers, move, targets, np.random.default_rng(1))
+        self.assertEqual(damage.shape, (4,))
+        self.assertTrue((damage > 0).all())
+
+    def test_distribution_matches_scalar(self):
+        """Test that miss rate and mean damage match the scalar path"""
+        attacker = Creature("Attacker", CreatureType.WATER, level=15)
+        target = Creature("Target", CreatureType.FIRE, level=15)
+        move = Move("Water Gun", CreatureType.WATER, 40, accuracy=80)
+        n = 40000
+
+        random.seed(7)
+        scalar = np.array([attacker.calculate_damage(move, target) for _ in range(n)])
+        batch = calculate_damage_batch(creature_columns([attacker] * n),
+                                       move_columns([move] * n),
+                                       creature_columns([target] * n),
+                                       np.random.default_rng(7))
+
+        self.assertAlmostEqual((scalar == 0).mean(), (batch == 0).mean(), delta=0.015)
+        hits_scalar = scalar[scalar > 0]
+        hits_batch = batch[batch > 0]
+        self.assertEqual(hits_scalar.min(), hits_batch.min())
+        self.assertEqual(hits_scalar.max(), hits_batch.max())
+        self.assertAlmostEqual(hits_scalar.mean(), hits_batch.mean(), delta=0.2)
+
+
+class TestWildBatch(unittest.TestCase):
+    """Test bulk wild-creature spawning"""
+
+    def test_levels_and_stats(self):
+        """Test that levels follow each species' wild range"""
+        batch = spawn_wild_batch(5000, rng=np.random.default_rng(3))
+        self.assertEqual(len(batch), 5000)
+        for template in WILD_CREATURES:
+            levels = batch.level[batch.species == template.id]
+            self.assertGreater(len(levels), 0)
+            self.assertEqual(levels.min(), template.wild_levels[0])
+            self.assertEqual(levels.max(), template.wild_levels[1])
+        np.testing.assert_array_equal(batch.max_hp, 20 + batch.level * 5)
+
+    def test_environment(self):
+        """Test that environments restrict the species pool"""
+        batch = spawn_wild_batch(500, environment="rock", rng=np.random.default_rng(4))
+        names = {SPECIES[s].name for s in batch.species.tolist()}
+        self.assertEqual(names, {"Rockbug", "Sandmole"})
+
+    def test_shiny(self):
+        """Test that rows are shiny at the configured rate and keep it when materialized"""
+        batch = spawn_wild_batch(200_000, rng=np.random.default_rng(8))
+        self.assertAlmostEqual(batch.shiny.mean(), shiny_chance(), delta=5 * (shiny_chance() / 200_000) ** 0.5)
+        index = int(np.flatnonzero(batch.shiny)[0])
+        self.assertTrue(batch.creature(index).shiny)
+
+        batch = spawn_wild_batch(20, rng=np.random.default_rng(9))
+        batch.shiny[::3] = True
+        self.assertEqual([c.shiny for c in batch.creatures()], batch.shiny.tolist())
+
+    def test_materialize(self):
+        """Test turning rows into creatures on demand"""
+        batch = spawn_wild_batch(50, rng=np.random.default_rng(5))
+        creature = batch.creature(7)
+        self.assertEqual(creature.species_id, batch.species[7])
+        self.assertEqual(creature.level, batch.level[7])
+        self.assertEqual(creature.attack, batch.attack[7])
+        self.assertEqual(len(batch.creatures()), 50)
+
+        target = creature_columns(batch.creatures())
+        move = {'power': 40, 'accuracy': 100, 'type': TypeId.NORMAL}
+        damage = calculate_damage_batch(batch.columns(), move, target, np.random.default_rng(6))
+        self.assertEqual(damage.shape, (50,))
+
+
+if __name__ == '__main__':
+    unittest.main()
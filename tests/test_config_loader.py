@@ -0,0 +1,92 @@
+"""
+Tests for the compiled config cache (config_loader.py)
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import config_loader
+from config_loader import cache_path, load_config
+
+REAL_CONFIG_DIR = config_loader.CONFIG_DIR
+
+
+class TestConfigCache(unittest.TestCase):
+    """Test building, reusing and rebuilding config caches"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        config_dir = os.path.join(self.directory.name, "config")
+        os.mkdir(config_dir)
+        patches = [mock.patch.object(config_loader, 'CONFIG_DIR', config_dir),
+                   mock.patch.object(config_loader, 'CACHE_DIR', os.path.join(self.directory.name, "cache"))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.path = config_loader.config_path("traps")
+        self.write("traps:\n  basic: {rate: 1.0}\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, mtime_ns=None):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def parses(self):
+        """Patch the YAML parser to count the files it parses"""
+        return mock.patch.object(config_loader.yaml, 'safe_load', wraps=config_loader.yaml.safe_load)
+
+    def test_cache_reused(self):
+        """Test that only the first load parses YAML"""
+        with self.parses() as safe_load:
+            self.assertEqual(load_config("traps"), {'traps': {'basic': {'rate': 1.0}}})
+            self.assertTrue(os.path.exists(cache_path("traps")))
+            self.assertEqual(load_config("traps"), {'traps': {'basic': {'rate': 1.0}}})
+        self.assertEqual(safe_load.call_count, 1)
+
+    def test_rebuilt_on_change(self):
+        """Test that edits rebuild the cache and touching a file doesn't"""
+        load_config("traps")
+        stat = os.stat(self.path)
+        with self.parses() as safe_load:
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual(load_config("traps")['traps']['basic']['rate'], 1.0)
+            self.assertEqual(safe_load.call_count, 0)
+
+            self.write("traps:\n  basic: {rate: 0.5}\n  great: {rate: 1.5}\n")
+            self.assertEqual(load_config("traps")['traps']['great']['rate'], 1.5)
+            self.assertEqual(safe_load.call_count, 1)
+
+    def test_bad_cache(self):
+        """Test that corrupt or old-version caches are rebuilt, and an unwritable cache is skipped"""
+        load_config("traps")
+        with open(cache_path("traps"), 'wb') as f:
+            f.write(b"not a pickle")
+        with self.parses() as safe_load:
+            self.assertIn('traps', load_config("traps"))
+            with mock.patch.object(config_loader, 'CACHE_VERSION', 2):
+                self.assertIn('traps', load_config("traps"))
+                self.assertIn('traps', load_config("traps"))
+        self.assertEqual(safe_load.call_count, 2)
+
+        with mock.patch.object(config_loader, 'CACHE_DIR', os.path.join(self.path, "no-dir")):
+            self.assertIn('traps', load_config("traps"))
+
+    def test_real_configs(self):
+        """Test that every shipped config loads the same from YAML and from the cache"""
+        for name in ("berry_types", "capture_probabilities", "creature_spawns",
+                     "status_effects", "trap_types"):
+            with mock.patch.object(config_loader, 'CONFIG_DIR', REAL_CONFIG_DIR):
+                with open(config_loader.config_path(name), 'rb') as f:
+                    expected = config_loader.yaml.safe_load(f)
+                self.assertEqual(load_config(name), expected)
+                self.assertEqual(load_config(name), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for columnar creature storage
+"""
+
+import unittest
+
+from creature import Creature, Move, CreatureType
+from creature_store import CreatureStore
+from player import Player
+from battle import Battle, BattleResult
+
+
+class TestCreatureStore(unittest.TestCase):
+    """Test CreatureStore and its views"""
+
+    def setUp(self):
+        self.store = CreatureStore()
+        self.creature = Creature("StoreMon", CreatureType.WATER, level=12, max_hp=60,
+                                 moves=[Move("Tackle", CreatureType.NORMAL, 40),
+                                        Move("Water Gun", CreatureType.WATER, 40, accuracy=90)])
+        self.creature.take_damage(15)
+
+    def test_slots(self):
+        """Test that creatures no longer carry a __dict__"""
+        self.assertFalse(hasattr(self.creature, '__dict__'))
+
+    def test_round_trip(self):
+        """Test packing and materializing a creature"""
+        row = self.store.append(self.creature)
+        copy = self.store.materialize(row)
+        for attr in ('name', 'type', 'level', 'max_hp', 'current_hp', 'attack',
+                     'defense', 'speed', 'status'):
+            self.assertEqual(getattr(copy, attr), getattr(self.creature, attr))
+        self.assertEqual([m.name for m in copy.moves], ["Tackle", "Water Gun"])
+
+    def test_view_behaves_like_creature(self):
+        """Test that views expose creature data and methods"""
+        self.store.append(self.creature)
+        view = self.store[0]
+        self.assertEqual(view.name, "StoreMon")
+        self.assertEqual(view.type, CreatureType.WATER)
+        self.assertEqual(str(view), str(self.creature))
+
+        view.take_damage(view.current_hp)
+        self.assertTrue(view.is_fainted())
+        self.assertEqual(self.store.current_hp[0], 0)
+        view.full_heal()
+        self.assertEqual(view.current_hp, 60)
+
+    def test_moves_are_shared(self):
+        """Test that equal moves are stored once"""
+        for _ in range(3):
+            self.store.append(self.creature)
+        self.assertEqual(len(self.store.move_table), 2)
+        self.assertIs(self.store[0].moves[0], self.store[2].moves[0])
+
+    def test_pop(self):
+        """Test removing a row"""
+        self.store.append(Creature("First", CreatureType.FIRE, level=3))
+        self.store.append(self.creature)
+        withdrawn = self.store.pop(0)
+        self.assertEqual(withdrawn.name, "First")
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store[0].name, "StoreMon")
+        with self.assertRaises(IndexError):
+            self.store[1]
+
+    def test_stat_range(self):
+        """Test that stats too large for their column raise ValueError without a partial row"""
+        self.store.append(self.creature)
+        self.creature.max_hp = 70_000
+        with self.assertRaises(ValueError):
+            self.store.append(self.creature)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(len(self.store.level), 1)
+        with self.assertRaises(ValueError):
+            self.store[0].attack = -1
+
+    def test_stale_view(self):
+        """Test that views moved or removed by a pop raise ValueError"""
+        for name in ("First", "Second", "Third"):
+            self.store.append(Creature(name, CreatureType.FIRE, level=3))
+        first, second, third = self.store[0], self.store[1], self.store[2]
+        self.store.pop(1)
+        self.assertEqual(first.name, "First")  # Rows before the pop are unaffected
+        with self.assertRaises(ValueError):
+            second.name
+        with self.assertRaises(ValueError):
+            third.current_hp
+        self.assertEqual(self.store[1].name, "Third")
+
+    def test_view_in_battle(self):
+        """Test that a stored creature can battle"""
+        player = Player("Misty")
+        self.store.append(self.creature)
+        player.party.append(self.store[0])
+        wild = Creature("WildMon", CreatureType.FIRE, level=2,
+                        moves=[Move("Scratch", CreatureType.NORMAL, 40)])
+        battle = Battle(player, wild)
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(1)
+        self.assertIn(battle.result, (BattleResult.PLAYER_WIN, BattleResult.PLAYER_LOSE))
+
+    def test_player_pc_box(self):
+        """Test that overflow creatures are packed into the store"""
+        player = Player("Misty")
+        for i in range(8):
+            player.add_creature(Creature(f"Mon{i}", CreatureType.NORMAL, level=5))
+        self.assertIsInstance(player.pc_box, CreatureStore)
+        self.assertEqual([c.name for c in player.pc_box], ["Mon6", "Mon7"])
+
+
+if __name__ == '__main__':
+    unittest.main()
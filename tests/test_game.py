@@ -2,10 +2,13 @@
 Test suite for Trapper-Mastering game
 """
 
+import random
 import unittest
-from creature import Creature, Move, CreatureType, get_random_wild_creature
-from player import Player
-from battle import Battle, BattleResult
+from creature import (Creature, Move, CreatureType, TypeId, TYPE_CHART,
+                      MOVE_MULTIPLIERS, MOVES, SPECIES_BY_NAME, STARTER_CREATURES,
+                      WILD_CREATURES, spawn, get_random_wild_creature)
+from player import Player, Inventory, TRAP_TYPES
+from battle import Battle, BattleResult, catch_probability, catch_chance
 
 
 class TestCreature(unittest.TestCase):
@@ -51,12 +54,70 @@ class TestCreature(unittest.TestCase):
         # Should deal damage due to type advantage and STAB
         self.assertGreater(damage, 0)
     
+    def test_type_chart(self):
+        """Test the dense type chart and combined move multipliers"""
+        self.assertEqual(TYPE_CHART[TypeId.FIRE][TypeId.GRASS], 2.0)
+        self.assertEqual(TYPE_CHART[TypeId.ELECTRIC][TypeId.GROUND], 0.0)
+        self.assertEqual(TYPE_CHART[TypeId.ROCK][TypeId.FIRE], 1.0)
+        self.assertEqual(TYPE_CHART[TypeId.ICE][TypeId.DRAGON], 2.0)
+        # STAB is folded into the move multiplier
+        self.assertEqual(MOVE_MULTIPLIERS[TypeId.FIRE][TypeId.FIRE][TypeId.GRASS], 3.0)
+        self.assertEqual(MOVE_MULTIPLIERS[TypeId.FIRE][TypeId.NORMAL][TypeId.GRASS], 2.0)
+        
+        move = Move("Ember", CreatureType.FIRE, 40)
+        self.assertEqual(move.type_id, TypeId.FIRE)
+        self.assertEqual(move.multipliers[TypeId.FIRE][TypeId.WATER], 0.75)
+    
+    def test_unknown_type(self):
+        """Test that unknown type names are rejected"""
+        with self.assertRaises(ValueError):
+            Creature("TestMon", "Plasma", level=5)
+    
     def test_wild_creature_generation(self):
         """Test generating random wild creatures"""
         creature = get_random_wild_creature()
         self.assertIsInstance(creature, Creature)
         self.assertGreater(creature.level, 0)
         self.assertGreater(len(creature.moves), 0)
+        
+        for _ in range(20):
+            creature = get_random_wild_creature(environment="water")
+            self.assertEqual(creature.name, "Sparkrat")
+    
+    def test_wild_spawn_shares_moves(self):
+        """Test that spawned creatures reuse the interned Move objects"""
+        shared = {id(m) for m in MOVES.values()}
+        for _ in range(1000):
+            creature = get_random_wild_creature()
+            self.assertTrue(all(id(m) in shared for m in creature.moves))
+    
+    def test_spawn(self):
+        """Test spawning creatures from species templates"""
+        template = STARTER_CREATURES["Flamepup"]
+        starter = template.spawn()
+        self.assertEqual(starter.name, "Flamepup")
+        self.assertEqual(starter.max_hp, 25)
+        self.assertEqual(starter.current_hp, 25)
+        self.assertEqual(starter.species_id, template.id)
+        
+        # Each spawn gets its own moves list
+        starter.moves.append(MOVES["Tackle"])
+        self.assertEqual(len(template.moves), 2)
+        
+        rockbug = SPECIES_BY_NAME["Rockbug"]
+        wild = spawn(rockbug.id, level=4)
+        self.assertEqual(wild.level, 4)
+        self.assertEqual(wild.max_hp, 40)
+        for template in WILD_CREATURES:
+            low, high = template.wild_levels
+            self.assertTrue(low <= template.spawn().level <= high)
+    
+    def test_templates_are_immutable(self):
+        """Test that shared moves and species can't be modified"""
+        with self.assertRaises(AttributeError):
+            MOVES["Tackle"].power = 100
+        with self.assertRaises(AttributeError):
+            STARTER_CREATURES["Aquatail"].max_hp = 99
 
 
 class TestPlayer(unittest.TestCase):
@@ -99,6 +160,38 @@ class TestPlayer(unittest.TestCase):
         self.assertEqual(len(player.party), 6)
         self.assertEqual(len(player.pc_box), 1)
     
+    def test_active_creature_tracking(self):
+        """Test that the fainted bitmask follows HP changes and party edits"""
+        player = Player("Ash")
+        party = [SPECIES_BY_NAME["Rockbug"].spawn(5) for _ in range(4)]
+        for creature in party:
+            player.add_creature(creature)
+        self.assertIs(player.get_active_creature(), party[0])
+        
+        party[0].take_damage(1000)
+        party[2].take_damage(1000)
+        self.assertEqual(player.fainted_mask, 0b0101)
+        self.assertIs(player.get_active_creature(), party[1])
+        party[1].take_damage(1000)
+        self.assertIs(player.get_active_creature(), party[3])
+        party[3].take_damage(1000)
+        self.assertIsNone(player.get_active_creature())
+        self.assertFalse(player.has_usable_creatures())
+        
+        party[2].heal(5)
+        self.assertIs(player.get_active_creature(), party[2])
+        del player.party[2]
+        self.assertFalse(player.has_usable_creatures())
+        party[2].take_damage(1)  # No longer in the party
+        player.heal_all_creatures()
+        self.assertEqual(player.fainted_mask, 0)
+        self.assertEqual(party[2].party_hook, None)
+        
+        player.party = [party[3]]
+        party[3].current_hp = 0
+        player.refresh_party()
+        self.assertIsNone(player.get_active_creature())
+    
     def test_item_management(self):
         """Test item usage"""
         player = Player("Ash")
@@ -114,6 +207,42 @@ class TestPlayer(unittest.TestCase):
         # Try to use non-existent item
         result = player.use_item("Nonexistent Item")
         self.assertFalse(result)
+    
+    def test_inventory_categories(self):
+        """Test that per-category item lists follow adds and uses"""
+        player = Player("Ash")
+        inventory = player.inventory
+        self.assertEqual(inventory.category('trap'), ["Basic Trap"])
+        self.assertEqual(inventory.category('heal'), ["Potion"])
+        
+        player.add_item("Ultra Trap", 2)
+        player.add_item("Oran Berry")
+        player.add_item("Mystery Box")
+        self.assertEqual(inventory.category('trap'), ["Basic Trap", "Ultra Trap"])
+        self.assertEqual(inventory.category('berry'), ["Oran Berry"])
+        self.assertEqual(inventory.category('other'), ["Mystery Box"])
+        
+        for _ in range(10):
+            player.use_item("Basic Trap")
+        self.assertEqual(inventory.category('trap'), ["Ultra Trap"])
+        self.assertEqual(inventory, {"Potion": 5, "Ultra Trap": 2, "Oran Berry": 1, "Mystery Box": 1})
+    
+    def test_inventory_from_dict(self):
+        """Test that plain dicts (save files) become categorized inventories"""
+        player = Player("Ash")
+        player.inventory = {"Super Potion": 1, "Super Trap": 3}
+        self.assertIsInstance(player.inventory, Inventory)
+        self.assertEqual(player.inventory.category('heal'), ["Super Potion"])
+        
+        inventory = Inventory(player.inventory)
+        inventory.pop("Super Trap")
+        inventory.setdefault("Basic Trap", 1)
+        inventory.update({"Potion": 2})
+        self.assertEqual(inventory.category('trap'), ["Basic Trap"])
+        self.assertEqual(inventory.category('heal'), ["Super Potion", "Potion"])
+        self.assertEqual(player.inventory.category('trap'), ["Super Trap"])
+        inventory.clear()
+        self.assertEqual(inventory.category('heal'), [])
 
 
 class TestBattle(unittest.TestCase):
@@ -172,6 +301,32 @@ class TestBattle(unittest.TestCase):
             self.assertEqual(battle.result, BattleResult.CAUGHT)
             self.assertGreater(len(self.player.party), initial_party_size)
     
+    def test_catch_probability(self):
+        """Test the closed-form catch chance and its lookup table"""
+        for trap in TRAP_TYPES.values():
+            for max_hp in (7, 25, 60, 333):
+                for current_hp in range(1, max_hp + 1):
+                    # Shake threshold exactly as the four-shake roll computes it
+                    hp_factor = (3 * max_hp - 2 * current_hp) / (3 * max_hp)
+                    shake_check = int((65536 / (255 / (hp_factor * trap.catch_rate * 255))) ** 0.25)
+                    expected = (shake_check / 65536) ** 4
+                    self.assertEqual(catch_probability(trap, current_hp, max_hp), expected)
+                    self.assertEqual(catch_chance(trap, current_hp, max_hp), expected)
+        
+        # Weaker creatures and better traps are easier to catch
+        basic = TRAP_TYPES["Basic Trap"]
+        self.assertGreater(catch_chance(basic, 1, 100), catch_chance(basic, 100, 100))
+        self.assertGreater(catch_chance(TRAP_TYPES["Ultra Trap"], 1, 100), catch_chance(basic, 1, 100))
+    
+    def test_catch_uses_chance(self):
+        """Test that a roll under the catch chance catches"""
+        battle = Battle(self.player, self.wild, rng=random.Random(3))
+        self.assertGreater(battle.get_catch_chance("Basic Trap"), 0)
+        battle.rng.random = lambda: 0.0
+        self.assertTrue(battle.attempt_catch("Basic Trap"))
+        self.assertEqual(battle.result, BattleResult.CAUGHT)
+        self.assertIs(self.player.party[-1], self.wild)
+    
     def test_battle_run(self):
         """Test running from battle"""
         battle = Battle(self.player, self.wild)
@@ -198,6 +353,37 @@ class TestBattle(unittest.TestCase):
         battle._check_battle_end()
         
         self.assertEqual(battle.result, BattleResult.PLAYER_WIN)
+    
+    def _play(self, headless, log_size=None):
+        """Play a seeded battle to the end"""
+        player = Player("Ash")
+        player.add_creature(Creature("PlayerMon", CreatureType.FIRE, level=6,
+                                     moves=[Move("Ember", CreatureType.FIRE, 40)]))
+        wild = Creature("WildMon", CreatureType.WATER, level=6,
+                        moves=[Move("Tackle", CreatureType.NORMAL, 40),
+                               Move("Water Gun", CreatureType.WATER, 40, accuracy=85)])
+        battle = Battle(player, wild, rng=random.Random(11), headless=headless,
+                        log_size=log_size)
+        battle.attempt_catch("Basic Trap")
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(0)
+        return battle
+    
+    def test_headless_matches_logged(self):
+        """Test that headless battles play out and render identically"""
+        logged = self._play(headless=False)
+        headless = self._play(headless=True, log_size=1000)
+        self.assertEqual(headless.result, logged.result)
+        self.assertEqual(headless.battle_log, logged.battle_log)
+        self.assertEqual(headless.get_battle_state()['log'], logged.get_battle_state()['log'])
+        self.assertIn("Ash threw a Basic Trap!", logged.battle_log)
+    
+    def test_headless_log_is_bounded(self):
+        """Test that headless battles keep only the newest events"""
+        logged = self._play(headless=False)
+        headless = self._play(headless=True, log_size=4)
+        self.assertEqual(len(headless.events), 4)
+        self.assertEqual(headless.battle_log, logged.battle_log[-4:])
 
 
 if __name__ == '__main__':
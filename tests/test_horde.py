@@ -0,0 +1,120 @@
+"""
+Tests for horde and double battles
+"""
+
+import random
+import unittest
+
+from creature import SPECIES_BY_NAME, Creature, CreatureType, MOVES
+from player import Player
+from battle import BattleResult
+from horde import HordeBattle, HordeSide
+
+
+class FirstMovePolicy:
+    def choose_move(self, creature, target, battle):
+        return creature.moves[0]
+
+
+def creature(name, speed, hp=50, move="Tackle"):
+    return Creature(name, CreatureType.NORMAL, level=10, max_hp=hp, speed=speed, moves=[MOVES[move]])
+
+
+class TestHordeBattle(unittest.TestCase):
+    """Test turn order, targeting and faint handling"""
+
+    def _battle(self, party, wild, **kwargs):
+        player = Player("Ash")
+        player.party = party
+        return HordeBattle(player, wild, rng=random.Random(1), log_size=1000,
+                           player_policy=FirstMovePolicy(), wild_policy=FirstMovePolicy(), **kwargs)
+
+    def test_turn_order(self):
+        """Test that priority beats speed and speed orders the rest"""
+        slow_quick = creature("Slow", speed=5, move="Quick Attack")
+        fast = creature("Fast", speed=50)
+        medium = creature("Medium", speed=20)
+        battle = self._battle([slow_quick, medium], [fast])
+        battle.play_round()
+        actors = [event[0] for event in battle.events]
+        self.assertEqual(actors, [slow_quick, fast, medium])
+
+    def test_targets_weakest(self):
+        """Test that attacks go to the active foe with the lowest HP"""
+        attacker = creature("Hero", speed=50)
+        weak, strong = creature("Weak", speed=1, hp=40), creature("Strong", speed=1, hp=45)
+        battle = self._battle([attacker], [strong, weak])
+        self.assertEqual(battle.sides[HordeBattle.WILD].weakest(), 1)
+        battle.play_round()
+        self.assertLess(weak.current_hp, 40)
+        self.assertEqual(strong.current_hp, 45)
+
+    def test_healed_outside_battle(self):
+        """Test that creatures healed or revived between rounds can still be targeted"""
+        attacker = creature("Hero", speed=50)
+        first, second = creature("First", speed=1, hp=50), creature("Second", speed=1, hp=45)
+        battle = self._battle([attacker], [first, second])
+        wild_side = battle.sides[HordeBattle.WILD]
+        first.take_damage(40)
+        wild_side.push_target(0)  # As the battle loop does after a hit
+        self.assertEqual(wild_side.weakest(), 0)
+
+        first.full_heal()  # Outside the battle loop: requeued when its entry surfaces
+        self.assertEqual(wild_side.weakest(), 1)
+        second.take_damage(second.max_hp)  # Knocked out outside the battle loop
+        self.assertEqual(wild_side.weakest(), 0)
+        second.heal(5)  # Revived
+        self.assertEqual(wild_side.weakest(), 1)
+
+        first.take_damage(first.max_hp)
+        second.take_damage(second.max_hp)
+        self.assertIsNone(wild_side.weakest())
+        battle.play_round()  # Nothing for the player side to target: it doesn't move
+        self.assertNotIn(attacker, [event[0] for event in battle.events])
+
+    def test_double_battle_bench(self):
+        """Test that benched creatures step in when an active one faints"""
+        party = [SPECIES_BY_NAME["Windbird"].spawn(30) for _ in range(2)]
+        wild = [SPECIES_BY_NAME["Rockbug"].spawn(3) for _ in range(5)]
+        battle = self._battle(party, wild, wild_slots=2)
+        wild_side = battle.sides[HordeBattle.WILD]
+        self.assertEqual(len(wild_side.active), 2)
+        self.assertEqual(list(wild_side.bench), [2, 3, 4])
+
+        self.assertEqual(battle.run(), BattleResult.PLAYER_WIN)
+        self.assertEqual(wild_side.alive, 0)
+        self.assertTrue(all(c.is_fainted() for c in wild))
+        self.assertEqual(battle.player.money, 1000 + 5 * 3 * 10)
+        self.assertIn("Wild Rockbug joined the fight!", battle.battle_log)
+
+    def test_horde_is_reproducible(self):
+        """Test a seeded 1v20 horde battle"""
+        def play():
+            player = Player("Ash")
+            player.party = [SPECIES_BY_NAME["Sparkrat"].spawn(40)]
+            wild = [SPECIES_BY_NAME["Sandmole"].spawn(4) for _ in range(20)]
+            battle = HordeBattle(player, wild, rng=random.Random(7), log_size=2000)
+            battle.run(max_rounds=500)
+            return battle.result, battle.turns, battle.battle_log
+
+        first = play()
+        self.assertNotEqual(first[0], BattleResult.ONGOING)
+        self.assertEqual(first, play())
+
+    def test_side_skips_stale_targets(self):
+        """Test that the target heap ignores outdated HP entries"""
+        a, b = creature("A", speed=1, hp=30), creature("B", speed=1, hp=20)
+        side = HordeSide([a, b])
+        self.assertEqual(side.weakest(), 1)
+        b.current_hp = 25
+        a.take_damage(10)
+        side.push_target(0)
+        side.push_target(1)
+        self.assertEqual(side.weakest(), 0)
+        side.faint(0)
+        self.assertEqual(side.weakest(), 1)
+        self.assertEqual(side.alive, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the indexed PC box
+"""
+
+import random
+import unittest
+
+from creature import SPECIES, SPECIES_BY_NAME, CreatureType, get_random_wild_creature
+from indexed_box import IndexedBox
+from player import Player
+
+
+def scan(box, species=None, creature_type=None, min_level=None, max_level=None, shiny=None):
+    """Linear-scan reference for IndexedBox.query"""
+    return [row for row, c in enumerate(box)
+            if (species is None or c.name == species)
+            and (creature_type is None or c.type == creature_type)
+            and (min_level is None or c.level >= min_level)
+            and (max_level is None or c.level <= max_level)
+            and (shiny is None or c.shiny == shiny)]
+
+
+QUERIES = (
+    {},
+    {'species': "Sparkrat"},
+    {'species': "Missingmon"},
+    {'creature_type': CreatureType.WATER, 'min_level': 21},
+    {'min_level': 15, 'max_level': 24},
+    {'max_level': 9},
+    {'shiny': True},
+    {'shiny': False, 'creature_type': CreatureType.ROCK},
+    {'species': "Rockbug", 'min_level': 30, 'shiny': False},
+)
+
+
+class TestIndexedBox(unittest.TestCase):
+    """Test the box indexes against linear scans"""
+
+    def setUp(self):
+        rng = random.Random(4)
+        self.rng = rng
+        self.box = IndexedBox()
+        for _ in range(600):
+            creature = SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 45))
+            creature.shiny = rng.random() < 0.05
+            self.box.append(creature)
+
+    def check_queries(self):
+        for criteria in QUERIES:
+            expected = scan(self.box, **criteria)
+            self.assertEqual(self.box.query(**criteria), expected, msg=criteria)
+            self.assertEqual(self.box.count(**criteria), len(expected), msg=criteria)
+
+    def test_queries_match_scan(self):
+        """Test every kind of query against a linear scan"""
+        self.check_queries()
+        counts = self.box.species_counts()
+        self.assertEqual(sum(counts.values()), len(self.box))
+        self.assertEqual(counts["Aquatail"], len(scan(self.box, species="Aquatail")))
+        found = self.box.find(creature_type=CreatureType.FIRE, min_level=40)
+        self.assertTrue(all(c.type == CreatureType.FIRE and c.level >= 40 for c in found))
+
+    def test_indexes_follow_changes(self):
+        """Test that pops and level/type changes keep the indexes exact"""
+        rng = self.rng
+        for _ in range(50):
+            self.box.pop(rng.randrange(len(self.box)))
+        self.box.pop()
+        for _ in range(50):
+            view = self.box[rng.randrange(len(self.box))]
+            view.level = rng.randint(1, 60)
+        self.box[0].type_id = self.box[1].type_id
+        self.check_queries()
+
+        popped = self.box.pop(3)
+        self.assertEqual(self.box.append(popped), len(self.box) - 1)
+        self.check_queries()
+
+    def test_player_box(self):
+        """Test that Player.add_creature files overflow creatures into the indexed box"""
+        player = Player("Ash")
+        for _ in range(6):
+            player.add_creature(SPECIES_BY_NAME["Flamepup"].spawn(5))
+        shiny = get_random_wild_creature(rng=random.Random(1))
+        shiny.shiny = True
+        self.assertFalse(player.add_creature(shiny))
+        self.assertIsInstance(player.pc_box, IndexedBox)
+        self.assertEqual(player.pc_box.count(shiny=True), 1)
+        self.assertTrue(player.pc_box.find(species=shiny.name)[0].to_creature().shiny)
+
+
+if __name__ == '__main__':
+    unittest.main()
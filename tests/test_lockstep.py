@@ -0,0 +1,139 @@
+"""
+Tests for the lockstep battle engine
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from creature import SPECIES_BY_NAME
+from player import Player
+from battle import Battle, BattleResult, BattleEvent
+from batch import spawn_wild_batch
+from lockstep import (LockstepBattles, side_columns, batch_side_columns,
+                      ONGOING, PLAYER_WIN, PLAYER_LOSE, PLAYER_SIDE, WILD_SIDE)
+from status import STATUS
+
+
+def scalar_win_rate(player_species, player_level, wild_species, wild_level, n, seed):
+    """Win rate of n Battle runs with random moves on both sides"""
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(n):
+        player = Player("Sim")
+        player.add_creature(SPECIES_BY_NAME[player_species].spawn(player_level))
+        battle = Battle(player, SPECIES_BY_NAME[wild_species].spawn(wild_level),
+                        rng=rng, headless=True, log_size=8)
+        moves = battle.player_creature.moves
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(int(rng.random() * len(moves)))
+        wins += battle.result == BattleResult.PLAYER_WIN
+    return wins / n
+
+
+def lockstep_battles(player_species, player_level, wild_species, wild_level, n, seed, **kwargs):
+    player = side_columns([SPECIES_BY_NAME[player_species].spawn(player_level)] * n)
+    wild = side_columns([SPECIES_BY_NAME[wild_species].spawn(wild_level)] * n)
+    return LockstepBattles(player, wild, rng=np.random.default_rng(seed), **kwargs)
+
+
+class TestLockstep(unittest.TestCase):
+    """Test the lockstep engine against the scalar Battle rules"""
+
+    def test_matches_battle_win_rate(self):
+        """Test that win rates match Battle for the same random policies"""
+        for matchup in (("Flamepup", 5, "Sandmole", 3),
+                        ("Aquatail", 10, "Rockbug", 5),
+                        ("Sparkrat", 5, "Sparkrat", 5)):
+            n = 4000
+            battles = lockstep_battles(*matchup, n, seed=1)
+            battles.run()
+            self.assertEqual(battles.outcome_counts()[BattleResult.ONGOING], 0)
+            lockstep_rate = np.mean(battles.result == PLAYER_WIN)
+            scalar_rate = scalar_win_rate(*matchup, n, seed=2)
+
+            # Difference of two binomial proportions, 4 standard errors
+            tolerance = 4 * np.sqrt(2 * 0.25 / n)
+            self.assertAlmostEqual(lockstep_rate, scalar_rate, delta=tolerance, msg=matchup)
+
+    def test_rewards_and_dropout(self):
+        """Test rewards, turn counts and that finished battles leave the active set"""
+        battles = lockstep_battles("Flamepup", 20, "Rockbug", 2, 500, seed=3, player_moves=[1] * 500)
+        battles.step()
+        finished = battles.result != ONGOING
+        self.assertEqual(len(battles.active), np.count_nonzero(~finished))
+        battles.run()
+        self.assertTrue(np.all(battles.result == PLAYER_WIN))
+        self.assertTrue(np.all(battles.reward == 20))
+        self.assertTrue(np.all(battles.wild['hp'] == 0))
+        self.assertTrue(np.all(battles.turns >= 1))
+
+        # A finished battle is not touched by later steps
+        turns = battles.turns.copy()
+        battles.step()
+        self.assertTrue(np.array_equal(battles.turns, turns))
+
+    def test_loss(self):
+        """Test that a fainted player creature loses without reward"""
+        battles = lockstep_battles("Flamepup", 5, "Windbird", 6, 200, seed=4)
+        battles.run()
+        self.assertTrue(np.all(battles.result == PLAYER_LOSE))
+        self.assertTrue(np.all(battles.reward == 0))
+
+    def test_wild_batch_side(self):
+        """Test battles against a spawned WildBatch"""
+        rng = np.random.default_rng(5)
+        wild = spawn_wild_batch(1000, rng=rng)
+        player = side_columns([SPECIES_BY_NAME["Flamepup"].spawn(8)] * len(wild))
+        battles = LockstepBattles(player, batch_side_columns(wild), rng=rng)
+        battles.run()
+        counts = battles.outcome_counts()
+        self.assertEqual(sum(counts.values()), 1000)
+        self.assertEqual(counts[BattleResult.ONGOING], 0)
+        won = battles.result == PLAYER_WIN
+        self.assertTrue(np.array_equal(battles.reward[won], wild.level[won] * 10))
+
+
+    def test_event_log(self):
+        """Test the per-battle event ring buffers and their rendering"""
+        player, wild = SPECIES_BY_NAME["Flamepup"].spawn(20), SPECIES_BY_NAME["Rockbug"].spawn(2)
+        battles = LockstepBattles(side_columns([player] * 50), side_columns([wild] * 50),
+                                  rng=np.random.default_rng(3), player_moves=[1] * 50, log_size=3)
+        battles.run()
+        for index in range(50):
+            log = battles.battle_log(index, player, wild)
+            self.assertLessEqual(len(log), 3)
+            self.assertEqual(log[-2:], ["Wild Rockbug fainted!", "You won! Earned $20."])
+            self.assertTrue(log[0] == "Wild Rockbug fainted!" or log[0].startswith("Flamepup used Ember!"))
+
+    def test_event_log_matches_hp(self):
+        """Test that logged damage, including status damage, accounts for every HP lost"""
+        n = 300
+        player, wild = SPECIES_BY_NAME["Sparkrat"].spawn(6), SPECIES_BY_NAME["Sparkrat"].spawn(6)
+        player_side, wild_side = side_columns([player] * n), side_columns([wild] * n)
+        rng = np.random.default_rng(8)
+        player_side['status'] = rng.integers(0, len(STATUS), n)
+        wild_side['status'] = rng.integers(0, len(STATUS), n)
+        battles = LockstepBattles(player_side, wild_side, rng=rng, log_size=200)
+        battles.run()
+        self.assertTrue(np.all(battles.event_count < 200))
+
+        skips = 0
+        for index in range(n):
+            lost = {PLAYER_SIDE: 0, WILD_SIDE: 0}
+            for side, _, value, outcome in battles.events[index, :battles.event_count[index]]:
+                if outcome == BattleEvent.HIT:
+                    lost[1 - side] += value
+                elif outcome == BattleEvent.STATUS_DAMAGE:
+                    lost[side] += value
+                skips += outcome == BattleEvent.STATUS_SKIP
+            self.assertEqual(battles.player['hp'][index], max(0, player.max_hp - lost[PLAYER_SIDE]))
+            self.assertEqual(battles.wild['hp'][index], max(0, wild.max_hp - lost[WILD_SIDE]))
+        self.assertGreater(skips, 0)
+        self.assertTrue(any("can't move" in message
+                            for index in range(n) for message in battles.battle_log(index, player, wild)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for battle recording and replay
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from creature import SPECIES_BY_NAME
+from player import Player
+from battle import BattleResult, RandomMovePolicy
+from ai import LookaheadPolicy
+from replay import (RecordingBattle, BattleRecording, replay,
+                    write_recordings, read_recordings)
+
+
+def make_player():
+    player = Player("Ash")
+    player.add_creature(SPECIES_BY_NAME["Flamepup"].spawn(6))
+    player.add_creature(SPECIES_BY_NAME["Aquatail"].spawn(6))
+    player.add_item("Super Trap", 2)
+    return player
+
+
+def play(seed):
+    """Play a battle using every kind of action, with a text log"""
+    player = make_player()
+    battle = RecordingBattle(player, SPECIES_BY_NAME["Rockbug"].spawn(4), seed=seed)
+    battle.player_attack(0)
+    battle.use_heal_item("Potion")
+    battle.use_heal_item("Missing Item")
+    battle.switch_creature(player.party[1])
+    battle.attempt_run()
+    battle.attempt_catch("Super Trap")
+    rng = random.Random(seed)
+    while battle.result == BattleResult.ONGOING:
+        battle.player_attack(rng.randrange(5))  # index 4 is an invalid move
+    battle.attempt_catch("Basic Trap")  # after the end: recorded, does nothing
+    return battle
+
+
+class TestReplay(unittest.TestCase):
+    """Test that recorded battles replay identically"""
+
+    def test_replay_matches(self):
+        """Test that the replay reproduces the log, result and player state"""
+        for seed in range(20):
+            battle = play(seed)
+            data = battle.recording().to_bytes()
+            recording, end = BattleRecording.from_bytes(data)
+            self.assertEqual(end, len(data))
+            self.assertEqual(recording.result, battle.result)
+
+            replayed = replay(recording)
+            self.assertEqual(replayed.battle_log, battle.battle_log)
+            self.assertEqual(replayed.result, battle.result)
+            self.assertEqual(replayed.player.money, battle.player.money)
+            self.assertEqual(replayed.player.inventory, battle.player.inventory)
+            self.assertEqual([c.current_hp for c in replayed.player.party],
+                             [c.current_hp for c in battle.player.party])
+
+    def test_compact_stream(self):
+        """Test that actions take two bytes each"""
+        battle = play(3)
+        recording = battle.recording()
+        self.assertEqual(len(recording.actions), 2 * len(recording))
+        self.assertIn("Missing Item", recording.state['items'])
+
+    def test_seed_from_rng(self):
+        """Test that the battle seed is drawn from the given generator"""
+        player = make_player()
+        a = RecordingBattle(player, SPECIES_BY_NAME["Rockbug"].spawn(4), rng=random.Random(9))
+        b = RecordingBattle(player, SPECIES_BY_NAME["Rockbug"].spawn(4), rng=random.Random(9))
+        self.assertEqual(a.seed, b.seed)
+
+    def test_unrecordable_actions(self):
+        """Test that actions that can't be encoded are refused"""
+        battle = RecordingBattle(make_player(), SPECIES_BY_NAME["Rockbug"].spawn(4), seed=1)
+        with self.assertRaises(ValueError):
+            battle.player_attack(-1)
+        with self.assertRaises(ValueError):
+            battle.switch_creature(SPECIES_BY_NAME["Sparkrat"].spawn(4))
+        self.assertEqual(len(battle.recording()), 0)
+
+        with self.assertRaises(ValueError):
+            RecordingBattle(make_player(), SPECIES_BY_NAME["Rockbug"].spawn(4), seed=1,
+                            wild_policy=LookaheadPolicy())
+        RecordingBattle(make_player(), SPECIES_BY_NAME["Rockbug"].spawn(4), seed=1,
+                        wild_policy=RandomMovePolicy())
+
+    def test_recordings_file(self):
+        """Test writing and reading many recordings in one file"""
+        recordings = [play(seed).recording() for seed in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "battles.tmr")
+            write_recordings(path, recordings)
+            loaded = read_recordings(path)
+        self.assertEqual([r.to_bytes() for r in loaded], [r.to_bytes() for r in recordings])
+
+        with self.assertRaises(ValueError):
+            BattleRecording.from_bytes(recordings[0].to_bytes()[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the binary save format (save_binary.py)
+"""
+
+import json
+import os
+import random
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import save_binary
+from creature import SPECIES
+from game import Game
+from player import Player
+from save_binary import BinarySave, convert, encode_save, read_save, write_save
+from save_journal import SaveJournal
+
+
+def make_state(box_size=0, seed=1):
+    rng = random.Random(seed)
+    player = Player("Ash")
+    for _ in range(3):
+        player.add_creature(SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 30)))
+    player.party[1].take_damage(5)
+    player.party[2].status = "asleep"
+    box = [SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 60)) for _ in range(box_size)]
+    return {
+        'player_name': player.name,
+        'money': 12345,
+        'location': "Forest Path",
+        'playtime': 5025,
+        'party': [c.to_dict() for c in player.party],
+        'inventory': dict(player.inventory),
+        'pc_box': [c.to_dict() for c in box],
+    }
+
+
+def materialized(state):
+    return dict(state, pc_box=list(state['pc_box']))
+
+
+class TestSaveBinary(unittest.TestCase):
+    """Test binary save round trips and streaming"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "savegame.sav")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """Test that every save field survives writing and reading"""
+        state = make_state(box_size=50)
+        state['pc_box'][3]['species_id'] = None
+        write_save(self.path, state)
+        self.assertEqual(materialized(read_save(self.path)), state)
+        self.assertLess(os.path.getsize(self.path), len(json.dumps(state)) / 4)
+
+    def test_streams_box(self):
+        """Test that the PC box is read lazily in chunks"""
+        state = make_state(box_size=25)
+        write_save(self.path, state)
+        with mock.patch.object(save_binary, 'STREAM_CHUNK', 4):
+            loaded = read_save(self.path)
+            self.assertEqual(loaded['party'], state['party'])
+            self.assertFalse(isinstance(loaded['pc_box'], list))
+            self.assertEqual(list(loaded['pc_box']), state['pc_box'])
+
+    def test_bad_files(self):
+        """Test that newer versions, other files and truncated saves are refused"""
+        data = encode_save(make_state(box_size=5))
+        for bad in (data[:4] + struct.pack('<H', save_binary.VERSION + 1) + data[6:],
+                    b'{"player_name": 1}', data[:-3]):
+            with open(self.path, 'wb') as f:
+                f.write(bad)
+            with self.assertRaises(ValueError):
+                materialized(read_save(self.path))
+
+    def test_convert(self):
+        """Test converting a journaled JSON save to binary and back"""
+        json_path = os.path.join(self.directory.name, "savegame.json")
+        state = make_state(box_size=10)
+        journal = SaveJournal(json_path)
+        journal.save(state)
+        journal.save(dict(state, money=7))
+
+        convert(json_path, self.path)
+        self.assertEqual(materialized(BinarySave(self.path).load()), dict(state, money=7))
+        back_path = os.path.join(self.directory.name, "back.json")
+        convert(self.path, back_path)
+        self.assertEqual(SaveJournal(back_path).load(), dict(state, money=7))
+
+    def test_game_binary_save(self):
+        """Test Game saving and loading its party and PC box in the binary format"""
+        game = Game(save_path=self.path)
+        game.player = Player("Ash")
+        for species in SPECIES + SPECIES[:1]:
+            game.player.add_creature(species.spawn(5))
+        self.assertEqual(len(game.player.pc_box), 2)
+        game.save_game()
+
+        loaded = Game(save_path=self.path)
+        loaded._restore_state(loaded.saves.load())
+        self.assertEqual(loaded._save_state(), game._save_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests for journaled saves (save_journal.py and Game save/load)
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from creature import SPECIES_BY_NAME
+from game import Game
+from player import Player
+from save_journal import SaveJournal, diff_state
+
+
+def new_game(path):
+    game = Game(save_path=path)
+    game.session_start = 0.0
+    game.clock = lambda: 0.0  # No playtime passes between saves
+    game.player = Player("Ash")
+    game.player.add_creature(SPECIES_BY_NAME["Sparkrat"].spawn(5))
+    return game
+
+
+def journal_lines(journal):
+    with open(journal.journal_path) as f:
+        return f.read().splitlines()
+
+
+class TestSaveJournal(unittest.TestCase):
+    """Test snapshot + journal saves"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "savegame.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_saves_only_changes(self):
+        """Test that later saves append just the changed fields and load replays them"""
+        game = new_game(self.path)
+        game.save_game()
+        self.assertEqual(journal_lines(game.saves), [])
+
+        game.player.money -= 100
+        game.save_game()
+        self.assertEqual(json.loads(journal_lines(game.saves)[0])['ops'], [['money', 900]])
+
+        game.player.party[0].take_damage(3)
+        game.player.add_creature(SPECIES_BY_NAME["Rockbug"].spawn(4))
+        game.player.use_item("Potion")
+        game.current_location = "Route 1"
+        game.save_game()
+        game.save_game()  # Nothing changed: nothing written
+        self.assertEqual(len(journal_lines(game.saves)), 2)
+        ops = json.loads(journal_lines(game.saves)[1])['ops']
+        self.assertEqual(sorted(op[0] for op in ops), ['creature', 'creature', 'item', 'location'])
+
+        expected = game._save_state()
+        loaded = Game(save_path=self.path)
+        loaded._restore_state(loaded.saves.load())
+        self.assertEqual(loaded._save_state(), expected)
+        self.assertEqual(loaded.player.party[0].current_hp, game.player.party[0].current_hp)
+
+    def test_serializes_only_changed_box_rows(self):
+        """Test that saves re-serialize and diff only boxed creatures changed since the last save"""
+        game = new_game(self.path)
+        for level in range(1, 41):
+            game.player.pc_box.append(SPECIES_BY_NAME["Rockbug"].spawn(level))
+        game.save_game()
+
+        serialized = []
+        serialize = game._serialize_creature
+        game._serialize_creature = lambda c: serialized.append(c.level) or serialize(c)
+        game.player.pc_box[5].take_damage(2)
+        game.player.pc_box[12].level = 50
+        game.player.pc_box.pop(30)
+        game.player.pc_box.append(SPECIES_BY_NAME["Sparkrat"].spawn(3))
+        game.save_game()
+        # The party creature, rows 5 and 12, and rows 30 on (moved by the pop or appended)
+        self.assertEqual(serialized, [5, 6, 50] + list(range(32, 41)) + [3])
+        ops = json.loads(journal_lines(game.saves)[0])['ops']
+        self.assertEqual([op[1] for op in ops if op[0] == 'box'], [5, 12] + list(range(30, 40)))
+
+        serialized.clear()
+        game.save_game()
+        self.assertEqual(serialized, [5])  # Only the party
+        expected = game._save_state()
+        loaded = Game(save_path=self.path)
+        loaded._restore_state(loaded.saves.load())
+        self.assertEqual(loaded._save_state(), expected)
+
+    def test_removals(self):
+        """Test used-up items, released creatures and the PC box"""
+        old = {'player_name': "Ash", 'money': 5, 'location': "Route 1",
+               'party': [{'name': "A"}, {'name': "B"}], 'inventory': {"Potion": 1, "Basic Trap": 2}}
+        new = dict(old, party=[{'name': "B"}], inventory={"Basic Trap": 2}, pc_box=[{'name': "A"}])
+        self.assertEqual(diff_state(old, new),
+                         [['item', "Potion", None], ['creature', 0, {'name': "B"}], ['party_size', 1],
+                          ['box', 0, {'name': "A"}]])
+        self.assertEqual(diff_state(new, dict(new, pc_box=[]))[-1], ['box_size', 0])
+
+        journal = SaveJournal(self.path)
+        journal.save(old)
+        journal.save(new)
+        self.assertEqual(SaveJournal(self.path).load(), new)
+
+    def test_torn_journal_line(self):
+        """Test that a half-written last journal line is dropped"""
+        journal = SaveJournal(self.path)
+        state = new_game(self.path)._save_state()
+        journal.save(state)
+        journal.save(dict(state, money=1))
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"seq": 2, "ops": [["mon')
+
+        reopened = SaveJournal(self.path)
+        self.assertEqual(reopened.load(), dict(state, money=1))
+        reopened.save(dict(state, money=2))
+        self.assertEqual(SaveJournal(self.path).load()['money'], 2)
+
+    def test_compaction(self):
+        """Test that the journal is folded into the snapshot every compact_after saves"""
+        journal = SaveJournal(self.path, compact_after=3)
+        state = new_game(self.path)._save_state()
+        journal.save(state)
+        for money in range(1, 8):
+            journal.save(dict(state, money=money))
+        self.assertEqual(len(journal_lines(journal)), 1)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)['money'], 6)
+        self.assertEqual(SaveJournal(self.path).load()['money'], 7)
+
+        # A crash between writing the snapshot and emptying the journal
+        with open(journal.journal_path, 'w') as f:
+            f.write(json.dumps({'seq': 6, 'ops': [['money', -1]]}) + "\n")
+        self.assertEqual(SaveJournal(self.path).load()['money'], 6)
+
+    def test_legacy_save(self):
+        """Test loading a plain JSON save written before the journal"""
+        state = new_game(self.path)._save_state()
+        with open(self.path, 'w') as f:
+            json.dump(state, f, indent=2)
+        journal = SaveJournal(self.path)
+        self.assertEqual(journal.load(), state)
+        journal.save(dict(state, money=3))
+        self.assertEqual(SaveJournal(self.path).load()['money'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
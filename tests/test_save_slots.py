@@ -0,0 +1,156 @@
+"""
+Tests for save slots (save_slots.py) and Game playtime
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from creature import SPECIES_BY_NAME
+from game import Game
+from player import Player
+from save_slots import HEADER, SaveSlots, describe_slot
+
+
+def make_game(directory, name="Ash", money=1000):
+    game = Game(save_path=os.path.join(directory, "savegame.json"), slot_dir=directory)
+    game.player = Player(name)
+    game.player.money = money
+    for species in ("Sparkrat", "Rockbug"):
+        game.player.add_creature(SPECIES_BY_NAME[species].spawn(5))
+    return game
+
+
+class TestSaveSlots(unittest.TestCase):
+    """Test slot headers, the slot index and checksums"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.slots = SaveSlots(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        """Test that a slot round-trips the save and its header summarizes it"""
+        game = make_game(self.directory.name)
+        game.current_location = "Forest Path"
+        state = game._save_state()
+        self.slots.save(3, state)
+
+        loaded = self.slots.load(3)
+        self.assertEqual(dict(loaded, pc_box=list(loaded['pc_box'])), state)
+        header = self.slots.header(3)
+        self.assertEqual((header['player_name'], header['location'], header['money']),
+                         ("Ash", "Forest Path", 1000))
+        self.assertEqual(header['party'], [["Sparkrat", 5], ["Rockbug", 5]])
+        self.assertIn("Ash - Forest Path - $1000", describe_slot(3, header))
+
+    def test_list_reads_only_index(self):
+        """Test that listing many slots doesn't open the slot files"""
+        for slot in range(1, 31):
+            self.slots.save(slot, make_game(self.directory.name, name=f"Player {slot}")._save_state())
+        with mock.patch.object(SaveSlots, 'header', side_effect=AssertionError("read a slot")):
+            listed = self.slots.list_slots()
+        self.assertEqual([slot for slot, _ in listed], list(range(1, 31)))
+        self.assertEqual(listed[29][1]['player_name'], "Player 30")
+
+        # The index is rebuilt from the headers if it goes missing
+        os.remove(self.slots.index_path)
+        self.assertEqual(self.slots.list_slots(), listed)
+        self.slots.delete(7)
+        self.assertNotIn(7, dict(self.slots.list_slots()))
+
+    def test_corrupt_slot(self):
+        """Test that a damaged body fails its checksum and a damaged header is listed as unreadable"""
+        self.slots.save(1, make_game(self.directory.name)._save_state())
+        self.slots.save(2, make_game(self.directory.name)._save_state())
+        self.assertTrue(self.slots.verify(1))
+        with open(self.slots.path(1), 'r+b') as f:
+            f.seek(HEADER.size + 40)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        self.assertFalse(self.slots.verify(1))
+        with self.assertRaises(ValueError):
+            self.slots.load(1)
+        self.assertTrue(dict(self.slots.list_slots())[1]['corrupt'])  # Listing checks the body CRC too
+
+        with open(self.slots.path(2), 'r+b') as f:
+            f.write(b'JUNK')
+            f.truncate(HEADER.size)
+        self.assertTrue(dict(self.slots.list_slots())[2]['corrupt'])
+        self.assertIn("unreadable", describe_slot(2, {'corrupt': True}))
+
+    def test_journaled_saves(self):
+        """Test that later saves to a slot append journal entries and compact on a threshold"""
+        game = make_game(self.directory.name)
+        for _ in range(20):
+            game.player.pc_box.append(SPECIES_BY_NAME["Rockbug"].spawn(3))
+        game.saves = game.slots.slot(4)
+        game.save_game()
+        base = os.path.getsize(game.slots.path(4))
+
+        game.player.money = 1234
+        game.player.pc_box.pop(3)
+        game.current_location = "Route 1"
+        game.save_game()
+        self.assertEqual(os.path.getsize(game.slots.path(4)), base)  # Snapshot untouched
+        self.assertGreater(os.path.getsize(game.slots.journal_path(4)), 0)
+        self.assertIs(game.slots.slot(4), game.saves)
+        expected = game._save_state()
+
+        listed = dict(SaveSlots(self.directory.name).list_slots())[4]
+        self.assertEqual((listed['money'], listed['location']), (1234, "Route 1"))
+        loaded = SaveSlots(self.directory.name).load(4)
+        self.assertEqual(loaded, expected)
+
+        # A torn last line is dropped; the earlier entries still load
+        with open(game.slots.journal_path(4), 'ab') as f:
+            f.write(b'0badc0de {"base"')
+        self.assertEqual(SaveSlots(self.directory.name).slot(4).load(), expected)
+
+        game.saves.compact_after = 3
+        for money in (1, 2):  # Journal entries 2 and 3
+            game.player.money = money
+            game.save_game()
+        self.assertEqual(os.path.getsize(game.slots.journal_path(4)), 0)
+        self.assertEqual(SaveSlots(self.directory.name).load(4)['money'], 2)
+
+    def test_corrupt_journal(self):
+        """Test that a damaged journal entry before the last fails the load and the listing"""
+        game = make_game(self.directory.name)
+        game.saves = game.slots.slot(1)
+        for money in (10, 20, 30):
+            game.player.money = money
+            game.save_game()
+        with open(game.slots.journal_path(1), 'r+b') as f:
+            f.seek(20)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0x01]))
+        slots = SaveSlots(self.directory.name)
+        with self.assertRaises(ValueError):
+            slots.load(1)
+        self.assertTrue(dict(slots.list_slots())[1]['corrupt'])
+
+    def test_game_slots_and_playtime(self):
+        """Test saving a game to a slot and loading it back with its playtime"""
+        game = make_game(self.directory.name)
+        game.session_start = 1000.0
+        game.clock = lambda: 4725.0  # Exactly 3725 seconds into the session
+        game.saves = game.slots.slot(5)
+        game.save_game()
+        self.assertEqual(game.slots.header(5)['playtime'], 3725)
+        self.assertIn("1:02 played", describe_slot(5, game.slots.header(5)))
+
+        loaded = Game(slot_dir=self.directory.name)
+        loaded.saves = loaded.slots.slot(5)
+        loaded._restore_state(loaded.saves.load())
+        self.assertEqual(loaded.playtime(), 3725)
+        self.assertEqual(loaded.player.party[1].name, "Rockbug")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for battle snapshots (Battle.snapshot / Battle.restore)
+"""
+
+import copy
+import random
+import unittest
+
+from creature import SPECIES_BY_NAME
+from player import Player
+from battle import Battle, BattleResult
+from replay import RecordingBattle, replay
+
+
+class LuckyRandom(random.Random):
+    """Random whose random() always returns 0 (every trap catches)"""
+
+    def random(self):
+        return 0.0
+
+
+def make_player(party_size=2):
+    player = Player("Ash")
+    for _ in range(party_size):
+        player.add_creature(SPECIES_BY_NAME["Sparkrat"].spawn(5))
+    return player
+
+
+def state(battle):
+    """Everything a battle can change, for comparisons"""
+    player = battle.player
+    return (battle.result, battle.player_creature, battle.battle_log,
+            [(c.current_hp, c.status) for c in player.party], len(player.pc_box),
+            battle.wild_creature.current_hp, dict(player.inventory), player.money)
+
+
+def finish(battle, seed):
+    rng = random.Random(seed)
+    battle.use_heal_item("Potion")
+    while battle.result == BattleResult.ONGOING:
+        battle.player_attack(rng.randrange(2))
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test rewinding battles to a snapshot"""
+
+    def test_restore_rewinds(self):
+        """Test that a restored battle replays exactly as the first time"""
+        for headless in (False, True):
+            player = make_player()
+            battle = Battle(player, SPECIES_BY_NAME["Sparkrat"].spawn(5), rng=random.Random(3),
+                            headless=headless, log_size=Battle.FULL_LOG)
+            battle.inflict_status(battle.wild_creature, "confused")
+            battle.player_attack(0)
+            before = state(battle)
+            snapshot = battle.snapshot()
+
+            finish(battle, seed=1)
+            after = state(battle)
+            self.assertNotEqual(after, before)
+
+            battle.restore(snapshot)
+            self.assertEqual(state(battle), before)
+            finish(battle, seed=1)
+            self.assertEqual(state(battle), after)
+
+    def test_restore_wrapped_log(self):
+        """Test that events of rewound turns leave a wrapped ring buffer"""
+        player = make_player()
+        wild = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+        wild.max_hp = wild.current_hp = 1000
+        battle = Battle(player, wild, rng=random.Random(3), headless=True, log_size=4)
+        for _ in range(3):
+            battle.add_log("before")
+        snapshot = battle.snapshot()
+        for _ in range(5):
+            battle.player_attack(0)
+        self.assertNotIn("before", battle.battle_log)
+
+        battle.restore(snapshot)
+        self.assertEqual(battle.wild_creature.current_hp, 1000)
+        self.assertEqual(battle.battle_log, [])  # The 3 earlier events were evicted
+        battle.add_log("after")
+        self.assertEqual(battle.battle_log, ["after"])
+
+        battle = Battle(player, wild, headless=True, log_size=4)
+        for message in "abcde":
+            battle.add_log(message)
+        snapshot = battle.snapshot()
+        battle.add_log("f")
+        battle.add_log("g")
+        battle.restore(snapshot)
+        self.assertEqual(battle.battle_log, ["d", "e"])  # "b" and "c" were evicted
+
+    def test_restore_undoes_catch(self):
+        """Test that a catch into the PC box and the trap used are undone"""
+        player = make_player(party_size=6)
+        for _ in range(1000):
+            player.pc_box.append(SPECIES_BY_NAME["Rockbug"].spawn(3))
+        wild = SPECIES_BY_NAME["Windbird"].spawn(4)
+        battle = Battle(player, wild, rng=LuckyRandom(1), headless=True)
+        snapshot = battle.snapshot()
+        before = state(battle)
+
+        self.assertTrue(battle.attempt_catch("Basic Trap"))
+        self.assertEqual(len(player.pc_box), 1001)
+        self.assertEqual(player.get_item_count("Basic Trap"), 9)
+
+        battle.restore(snapshot)
+        self.assertEqual(state(battle), before)
+        self.assertEqual(battle.result, BattleResult.ONGOING)
+        self.assertEqual(player.pc_box[len(player.pc_box) - 1].name, "Rockbug")
+
+    def test_restore_item_used_up(self):
+        """Test restoring an item whose last unit was used"""
+        player = make_player()
+        player.inventory = {"Potion": 1}
+        battle = Battle(player, SPECIES_BY_NAME["Sandmole"].spawn(3), rng=random.Random(2))
+        snapshot = battle.snapshot()
+        battle.use_heal_item("Potion")
+        self.assertEqual(player.inventory, {})
+        battle.restore(snapshot)
+        self.assertEqual(player.inventory, {"Potion": 1})
+
+    def test_deepcopy_shares_moves(self):
+        """Test that deep-copying a battle shares the immutable moves"""
+        battle = Battle(make_player(), SPECIES_BY_NAME["Sandmole"].spawn(3), rng=random.Random(2))
+        clone = copy.deepcopy(battle)
+        self.assertIsNot(clone.player_creature, battle.player_creature)
+        self.assertIs(clone.player_creature.moves[0], battle.player_creature.moves[0])
+
+    def test_recording_rewind(self):
+        """Test that a rewound recording replays to the rewound battle"""
+        player = make_player()
+        battle = RecordingBattle(player, SPECIES_BY_NAME["Sparkrat"].spawn(5), seed=11)
+        battle.player_attack(1)
+        snapshot = battle.snapshot()
+        finish(battle, seed=2)
+        battle.restore(snapshot)
+        finish(battle, seed=3)
+
+        replayed = replay(battle.recording())
+        self.assertEqual(replayed.battle_log, battle.battle_log)
+        self.assertEqual(replayed.result, battle.result)
+
+
+if __name__ == '__main__':
+    unittest.main()
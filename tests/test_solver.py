@@ -0,0 +1,118 @@
+"""
+Tests for the exact battle outcome solver
+"""
+
+import random
+import unittest
+
+from creature import SPECIES_BY_NAME, Creature, CreatureType, Move
+from player import Player
+from battle import Battle, BattleResult
+from solver import (hit_distribution, damage_distribution, BattleSolver, FixedMovePolicy,
+                    GREEDY, BEST, CatchBelowPolicy, get_solver, battle_hint)
+
+
+def simulate(player_species, player_level, wild_species, wild_level, choose, n, seed):
+    """Win rate of n Battles where choose(battle) picks the player's move index"""
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(n):
+        player = Player("Sim")
+        player.add_creature(SPECIES_BY_NAME[player_species].spawn(player_level))
+        battle = Battle(player, SPECIES_BY_NAME[wild_species].spawn(wild_level),
+                        rng=rng, headless=True, log_size=8)
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(choose(battle))
+        wins += battle.result == BattleResult.PLAYER_WIN
+    return wins / n
+
+
+class TestSolver(unittest.TestCase):
+    """Test exact damage distributions and win probabilities"""
+
+    def test_hit_distribution(self):
+        """Test the damage distribution against a fine grid of rolls"""
+        for base, accuracy in ((7.3, 90), (12.0, 100), (1.1, 100), (0.0, 100), (30.5, 0)):
+            dist = dict(hit_distribution(base, accuracy))
+            self.assertAlmostEqual(sum(dist.values()), 1.0)
+
+            steps = 100_000
+            counts = {}
+            for i in range(steps):
+                damage = int(base * (0.85 + 0.15 * (i + 0.5) / steps))
+                counts[damage] = counts.get(damage, 0) + 1
+            for damage, count in counts.items():
+                expected = accuracy / 100 * count / steps + (1 - accuracy / 100) * (damage == 0)
+                self.assertAlmostEqual(dist.get(damage, 0.0), expected, places=4)
+
+    def test_matches_simulation(self):
+        """Test win probabilities against simulated Battles, for both turn orders"""
+        n = 6000
+        tolerance = 4 * (0.25 / n) ** 0.5
+        for matchup in (("Flamepup", 8, "Flamepup", 8),      # player moves first
+                        ("Leafsprout", 5, "Sparkrat", 3)):  # wild moves first
+            player = SPECIES_BY_NAME[matchup[0]].spawn(matchup[1])
+            wild = SPECIES_BY_NAME[matchup[2]].spawn(matchup[3])
+            exact = BattleSolver(player, wild, FixedMovePolicy(1)).win_probability(
+                player.max_hp, wild.max_hp)
+            self.assertGreater(exact, 0.3)
+            self.assertLess(exact, 0.7)
+            sampled = simulate(*matchup, lambda battle: 1, n, seed=1)
+            self.assertAlmostEqual(exact, sampled, delta=tolerance, msg=matchup)
+
+    def test_best_policy(self):
+        """Test that the best policy beats fixed moves and follows its own actions"""
+        player = SPECIES_BY_NAME["Leafsprout"].spawn(5)
+        wild = SPECIES_BY_NAME["Leafsprout"].spawn(5)
+        best = BattleSolver(player, wild, BEST)
+        exact = best.win_probability(player.max_hp, wild.max_hp)
+        for i in range(len(player.moves)):
+            fixed = BattleSolver(player, wild, FixedMovePolicy(i))
+            self.assertGreaterEqual(exact + 1e-12, fixed.win_probability(player.max_hp, wild.max_hp))
+        self.assertLessEqual(exact, 1.0)
+
+        def choose(battle):
+            return best.action(battle.player_creature.current_hp, battle.wild_creature.current_hp)
+        sampled = simulate("Leafsprout", 5, "Leafsprout", 5, choose, 4000, seed=2)
+        self.assertAlmostEqual(exact, sampled, delta=4 * (0.25 / 4000) ** 0.5)
+
+    def test_catch_policy(self):
+        """Test that limited traps are counted and outcomes stay probabilities"""
+        player = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+        wild = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+        solver = BattleSolver(player, wild, CatchBelowPolicy("Ultra Trap", 0.6))
+        no_traps = solver.outcome(player.max_hp, wild.max_hp, traps=0)
+        self.assertEqual(no_traps[1], 0.0)
+        self.assertAlmostEqual(
+            no_traps[0], BattleSolver(player, wild, GREEDY).win_probability(player.max_hp, wild.max_hp))
+
+        # Each failed throw gives the wild creature a free move
+        win, catch = solver.outcome(player.max_hp, wild.max_hp, traps=2)
+        self.assertLess(win, no_traps[0])
+        self.assertGreater(catch, 0.0)
+        self.assertEqual(solver.action(player.max_hp, 10, traps=2), BattleSolver.THROW)
+        self.assertEqual(solver.action(player.max_hp, 10, traps=0), 0)
+
+    def test_no_damage_is_never_won(self):
+        """Test that a battle nobody can win has zero win probability"""
+        ghost = Creature("Shade", CreatureType.GHOST, level=5, moves=[Move("Tackle", CreatureType.NORMAL, 40)])
+        other = Creature("Shade", CreatureType.GHOST, level=5, moves=[Move("Tackle", CreatureType.NORMAL, 40)])
+        self.assertEqual(BattleSolver(ghost, other).outcome(ghost.max_hp, other.max_hp), (0.0, 0.0))
+
+    def test_hint(self):
+        """Test the cached solver and the battle hint"""
+        player = Player("Ash")
+        player.add_creature(SPECIES_BY_NAME["Flamepup"].spawn(8))
+        battle = Battle(player, SPECIES_BY_NAME["Flamepup"].spawn(8), rng=random.Random(1))
+        win, move = battle_hint(battle)
+        self.assertAlmostEqual(win, 1.0)
+        self.assertEqual(move.name, "Scratch")
+        self.assertIs(get_solver(battle.player_creature, battle.wild_creature, BEST),
+                      get_solver(SPECIES_BY_NAME["Flamepup"].spawn(8),
+                                 SPECIES_BY_NAME["Flamepup"].spawn(8), BEST))
+        d = damage_distribution(battle.player_creature, move, battle.wild_creature)
+        self.assertAlmostEqual(sum(p for _, p in d), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
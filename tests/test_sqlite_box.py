@@ -0,0 +1,192 @@
+"""
+Tests for the SQLite-backed PC box
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from creature import SPECIES, SPECIES_BY_NAME, CreatureType
+from game import Game
+from indexed_box import IndexedBox
+from player import Player
+from sqlite_box import SQLiteBox
+
+
+def random_creatures(n, seed=2):
+    rng = random.Random(seed)
+    creatures = []
+    for _ in range(n):
+        creature = SPECIES[rng.randrange(len(SPECIES))].spawn(rng.randint(1, 45))
+        creature.shiny = rng.random() < 0.05
+        creature.take_damage(rng.randint(0, 10))
+        creatures.append(creature)
+    return creatures
+
+
+class TestSQLiteBox(unittest.TestCase):
+    """Test the SQLite box against the in-memory box"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "box.sqlite")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def open_box(self):
+        return SQLiteBox(self.path, page_size=16, cache_pages=2, batch_size=50)
+
+    def test_round_trip_and_reopen(self):
+        """Test that creatures come back exactly, also after reopening"""
+        creatures = random_creatures(300)
+        with self.open_box() as box:
+            for creature in creatures:
+                box.append(creature)
+            self.assertEqual(len(box), 300)
+            self.assertEqual(box[-1].to_dict(), creatures[-1].to_dict())
+
+        with self.open_box() as box:
+            self.assertEqual(len(box), 300)
+            self.assertEqual([c.to_dict() for c in box], [c.to_dict() for c in creatures])
+            self.assertLessEqual(len(box._pages), 2)
+            self.assertIs(box[5].moves[0], creatures[5].moves[0])
+
+    def test_changes_are_written_back(self):
+        """Test that creatures changed in place are saved on eviction and flush"""
+        with self.open_box() as box:
+            for creature in random_creatures(100):
+                box.append(creature)
+            box[3].full_heal()
+            box[40].level = 99
+            for index in range(50, 100):  # Evicts the pages of 3 and 40
+                box[index]
+            box[99].status = "asleep"
+
+        with self.open_box() as box:
+            self.assertEqual(box[3].current_hp, box[3].max_hp)
+            self.assertEqual(box[40].level, 99)
+            self.assertEqual(box[99].status, "asleep")
+
+    def test_append_after_read(self):
+        """Test that creatures appended after their page was read can be read"""
+        creatures = random_creatures(12)
+        with self.open_box() as box:
+            for creature in creatures[:10]:
+                box.append(creature)
+            box[0].level = 77
+            box.append(creatures[10])
+            self.assertEqual(box[10].to_dict(), creatures[10].to_dict())
+            box.append(creatures[11])
+            self.assertEqual(len(list(box)), 12)
+            self.assertEqual(len(box.find(species=creatures[11].name)),
+                             sum(c.name == creatures[11].name for c in creatures))
+            self.assertEqual(box[0].level, 77)
+
+        with self.open_box() as box:
+            self.assertEqual(box[0].level, 77)
+            self.assertEqual(box[11].to_dict(), creatures[11].to_dict())
+
+    def test_pop_and_queries_match_indexed_box(self):
+        """Test withdrawing and queries against IndexedBox"""
+        creatures = random_creatures(200)
+        reference = IndexedBox(creatures)
+        box = self.open_box()
+        for creature in creatures:
+            box.append(creature)
+        for index in (17, 0, -1, 150, 60):
+            # CreatureStore rows don't keep species_id
+            withdrawn, expected = box.pop(index).to_dict(), reference.pop(index).to_dict()
+            self.assertEqual(dict(withdrawn, species_id=None), expected)
+        self.assertEqual([c.name for c in box], [c.name for c in reference])
+
+        for criteria in ({'species': "Sparkrat"},
+                         {'creature_type': CreatureType.WATER, 'min_level': 21},
+                         {'min_level': 15, 'max_level': 24},
+                         {'shiny': True},
+                         {'shiny': False, 'species': "Rockbug"}):
+            self.assertEqual(box.query(**criteria), reference.query(**criteria), msg=criteria)
+            self.assertEqual(box.count(**criteria), reference.count(**criteria), msg=criteria)
+        self.assertEqual(box.species_counts(), reference.species_counts())
+        self.assertTrue(all(c.name == "Sandmole" for c in box.find(species="Sandmole")))
+        box.close()
+
+        # Gaps survive reopening
+        with self.open_box() as box:
+            self.assertEqual([c.name for c in box], [c.name for c in reference])
+            self.assertEqual(box.query(shiny=True), reference.query(shiny=True))
+
+    def test_withdrawals_leave_gaps(self):
+        """Test that pops don't renumber later rows until the gap limit compacts them"""
+        creatures = random_creatures(120)
+        reference = IndexedBox(creatures)
+        box = self.open_box()
+        box.GAP_LIMIT = 8
+        for creature in creatures:
+            box.append(creature)
+        rng = random.Random(4)
+        for _ in range(30):
+            index = rng.randrange(len(reference) - 1)
+            self.assertEqual(box.pop(index).name, reference.pop(index).name)
+            self.assertLessEqual(len(box._gaps), 8)
+            box[index].heal(1)  # Written back by position
+            reference[index].heal(1)
+        box.pop()
+        reference.pop()
+        self.assertEqual([c.to_dict()['current_hp'] for c in box],
+                         [c.current_hp for c in reference])
+        self.assertEqual(box.query(min_level=20), reference.query(min_level=20))
+        box.close()
+
+    def test_player_box(self):
+        """Test a player boxing overflow creatures into SQLite"""
+        with self.open_box() as box:
+            player = Player("Ash", pc_box=box)
+            for _ in range(8):
+                player.add_creature(SPECIES_BY_NAME["Windbird"].spawn(4))
+            self.assertEqual(len(player.pc_box), 2)
+        with self.open_box() as box:
+            self.assertEqual(box.count(species="Windbird"), 2)
+
+    def test_game_saves_box_path(self):
+        """Test that saves refer to a SQLite box by path instead of copying it"""
+        for save_name in ("savegame.json", "savegame.sav"):
+            game = Game(save_path=os.path.join(self.tempdir.name, save_name))
+            game.player = Player("Ash", pc_box=self.open_box())
+            for creature in random_creatures(10):
+                game.player.add_creature(creature)
+            state = game._save_state()
+            self.assertEqual(state['pc_box_path'], self.path)
+            self.assertNotIn('pc_box', state)
+            game.save_game()
+            expected = [c.to_dict() for c in game.player.pc_box]
+            game.player.pc_box.close()
+
+            loaded = Game(save_path=game.saves.path)
+            loaded._restore_state(loaded.saves.load())
+            self.assertIsInstance(loaded.player.pc_box, SQLiteBox)
+            self.assertEqual([c.to_dict() for c in loaded.player.pc_box], expected)
+            self.assertEqual(loaded._save_state(), state)
+            loaded.player.pc_box.close()
+
+    def test_game_box_path(self):
+        """Test a Game creating the SQLite box and reopening it when a save is loaded over it"""
+        game = Game(save_path=os.path.join(self.tempdir.name, "savegame.json"), box_path=self.path)
+        game.player = game._new_player("Ash", game.box_path)
+        for creature in random_creatures(10):
+            game.player.add_creature(creature)
+        game.save_game()
+        old_box = game.player.pc_box
+        game.player.pc_box.pop(0)
+
+        game._restore_state(game.saves.load())
+        self.assertIsNot(game.player.pc_box, old_box)
+        self.assertEqual(len(game.player.pc_box), 3)  # Boxes persist themselves: the pop stays
+        game.close()
+        with self.open_box() as box:
+            self.assertEqual(len(box), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
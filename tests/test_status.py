@@ -0,0 +1,178 @@
+"""
+Tests for the table-driven status effects
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from creature import SPECIES_BY_NAME, Creature, CreatureType, MOVES
+from player import Player, TRAP_TYPES
+from battle import Battle, BattleEvent, BattleResult, catch_chance, catch_probability
+from lockstep import LockstepBattles, side_columns, PLAYER_WIN
+from status import STATUS, NO_STATUS, StatusTables
+
+
+def creature(name, speed, hp=100, status=None):
+    c = Creature(name, CreatureType.NORMAL, level=10, max_hp=hp, speed=speed, moves=[MOVES["Tackle"]])
+    c.status = status
+    return c
+
+
+def headless_battle(player_creature, wild_creature, seed=1):
+    player = Player("Ash")
+    player.party = [player_creature]
+    return Battle(player, wild_creature, rng=random.Random(seed), headless=True,
+                  log_size=Battle.FULL_LOG)
+
+
+def outcomes(battle):
+    return [event[3] for event in battle.events]
+
+
+class TestStatusTables(unittest.TestCase):
+    """Test compiling the status tables from config"""
+
+    def test_tables(self):
+        """Test ids and per-status values loaded from YAML"""
+        self.assertEqual(STATUS.status_id(None), NO_STATUS)
+        asleep = STATUS.status_id("asleep")
+        self.assertEqual(STATUS.skip_chance[asleep], 1.0)
+        self.assertEqual((STATUS.min_turns[asleep], STATUS.max_turns[asleep]), (1, 3))
+        self.assertEqual(STATUS.residual_damage[STATUS.status_id("poisoned")], 0.125)
+        self.assertEqual(STATUS.damage_multiplier[STATUS.status_id("burned")], 0.5)
+        self.assertEqual(STATUS.catch_multiplier[NO_STATUS], 1.0)
+        self.assertGreater(STATUS.catch_multiplier[asleep], 1.0)
+        with self.assertRaises(ValueError):
+            STATUS.status_id("sleepy")
+
+    def test_defaults(self):
+        """Test that missing fields fall back to no effect"""
+        tables = StatusTables({'dazed': {'skip_chance': 0.1}}, {'none': 1.0, 'stunned': 3.0})
+        self.assertEqual(tables.names, (None, 'dazed', 'stunned'))
+        stunned = tables.status_id('stunned')
+        self.assertEqual(tables.skip_chance[stunned], 0.0)
+        self.assertEqual(tables.damage_multiplier[stunned], 1.0)
+        self.assertEqual(tables.max_turns[stunned], 0)
+        self.assertEqual(tables.catch_multiplier[stunned], 3.0)
+        self.assertEqual(tables.roll_duration(stunned, random.Random(1)), 0)
+
+
+class TestStatusBattle(unittest.TestCase):
+    """Test status effects in Battle"""
+
+    def test_sleep_skips_then_wears_off(self):
+        """Test that a sleeping creature loses its moves until the status expires"""
+        hero, wild = creature("Hero", speed=50), creature("Wild", speed=1)
+        battle = headless_battle(hero, wild)
+        battle.inflict_status(wild, "asleep")
+        turns = battle._status_turns[wild]
+        self.assertIn(turns, (1, 2, 3))
+
+        for _ in range(turns):
+            battle.player_attack(0)
+            self.assertEqual(outcomes(battle)[-1], BattleEvent.STATUS_SKIP)
+        self.assertEqual(hero.current_hp, hero.max_hp)
+
+        battle.player_attack(0)
+        self.assertIsNone(wild.status)
+        self.assertIn(BattleEvent.STATUS_RECOVERED, outcomes(battle))
+        self.assertIn("Wild Wild is no longer asleep!", battle.battle_log)
+
+    def test_poison_and_burn(self):
+        """Test residual damage, its faint, and the burn damage multiplier"""
+        hero, wild = creature("Hero", speed=50, hp=8, status="poisoned"), creature("Wild", speed=1, hp=1000)
+        wild.moves = []
+        battle = headless_battle(hero, wild)
+        while battle.result == BattleResult.ONGOING:
+            battle.player_attack(0)
+        self.assertEqual(battle.result, BattleResult.PLAYER_LOSE)
+        self.assertEqual(outcomes(battle).count(BattleEvent.STATUS_DAMAGE), 8)
+
+        def first_hit(status):
+            attacker = creature("Hero", speed=50, status=status)
+            battle = headless_battle(attacker, creature("Wild", speed=1), seed=3)
+            battle.player_attack(0)
+            return next(e[2] for e in battle.events if e[3] == BattleEvent.HIT and e[0] is attacker)
+
+        self.assertEqual(first_hit("burned"), int(first_hit(None) * 0.5))
+
+    def test_no_status_keeps_rolls(self):
+        """Test that creatures without a status use exactly the same rolls as before"""
+        def play(status):
+            hero, wild = creature("Hero", speed=50), creature("Wild", speed=1, status=status)
+            battle = headless_battle(hero, wild, seed=5)
+            for _ in range(3):
+                battle.player_attack(0)
+            return [event[2] for event in battle.events if event[3] == BattleEvent.HIT]
+
+        self.assertEqual(len(play(None)), 6)
+        self.assertNotEqual(play(None), play("paralyzed"))
+
+    def test_status_raises_catch_chance(self):
+        """Test the status catch multiplier in the lookup table and Battle"""
+        trap = TRAP_TYPES["Basic Trap"]
+        for status in STATUS.names:
+            for current_hp, max_hp in ((1, 100), (37, 80), (100, 100)):
+                self.assertEqual(catch_chance(trap, current_hp, max_hp, status),
+                                 catch_probability(trap, current_hp, max_hp, status))
+        self.assertGreater(catch_chance(trap, 10, 100, "asleep"), catch_chance(trap, 10, 100))
+
+        wild = creature("Wild", speed=1)
+        battle = headless_battle(creature("Hero", speed=50), wild)
+        healthy = battle.get_catch_chance("Basic Trap")
+        battle.inflict_status(wild, "paralyzed")
+        self.assertGreater(battle.get_catch_chance("Basic Trap"), healthy)
+
+
+class TestStatusLockstep(unittest.TestCase):
+    """Test status effects in the lockstep engine"""
+
+    def test_matches_battle_win_rate(self):
+        """Test that win rates with statuses match Battle"""
+        n = 4000
+        for player_status, wild_status in (("confused", "paralyzed"), ("frightened", "asleep")):
+            def make():
+                player = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+                wild = SPECIES_BY_NAME["Sparkrat"].spawn(5)
+                player.status, wild.status = player_status, wild_status
+                return player, wild
+
+            rng = random.Random(2)
+            wins = 0
+            for _ in range(n):
+                player, wild = make()
+                battle = headless_battle(player, wild)
+                battle.rng = rng
+                while battle.result == BattleResult.ONGOING:
+                    battle.player_attack(int(rng.random() * len(player.moves)))
+                wins += battle.result == BattleResult.PLAYER_WIN
+
+            player, wild = make()
+            battles = LockstepBattles(side_columns([player] * n), side_columns([wild] * n),
+                                      rng=np.random.default_rng(1))
+            battles.run(max_turns=1000)
+            lockstep_rate = np.mean(battles.result == PLAYER_WIN)
+
+            # Difference of two binomial proportions, 4 standard errors
+            tolerance = 4 * np.sqrt(2 * 0.25 / n)
+            self.assertAlmostEqual(lockstep_rate, wins / n, delta=tolerance,
+                                   msg=(player_status, wild_status))
+
+    def test_statuses_wear_off(self):
+        """Test that timed statuses are cured and the fast path comes back"""
+        wild = SPECIES_BY_NAME["Rockbug"].spawn(5)
+        wild.status = "frozen"
+        n = 100
+        battles = LockstepBattles(side_columns([SPECIES_BY_NAME["Rockbug"].spawn(5)] * n),
+                                  side_columns([wild] * n), rng=np.random.default_rng(4))
+        self.assertTrue(battles._has_status)
+        self.assertTrue(np.all((battles.wild['status_turns'] >= 1) & (battles.wild['status_turns'] <= 4)))
+        for _ in range(5):
+            battles.step()
+        self.assertFalse(battles._has_status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for the species matchup tournament runner
+"""
+
+import os
+import tempfile
+import unittest
+
+from tournament import run_tournament, load_params, load_results, make_units, run_unit
+
+SPECIES_IDS = [0, 3, 4]
+BANDS = ((2, 5), (8, 12))
+
+
+class TestTournament(unittest.TestCase):
+    """Test tournament units, parallel runs and resuming"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _run(self, name, workers):
+        path = os.path.join(self.tmp.name, name)
+        matrix = run_tournament(path, battles=30, bands=BANDS, seed=5, workers=workers,
+                                chunk_size=10, species_ids=SPECIES_IDS)
+        return path, matrix
+
+    def test_units(self):
+        """Test that matchups are split into chunked units"""
+        units = make_units(5, 25, BANDS, 10, SPECIES_IDS)
+        self.assertEqual(len(units), 3 * 3 * 2 * 3)
+        self.assertEqual(sum(u[5] for u in units), 3 * 3 * 2 * 25)
+        record = run_unit(units[0])
+        self.assertEqual(record['wins'] + record['losses'] + record['draws'], 10)
+        self.assertEqual(run_unit(units[0]), record)
+
+    def test_worker_count_does_not_change_results(self):
+        """Test that results are the same with one or several workers"""
+        _, single = self._run("single.jsonl", workers=1)
+        _, parallel = self._run("parallel.jsonl", workers=3)
+        self.assertEqual(single, parallel)
+        self.assertEqual(len(single), 3 * 3 * len(BANDS))
+        self.assertTrue(all(sum(counts) == 30 for counts in single.values()))
+
+    def test_resume(self):
+        """Test that an interrupted run resumes from the results file"""
+        path, full = self._run("full.jsonl", workers=2)
+        with open(path) as f:
+            lines = f.readlines()
+
+        # Keep the header and first few units plus a torn line, as if the run was killed
+        partial = os.path.join(self.tmp.name, "partial.jsonl")
+        with open(partial, 'w') as f:
+            f.writelines(lines[:7])
+            f.write(lines[7][:12])
+        self.assertEqual(load_params(partial)['seed'], 5)
+        self.assertEqual(len(load_results(partial)), 6)
+
+        resumed = run_tournament(partial, battles=30, bands=BANDS, seed=5, workers=2,
+                                 chunk_size=10, species_ids=SPECIES_IDS)
+        self.assertEqual(resumed, full)
+        self.assertEqual(len(load_results(partial)), len(lines) - 1)
+
+    def test_resume_refuses_other_parameters(self):
+        """Test that a results file isn't resumed with another seed, battle count or bands"""
+        path, _ = self._run("full.jsonl", workers=1)
+        for changes in ({'seed': 6}, {'battles': 40}, {'bands': BANDS[:1]}):
+            kwargs = dict(battles=30, bands=BANDS, seed=5, chunk_size=10, species_ids=SPECIES_IDS)
+            kwargs.update(changes)
+            with self.assertRaises(ValueError):
+                run_tournament(path, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
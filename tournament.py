@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Species matchup tournament for Trapper-Mastering balance work.
+
+Plays every species x species x level band matchup with the real Battle
+rules and builds a win-rate matrix. Matchups are split into chunked work
+units and spread over a process pool. Each unit rolls on its own seeded
+stream (see seeding.py), so results don't depend on the number of workers.
+Finished units are appended to a JSON-lines file as they complete, and an
+interrupted run picks up where it left off. The file starts with a header
+line holding the run parameters; resuming with different ones is refused.
+
+Usage:
+    python tournament.py --out results.jsonl [--battles 1000] [--workers 8]
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from creature import SPECIES
+from player import Player
+from battle import Battle, BattleResult
+from seeding import stream
+
+
+DEFAULT_LEVEL_BANDS = ((2, 5), (6, 10), (11, 20), (21, 40))
+
+# Battles still going after this many turns count as draws
+MAX_TURNS = 200
+
+
+def parse_bands(text):
+    """Parse level bands like "2-5,6-10" into ((2, 5), (6, 10))"""
+    bands = []
+    for part in text.split(","):
+        low, high = part.split("-")
+        bands.append((int(low), int(high)))
+    return tuple(bands)
+
+
+def play_matchup(species_a, species_b, level_a, level_b, rng):
+    """
+    Play one battle: species_a on the player side against a wild species_b.
+    Both sides pick moves uniformly at random. Returns the BattleResult,
+    or None for a draw.
+    """
+    player = Player("Tournament")
+    player.add_creature(SPECIES[species_a].spawn(level_a))
+    battle = Battle(player, SPECIES[species_b].spawn(level_b), rng=rng,
+                    headless=True, log_size=8)
+
+    moves = battle.player_creature.moves
+    for _ in range(MAX_TURNS):
+        battle.player_attack(int(rng.random() * len(moves)))
+        if battle.result != BattleResult.ONGOING:
+            return battle.result
+    return None
+
+
+def run_unit(unit):
+    """Play one work unit: (seed, species_a, species_b, band, chunk, battles, low, high)"""
+    seed, species_a, species_b, band, chunk, battles, low, high = unit
+    rng = stream(seed, species_a, species_b, band, chunk)
+    wins = losses = draws = 0
+    for _ in range(battles):
+        result = play_matchup(species_a, species_b,
+                              rng.randint(low, high), rng.randint(low, high), rng)
+        if result == BattleResult.PLAYER_WIN:
+            wins += 1
+        elif result == BattleResult.PLAYER_LOSE:
+            losses += 1
+        else:
+            draws += 1
+    return {
+        'unit': [species_a, species_b, band, chunk],
+        'wins': wins,
+        'losses': losses,
+        'draws': draws,
+    }
+
+
+def run_units(units):
+    """Play a batch of work units (one pool task)"""
+    return [run_unit(unit) for unit in units]
+
+
+def make_units(seed, battles, bands, chunk_size, species_ids=None):
+    """Split every matchup into work units of at most chunk_size battles"""
+    if species_ids is None:
+        species_ids = [s.id for s in SPECIES]
+    units = []
+    for species_a in species_ids:
+        for species_b in species_ids:
+            for band, (low, high) in enumerate(bands):
+                for chunk, start in enumerate(range(0, battles, chunk_size)):
+                    count = min(chunk_size, battles - start)
+                    units.append((seed, species_a, species_b, band, chunk, count, low, high))
+    return units
+
+
+def run_params(seed, battles, bands, chunk_size, species_ids=None):
+    """Header dict identifying a run; units from runs with other parameters don't mix"""
+    if species_ids is None:
+        species_ids = [s.id for s in SPECIES]
+    return {'seed': seed, 'battles': battles, 'bands': [list(band) for band in bands],
+            'chunk_size': chunk_size, 'species_ids': list(species_ids)}
+
+
+def _read_records(path):
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def load_params(path):
+    """Run parameters from a results file's header line, or None if it has none"""
+    for record in _read_records(path):
+        return record.get('params')
+    return None
+
+
+def load_results(path):
+    """Read finished units from a results file (ignores the header and a torn last line)"""
+    return {tuple(record['unit']): record for record in _read_records(path) if 'unit' in record}
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def run_tournament(out_path, battles=1000, bands=DEFAULT_LEVEL_BANDS, seed=0,
+                   workers=None, chunk_size=250, species_ids=None):
+    """
+    Run (or resume) a tournament, streaming unit results to out_path.
+    Returns the win-rate matrix from win_rate_matrix(). Raises ValueError
+    if out_path holds results of a run with other parameters.
+    """
+    params = run_params(seed, battles, bands, chunk_size, species_ids)
+    done = load_results(out_path)
+    saved_params = load_params(out_path)
+    if saved_params is None and done:
+        raise ValueError(f"{out_path} has no run parameters header; can't resume it safely")
+    if saved_params is not None and saved_params != params:
+        raise ValueError(f"{out_path} holds a run with other parameters: {saved_params}")
+    pending = [u for u in make_units(seed, battles, bands, chunk_size, species_ids)
+               if tuple(u[1:5]) not in done]
+
+    if pending or saved_params is None:
+        with open(out_path, 'a') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+            if out.tell() and not _ends_with_newline(out_path):
+                out.write("\n")  # finish a line torn by an interrupted run
+            if saved_params is None:
+                out.write(json.dumps({'params': params}) + "\n")
+                out.flush()
+            # Several units per task keeps IPC small; batches are written as they finish
+            per_task = max(1, len(pending) // (4 * (workers or os.cpu_count() or 1)))
+            futures = [pool.submit(run_units, pending[i:i + per_task])
+                       for i in range(0, len(pending), per_task)]
+            for future in as_completed(futures):
+                for record in future.result():
+                    out.write(json.dumps(record) + "\n")
+                    done[tuple(record['unit'])] = record
+                out.flush()
+
+    return win_rate_matrix(done.values())
+
+
+def win_rate_matrix(records):
+    """Sum unit records into {(species_a, species_b, band): (wins, losses, draws)}"""
+    matrix = {}
+    for record in records:
+        species_a, species_b, band, _chunk = record['unit']
+        wins, losses, draws = matrix.get((species_a, species_b, band), (0, 0, 0))
+        matrix[(species_a, species_b, band)] = (wins + record['wins'],
+                                                losses + record['losses'],
+                                                draws + record['draws'])
+    return matrix
+
+
+def print_matrix(matrix, bands):
+    """Print one win-rate table (player side rows vs wild side columns) per band"""
+    names = [s.name for s in SPECIES]
+    for band, (low, high) in enumerate(bands):
+        print(f"\nLevels {low}-{high}: win rate of row species against column species")
+        print(" " * 12 + "".join(f"{name[:10]:>11}" for name in names))
+        for species_a, name in enumerate(names):
+            cells = []
+            for species_b in range(len(names)):
+                wins, losses, draws = matrix.get((species_a, species_b, band), (0, 0, 0))
+                total = wins + losses + draws
+                cells.append(f"{wins / total:>11.1%}" if total else f"{'-':>11}")
+            print(f"{name[:10]:<12}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Species matchup tournament")
+    parser.add_argument('--out', default='tournament_results.jsonl',
+                        help="results file (re-run with the same file to resume)")
+    parser.add_argument('--battles', type=int, default=1000, help="battles per matchup")
+    parser.add_argument('--bands', type=parse_bands, default=DEFAULT_LEVEL_BANDS,
+                        help="level bands, e.g. 2-5,6-10")
+    parser.add_argument('--seed', type=int, default=0, help="master seed")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--chunk-size', type=int, default=250, help="battles per work unit")
+    args = parser.parse_args()
+
+    matrix = run_tournament(args.out, args.battles, args.bands, args.seed,
+                            args.workers, args.chunk_size)
+    print_matrix(matrix, args.bands)
+
+
+if __name__ == "__main__":
+    main()